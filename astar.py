@@ -1,16 +1,57 @@
-import copy
+import bisect
+import heapq
+import itertools
+import time
 
 class Puzzle:
+    # Tiles are packed into one integer, `bits` bits per cell in row-major
+    # order, with the blank's cell index cached so moves are O(1) swaps.
+    __slots__ = ('tiles', 'n', 'bits', 'blank', 'g_cost', 'h_cost', 'parent')
+
     def __init__(self, matrix):
-        self.matrix = [row[:] for row in matrix]
         self.n = len(matrix)
+        self.bits = max(4, (self.n * self.n - 1).bit_length())
+        self.tiles = 0
+        self.blank = None
+        for index, value in enumerate(cell for row in matrix for cell in row):
+            self.tiles |= value << (index * self.bits)
+            if value == 0:
+                self.blank = index
         self.g_cost = 0  # cost from start to current node
+        self.h_cost = None  # cached heuristic, filled in by the solver
+        self.parent = None
+
+    @classmethod
+    def from_packed(cls, n, bits, tiles, blank, g_cost=0, parent=None):
+        puzzle = cls.__new__(cls)
+        puzzle.n = n
+        puzzle.bits = bits
+        puzzle.tiles = tiles
+        puzzle.blank = blank
+        puzzle.g_cost = g_cost
+        puzzle.h_cost = None
+        puzzle.parent = parent
+        return puzzle
+
+    def detached(self):
+        # Same tiles as a fresh root: no parent chain, g and h reset
+        return Puzzle.from_packed(self.n, self.bits, self.tiles, self.blank)
+
+    def tile_at(self, index):
+        return (self.tiles >> (index * self.bits)) & ((1 << self.bits) - 1)
+
+    @property
+    def matrix(self):
+        n = self.n
+        return [[self.tile_at(i * n + j) for j in range(n)] for i in range(n)]
 
     def __eq__(self, other):
-        return self.matrix == other.matrix
+        if not isinstance(other, Puzzle):
+            return NotImplemented
+        return self.tiles == other.tiles and self.n == other.n
 
     def __hash__(self):
-        return hash(str(self.matrix))
+        return hash(self.tiles)
 
     def display_puzzle(self):
         for row in self.matrix:
@@ -18,21 +59,19 @@ class Puzzle:
         print()
 
     def find_blank(self):
-        for i in range(self.n):
-            for j in range(self.n):
-                if self.matrix[i][j] == 0:
-                    return (i, j)
-        return None
+        if self.blank is None:
+            return None
+        return divmod(self.blank, self.n)
 
     def move_blank(self, dx, dy):
         x, y = self.find_blank()
         nx, ny = x + dx, y + dy
         if 0 <= nx < self.n and 0 <= ny < self.n:
-            new_matrix = copy.deepcopy(self.matrix)
-            new_matrix[x][y], new_matrix[nx][ny] = new_matrix[nx][ny], new_matrix[x][y]
-            new_puzzle = Puzzle(new_matrix)
-            new_puzzle.g_cost = self.g_cost + 1
-            return new_puzzle
+            target = nx * self.n + ny
+            value = self.tile_at(target)
+            # Slide `value` into the blank's cell and leave 0 behind
+            tiles = self.tiles - (value << (target * self.bits)) + (value << (self.blank * self.bits))
+            return Puzzle.from_packed(self.n, self.bits, tiles, target, self.g_cost + 1, self)
         return None
 
     def can_move_up(self):
@@ -48,31 +87,177 @@ class Puzzle:
         return self.move_blank(0, 1)
 
 
+def goal_matrix(n):
+    # Tiles in order with the blank in the bottom-right corner
+    tiles = list(range(1, n * n)) + [0]
+    return [tiles[i * n:(i + 1) * n] for i in range(n)]
+
+
+def parity(puzzle):
+    # Inversion count of the tiles in row-major order, plus the blank's row
+    # on even-width boards. Sliding moves never change its parity.
+    tiles = [puzzle.tile_at(i) for i in range(puzzle.n * puzzle.n)]
+    tiles = [t for t in tiles if t != 0]
+    inversions = 0
+    for i in range(len(tiles)):
+        for j in range(i + 1, len(tiles)):
+            if tiles[i] > tiles[j]:
+                inversions += 1
+    if puzzle.n % 2 == 0:
+        inversions += puzzle.blank // puzzle.n
+    return inversions % 2
+
+
+def is_solvable(start_state, target_state):
+    return start_state.n == target_state.n and parity(start_state) == parity(target_state)
+
+
+MOVE_NAMES = {(-1, 0): 'up', (1, 0): 'down', (0, -1): 'left', (0, 1): 'right'}
+
+
+class SearchResult:
+    # status is one of "solved", "unsolvable", "node_limit" or "timeout"
+    def __init__(self, path=None, expanded=0, generated=0, peak_frontier=0, status=None):
+        self.path = path  # list of states from start to target, None if unsolved
+        self.expanded = expanded
+        self.generated = generated
+        self.peak_frontier = peak_frontier
+        self.status = status or ("solved" if path is not None else "unsolvable")
+
+    @property
+    def solved(self):
+        return self.path is not None
+
+    def __bool__(self):
+        return self.solved
+
+    @property
+    def moves(self):
+        # Direction the blank moves at each step
+        if not self.path:
+            return []
+        moves = []
+        for before, after in zip(self.path, self.path[1:]):
+            (x, y), (nx, ny) = before.find_blank(), after.find_blank()
+            moves.append(MOVE_NAMES[(nx - x, ny - y)])
+        return moves
+
+    def __repr__(self):
+        length = len(self.path) - 1 if self.path else None
+        return (f"SearchResult({self.status}, length={length}, expanded={self.expanded}, "
+                f"generated={self.generated}, peak_frontier={self.peak_frontier})")
+
+
+def print_state(puzzle, h, g, f):
+    print(f"Current State (h={h}, g={g}, f={f})")
+    puzzle.display_puzzle()
+
+
+class ManhattanHeuristic:
+    # dist_table[tile][cell] is the Manhattan distance from cell to the
+    # tile's goal cell, computed once per target.
+    def __init__(self, target_state):
+        n = target_state.n
+        self.n = n
+        self.goal_pos = {}
+        for index in range(n * n):
+            self.goal_pos[target_state.tile_at(index)] = divmod(index, n)
+        self.dist_table = [[0] * (n * n) for _ in range(1 << target_state.bits)]
+        for tile, (gi, gj) in self.goal_pos.items():
+            if tile == 0:
+                continue  # the blank does not count towards the heuristic
+            for index in range(n * n):
+                i, j = divmod(index, n)
+                self.dist_table[tile][index] = abs(gi - i) + abs(gj - j)
+
+    def estimate(self, puzzle):
+        dist = 0
+        for index in range(puzzle.n * puzzle.n):
+            dist += self.dist_table[puzzle.tile_at(index)][index]
+        return dist
+
+    def update(self, parent, child):
+        # Only the tile that slid into the parent's blank cell changed place
+        tile = child.tile_at(parent.blank)
+        row = self.dist_table[tile]
+        return parent.h_cost + row[parent.blank] - row[child.blank]
+
+
+class LinearConflictHeuristic(ManhattanHeuristic):
+    # Manhattan distance plus two moves for every tile that has to leave
+    # its goal row/column to let another tile in the same line pass it.
+    def line_conflicts(self, puzzle, line, is_row):
+        n = self.n
+        goals = []
+        for k in range(n):
+            index = line * n + k if is_row else k * n + line
+            tile = puzzle.tile_at(index)
+            if tile == 0:
+                continue
+            gi, gj = self.goal_pos[tile]
+            if (gi if is_row else gj) == line:
+                goals.append(gj if is_row else gi)
+        # Tiles outside the longest increasing run must step aside
+        run = []
+        for goal in goals:
+            k = bisect.bisect_left(run, goal)
+            if k == len(run):
+                run.append(goal)
+            else:
+                run[k] = goal
+        return len(goals) - len(run)
+
+    def estimate(self, puzzle):
+        conflicts = 0
+        for line in range(self.n):
+            conflicts += self.line_conflicts(puzzle, line, True)
+            conflicts += self.line_conflicts(puzzle, line, False)
+        return super().estimate(puzzle) + 2 * conflicts
+
+    def update(self, parent, child):
+        # A vertical move only changes row conflicts in the two rows
+        # involved; a horizontal move only changes the two columns.
+        h = super().update(parent, child)
+        old_i, old_j = divmod(parent.blank, self.n)
+        new_i, new_j = divmod(child.blank, self.n)
+        is_row = old_j == new_j
+        lines = (old_i, new_i) if is_row else (old_j, new_j)
+        for line in lines:
+            h += 2 * (self.line_conflicts(child, line, is_row) - self.line_conflicts(parent, line, is_row))
+        return h
+
+
 class AStar:
-    def __init__(self, start_state, target_state):
-        self.open_list = [start_state]
+    def __init__(self, start_state, target_state, heuristic=None, max_nodes=None, time_limit=None):
+        # open_list is a binary heap of (f, h, tie_break, puzzle) entries
+        self.open_list = []
         self.closed_list = set()
-        self.start_state = start_state
+        self.best_node = {}  # state -> node with the lowest g seen so far
+        self.counter = itertools.count()
+        # Search from a copy: a state taken from a move or an earlier path
+        # still carries its parent chain, g and h
+        self.start_state = start_state = start_state.detached()
         self.target_state = target_state
+        self.goal_node = None
+        self.expanded = 0
+        self.generated = 0
+        self.peak_frontier = 0
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.heuristic = heuristic or ManhattanHeuristic(target_state)
+        start_state.h_cost = self.heuristic.estimate(start_state)
+        self.push(start_state)
 
     def is_goal(self, puzzle):
         return puzzle == self.target_state
 
-    def calculate_manhattan_dist(self, x, curr_pos):
-        for i in range(self.target_state.n):
-            for j in range(self.target_state.n):
-                if self.target_state.matrix[i][j] == x:
-                    goal_pos = (i, j)
-        return abs(goal_pos[0] - curr_pos[0]) + abs(goal_pos[1] - curr_pos[1])
-
     def h(self, puzzle):
-        dist = 0
-        for i in range(puzzle.n):
-            for j in range(puzzle.n):
-                val = puzzle.matrix[i][j]
-                curr_pos = (i, j)
-                dist += self.calculate_manhattan_dist(val, curr_pos)
-        return dist
+        if puzzle.h_cost is None:
+            puzzle.h_cost = self.heuristic.estimate(puzzle)
+        return puzzle.h_cost
+
+    def update_h(self, parent, child):
+        child.h_cost = self.heuristic.update(parent, child)
 
     def g(self, puzzle):
         return puzzle.g_cost
@@ -91,32 +276,281 @@ class AStar:
         for move_func in [puzzle.can_move_up, puzzle.can_move_down, puzzle.can_move_left, puzzle.can_move_right]:
             new_state = move_func()
             if new_state:
+                self.update_h(puzzle, new_state)
                 moves.append(new_state)
         return self.remove_seen(moves)
 
-    def sort_open_list(self):
-        self.open_list.sort(key=lambda p: self.f(p))
+    def push(self, puzzle):
+        # f and h are computed once here and cached in the heap entry
+        h = self.h(puzzle)
+        f = puzzle.g_cost + h
+        self.best_node[puzzle] = puzzle
+        heapq.heappush(self.open_list, (f, h, next(self.counter), puzzle))
+
+    def is_stale(self, puzzle):
+        # Entries superseded by a later, cheaper push of the same state
+        return puzzle in self.closed_list or puzzle.g_cost > self.best_node[puzzle].g_cost
 
-    def solve(self):
+    def pop(self):
         while self.open_list:
-            self.sort_open_list()
-            current_state = self.open_list.pop(0)
-            print(f"Current State ({self.display_fgh(current_state)})")
-            current_state.display_puzzle()
+            f, h, _, puzzle = heapq.heappop(self.open_list)
+            if self.is_stale(puzzle):
+                continue
+            return f, h, puzzle
+        return None
+
+    def min_f(self):
+        while self.open_list and self.is_stale(self.open_list[0][3]):
+            heapq.heappop(self.open_list)
+        return self.open_list[0][0] if self.open_list else float('inf')
+
+    def expand(self, puzzle):
+        # Close puzzle and push every successor that improves on its best g
+        self.closed_list.add(puzzle)
+        self.expanded += 1
+        next_moves = self.moves_generate(puzzle)
+        self.generated += len(next_moves)
+        pushed = []
+        for move in next_moves:
+            best = self.best_node.get(move)
+            if best is None or move.g_cost < best.g_cost:
+                self.push(move)
+                pushed.append(move)
+        return pushed
+
+    def result(self, status=None):
+        path = self.reconstruct_path() if self.goal_node is not None else None
+        return SearchResult(path, self.expanded, self.generated, self.peak_frontier, status)
+
+    def solve(self, trace=None):
+        """Search for the target. trace(puzzle, h, g, f) is called for every
+        expanded state when given."""
+        if not is_solvable(self.start_state, self.target_state):
+            return self.result()
+
+        deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+        while True:
+            if self.max_nodes is not None and self.expanded >= self.max_nodes:
+                return self.result("node_limit")
+            if deadline is not None and time.perf_counter() > deadline:
+                return self.result("timeout")
+            self.peak_frontier = max(self.peak_frontier, len(self.open_list))
+            entry = self.pop()
+            if entry is None:
+                break
+            f, h, current_state = entry
+            if trace is not None:
+                trace(current_state, h, current_state.g_cost, f)
 
             if self.is_goal(current_state):
-                print("Goal reached!")
-                return True
+                self.goal_node = current_state
+                break
 
-            self.closed_list.add(current_state)
+            self.expand(current_state)
+
+        return self.result()
+
+    def reconstruct_path(self):
+        path = []
+        node = self.goal_node
+        while node is not None:
+            path.append(node)
+            node = node.parent
+        path.reverse()
+        return path
+
+
+class BidirectionalSide(AStar):
+    # One direction of a bidirectional search. A second heap keyed on g,
+    # pruned lazily with the same staleness test, gives the smallest open g.
+    def __init__(self, start_state, target_state, heuristic=None):
+        self.g_heap = []
+        super().__init__(start_state, target_state, heuristic)
+
+    def push(self, puzzle):
+        super().push(puzzle)
+        heapq.heappush(self.g_heap, (puzzle.g_cost, next(self.counter), puzzle))
+
+    def min_g(self):
+        while self.g_heap and self.is_stale(self.g_heap[0][2]):
+            heapq.heappop(self.g_heap)
+        return self.g_heap[0][0] if self.g_heap else float('inf')
+
+
+class BidirectionalAStar:
+    """Front-to-end bidirectional A*: one AStar searches from the start
+    towards the target and another from the target towards the start, each
+    with its own heap, best-node index and closed set.
+
+    mu is the cheapest start-to-target path found through a state both
+    sides have reached. Any cheaper path would still have to pass an open
+    state on each side, so it costs at least the minimum open f of either
+    side and at least the two minimum open g values plus one move. Once
+    any of those bounds reaches mu the path found is optimal.
+    """
+
+    def __init__(self, start_state, target_state, heuristic=None, backward_heuristic=None,
+                 max_nodes=None, time_limit=None):
+        self.start_state = start_state
+        self.target_state = target_state
+        self.forward = BidirectionalSide(start_state, target_state, heuristic)
+        self.backward = BidirectionalSide(target_state, start_state,
+                                          backward_heuristic or ManhattanHeuristic(start_state))
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.peak_frontier = 0
+        self.mu = float('inf')
+        self.meeting = None  # (forward node, backward node)
+
+    def check_meeting(self, node, other):
+        best = other.best_node.get(node)
+        if best is not None and node.g_cost + best.g_cost < self.mu:
+            self.mu = node.g_cost + best.g_cost
+            self.meeting = (node, best) if other is self.backward else (best, node)
+
+    def result(self, status=None):
+        expanded = self.forward.expanded + self.backward.expanded
+        generated = self.forward.generated + self.backward.generated
+        path = None
+        if self.meeting is not None and status is None:
+            forward_node, backward_node = self.meeting
+            path = []
+            while forward_node is not None:
+                path.append(forward_node)
+                forward_node = forward_node.parent
+            path.reverse()
+            backward_node = backward_node.parent
+            while backward_node is not None:
+                path.append(backward_node)
+                backward_node = backward_node.parent
+        return SearchResult(path, expanded, generated, self.peak_frontier, status)
+
+    def solve(self, trace=None):
+        if not is_solvable(self.start_state, self.target_state):
+            return self.result()
+
+        deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+        self.check_meeting(self.forward.start_state, self.backward)
+        while True:
+            if self.max_nodes is not None and self.forward.expanded + self.backward.expanded >= self.max_nodes:
+                return self.result("node_limit")
+            if deadline is not None and time.perf_counter() > deadline:
+                return self.result("timeout")
+            self.peak_frontier = max(self.peak_frontier,
+                                     len(self.forward.open_list) + len(self.backward.open_list))
+            forward, backward = self.forward, self.backward
+            if max(forward.min_f(), backward.min_f(), forward.min_g() + backward.min_g() + 1) >= self.mu:
+                break
+
+            # Expand the side with the smaller frontier
+            if len(self.forward.open_list) <= len(self.backward.open_list):
+                side, other = self.forward, self.backward
+            else:
+                side, other = self.backward, self.forward
+            f, h, current_state = side.pop()
+            if trace is not None:
+                trace(current_state, h, current_state.g_cost, f)
+            for child in side.expand(current_state):
+                self.check_meeting(child, other)
+
+        return self.result()
+
+
+class IDAStar:
+    # Iterative-deepening A*: depth-first probes bounded by f, so memory is
+    # linear in the solution depth instead of the number of states seen.
+    FOUND = -1
+    ABORTED = -2
+
+    def __init__(self, start_state, target_state, heuristic=None, max_nodes=None, time_limit=None):
+        self.start_state = start_state.detached()
+        self.target_state = target_state
+        self.heuristic = heuristic or ManhattanHeuristic(target_state)
+        self.expanded = 0
+        self.generated = 0
+        self.path = []
+        self.trace = None
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.deadline = None
+        self.status = None
+
+    def is_goal(self, puzzle):
+        return puzzle == self.target_state
+
+    def search(self, node, bound, previous_blank):
+        f = node.g_cost + node.h_cost
+        if f > bound:
+            return f
+        if self.trace is not None:
+            self.trace(node, node.h_cost, node.g_cost, f)
+        if self.is_goal(node):
+            return self.FOUND
+        if self.max_nodes is not None and self.expanded >= self.max_nodes:
+            self.status = "node_limit"
+            return self.ABORTED
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            self.status = "timeout"
+            return self.ABORTED
+        self.expanded += 1
+
+        next_bound = float('inf')
+        for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            child = node.move_blank(dx, dy)
+            # Never undo the move that produced this node
+            if child is None or child.blank == previous_blank:
+                continue
+            child.h_cost = self.heuristic.update(node, child)
+            self.generated += 1
+            self.path.append(child)
+            t = self.search(child, bound, node.blank)
+            if t == self.FOUND or t == self.ABORTED:
+                return t
+            self.path.pop()
+            next_bound = min(next_bound, t)
+        return next_bound
+
+    def solve(self, trace=None):
+        if not is_solvable(self.start_state, self.target_state):
+            return SearchResult()
+        self.trace = trace
+        if self.time_limit is not None:
+            self.deadline = time.perf_counter() + self.time_limit
+        start = self.start_state
+        start.h_cost = self.heuristic.estimate(start)
+        bound = start.h_cost
+        self.path = [start]
+        while True:
+            t = self.search(start, bound, None)
+            # A depth-first search only ever holds the current path
+            if t == self.FOUND:
+                return SearchResult(self.path, self.expanded, self.generated, len(self.path))
+            if t == self.ABORTED:
+                return SearchResult(None, self.expanded, self.generated, len(self.path), self.status)
+            if t == float('inf'):
+                return SearchResult(None, self.expanded, self.generated)
+            bound = t
+
+
+def solve(start_state, target_state, mode="auto", heuristic=None, trace=None,
+          max_nodes=None, time_limit=None):
+    """Solve the puzzle and return a SearchResult.
+
+    mode is "astar", "bidirectional", "idastar" or "auto", which uses A* on
+    3x3 boards and IDA* on larger ones where A*'s closed list would not fit
+    in memory.
+    """
+    if mode == "auto":
+        mode = "astar" if start_state.n <= 3 else "idastar"
+    if mode == "astar":
+        return AStar(start_state, target_state, heuristic, max_nodes, time_limit).solve(trace)
+    if mode == "bidirectional":
+        return BidirectionalAStar(start_state, target_state, heuristic,
+                                  max_nodes=max_nodes, time_limit=time_limit).solve(trace)
+    if mode == "idastar":
+        return IDAStar(start_state, target_state, heuristic, max_nodes, time_limit).solve(trace)
+    raise ValueError(f"unknown search mode: {mode}")
 
-            next_moves = self.moves_generate(current_state)
-            for move in next_moves:
-                if move not in self.open_list:
-                    self.open_list.append(move)
-                    
-        print("Goal not reachable.")
-        return False
 
 def main():
     # blank space will be represented internally as 0
@@ -135,7 +569,13 @@ def main():
     target_puzzle = Puzzle(target_matrix)
 
     solver = AStar(start_puzzle, target_puzzle)
-    solver.solve()
+    result = solver.solve(trace=print_state)
+    if result:
+        print("Goal reached!")
+        print(f"Moves: {' '.join(result.moves)}")
+        print(f"Expanded {result.expanded}, generated {result.generated}, peak frontier {result.peak_frontier}")
+    else:
+        print("Goal not reachable.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,154 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+
+from astar import Puzzle, goal_matrix, solve
+
+
+def to_matrix(tiles):
+    n = math.isqrt(len(tiles))
+    if n * n != len(tiles):
+        raise ValueError(f"{len(tiles)} tiles do not form a square board")
+    return [list(tiles[i * n:(i + 1) * n]) for i in range(n)]
+
+
+def parse_instance(line, line_number):
+    """Accept a JSON object {"id", "start", "target"}, a JSON matrix or a
+    flat list of tiles, or whitespace/comma separated tiles."""
+    if line.startswith("{"):
+        record = json.loads(line)
+        start = record["start"]
+        target = record.get("target")
+        instance_id = record.get("id", line_number)
+    else:
+        start = json.loads(line) if line.startswith("[") else [int(t) for t in line.replace(",", " ").split()]
+        target = None
+        instance_id = line_number
+    if start and not isinstance(start[0], list):
+        start = to_matrix(start)
+    if target and not isinstance(target[0], list):
+        target = to_matrix(target)
+    return {"id": instance_id, "start": start, "target": target or goal_matrix(len(start))}
+
+
+def read_instances(path):
+    """Instances from a file, one per line. A line that does not parse
+    becomes an instance carrying only its "error", which solve_instance
+    reports as that line's result."""
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if line and not line.startswith("#"):
+                try:
+                    yield parse_instance(line, line_number)
+                except (ValueError, KeyError, TypeError, IndexError, AttributeError) as error:
+                    yield {"id": line_number, "error": f"line {line_number}: {type(error).__name__}: {error}"}
+
+
+# Heuristics are built once per worker process and reused across chunks
+_heuristics = {}
+
+
+def get_heuristic(target, pdb_dir):
+    if pdb_dir is None:
+        return None
+    key = str(target)
+    if key not in _heuristics:
+        from pattern_db import DEFAULT_PARTITIONS, PatternDatabaseHeuristic, table_path
+        paths = [table_path(pdb_dir, len(target), p) for p in DEFAULT_PARTITIONS[len(target)]]
+        _heuristics[key] = PatternDatabaseHeuristic(Puzzle(target), paths)
+    return _heuristics[key]
+
+
+def error_result(instance, error, began):
+    return {"id": instance["id"], "status": "error", "error": error,
+            "length": None, "moves": None, "seconds": round(time.perf_counter() - began, 6)}
+
+
+def solve_instance(instance, mode="auto", max_nodes=None, time_limit=None, pdb_dir=None):
+    began = time.perf_counter()
+    if "error" in instance:
+        return error_result(instance, instance["error"], began)
+    try:
+        result = solve(Puzzle(instance["start"]), Puzzle(instance["target"]), mode,
+                       get_heuristic(instance["target"], pdb_dir),
+                       max_nodes=max_nodes, time_limit=time_limit)
+    except Exception as error:
+        # A bad instance is reported in its own result, not raised out of the batch
+        return error_result(instance, f"{type(error).__name__}: {error}", began)
+    return {
+        "id": instance["id"],
+        "status": result.status,
+        "length": len(result.moves) if result else None,
+        "moves": result.moves if result else None,
+        "expanded": result.expanded,
+        "generated": result.generated,
+        "peak_frontier": result.peak_frontier,
+        "seconds": round(time.perf_counter() - began, 6),
+    }
+
+
+def solve_chunk(chunk, mode, max_nodes, time_limit, pdb_dir):
+    return [solve_instance(instance, mode, max_nodes, time_limit, pdb_dir) for instance in chunk]
+
+
+def chunked(instances, size):
+    chunk = []
+    for instance in instances:
+        chunk.append(instance)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def solve_batch(instances, workers=None, chunksize=8, mode="auto", max_nodes=None,
+                time_limit=None, pdb_dir=None):
+    """Solve instances across a process pool, yielding result dicts in
+    completion order. time_limit and max_nodes apply per instance."""
+    workers = workers or os.cpu_count()
+    # Keep a few chunks queued per worker so a long input is never read
+    # into memory all at once
+    max_pending = workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for chunk in chunked(instances, chunksize):
+            pending.add(executor.submit(solve_chunk, chunk, mode, max_nodes, time_limit, pdb_dir))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        for future in as_completed(pending):
+            yield from future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve many sliding puzzles in parallel")
+    parser.add_argument("input", help="one instance per line: tiles, a JSON matrix or a JSONL record")
+    parser.add_argument("--output", help="JSONL results file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=8)
+    parser.add_argument("--mode", choices=["auto", "astar", "bidirectional", "idastar"], default="auto")
+    parser.add_argument("--max-nodes", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per instance")
+    parser.add_argument("--pdb-dir", help="use pattern databases from this directory")
+    args = parser.parse_args()
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for result in solve_batch(read_instances(args.input), args.workers, args.chunksize,
+                                  args.mode, args.max_nodes, args.timeout, args.pdb_dir):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+import argparse
+import copy
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from astar import AStar, BidirectionalAStar, LinearConflictHeuristic, ManhattanHeuristic, Puzzle, goal_matrix
+from astar_batch import solve_batch
+from eight_puzzle_table import EightPuzzleTable, build_table, table_path as distance_table_path, write_table
+from pattern_db import DEFAULT_PARTITIONS, PatternDatabaseHeuristic, build_databases, table_path
+
+
+def scramble(target, steps, rng):
+    # Random walk from the target so every instance is solvable
+    puzzle = target
+    previous = None
+    for _ in range(steps):
+        moves = [m for m in (puzzle.can_move_up(), puzzle.can_move_down(),
+                             puzzle.can_move_left(), puzzle.can_move_right())
+                 if m is not None and (previous is None or m != previous)]
+        previous = puzzle
+        puzzle = rng.choice(moves)
+    return Puzzle(puzzle.matrix)
+
+
+def make_instances(n, count, steps, seed):
+    rng = random.Random(seed)
+    target = Puzzle(goal_matrix(n))
+    return target, [scramble(target, steps, rng) for _ in range(count)]
+
+
+class ListFrontierAStar(AStar):
+    # The original frontier: a plain list re-sorted on every pop, with
+    # h() recomputed per sort and a linear scan for membership.
+    def __init__(self, start_state, target_state, heuristic=None):
+        super().__init__(start_state, target_state, heuristic)
+        self.open_list = [self.start_state]
+
+    def sort_open_list(self):
+        # Not self.f(): that reads the h cached on the state, which the
+        # original did not have
+        estimate = self.heuristic.estimate
+        self.open_list.sort(key=lambda p: p.g_cost + estimate(p))
+
+    def solve(self):
+        while self.open_list:
+            self.sort_open_list()
+            current_state = self.open_list.pop(0)
+            if self.is_goal(current_state):
+                self.goal_node = current_state
+                break
+            self.closed_list.add(current_state)
+            self.expanded += 1
+            for move in self.moves_generate(current_state):
+                if move not in self.open_list:
+                    self.open_list.append(move)
+        return self.result()
+
+
+class MatrixPuzzle:
+    # The original list-of-lists state with deepcopy successors and
+    # str()-based hashing, kept for comparison.
+    def __init__(self, matrix):
+        self.matrix = [row[:] for row in matrix]
+        self.n = len(matrix)
+        self.g_cost = 0
+
+    def __eq__(self, other):
+        return self.matrix == other.matrix
+
+    def __hash__(self):
+        return hash(str(self.matrix))
+
+    def find_blank(self):
+        for i in range(self.n):
+            for j in range(self.n):
+                if self.matrix[i][j] == 0:
+                    return (i, j)
+        return None
+
+    def move_blank(self, dx, dy):
+        x, y = self.find_blank()
+        nx, ny = x + dx, y + dy
+        if 0 <= nx < self.n and 0 <= ny < self.n:
+            new_matrix = copy.deepcopy(self.matrix)
+            new_matrix[x][y], new_matrix[nx][ny] = new_matrix[nx][ny], new_matrix[x][y]
+            new_puzzle = MatrixPuzzle(new_matrix)
+            new_puzzle.g_cost = self.g_cost + 1
+            return new_puzzle
+        return None
+
+
+def expand_states(root, limit):
+    # Breadth-first successor generation with hashing, the core of a search
+    seen = {root}
+    queue = [root]
+    head = 0
+    while head < len(queue) and len(seen) < limit:
+        state = queue[head]
+        head += 1
+        for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            child = state.move_blank(dx, dy)
+            if child is not None and child not in seen:
+                seen.add(child)
+                queue.append(child)
+    return queue
+
+
+def bench_state(args):
+    matrix = goal_matrix(args.size)
+    print(f"{args.size}x{args.size}, {args.nodes} nodes")
+    for name, state_cls in (("matrix", MatrixPuzzle), ("packed", Puzzle)):
+        began = time.perf_counter()
+        nodes = len(expand_states(state_cls(matrix), args.nodes))
+        elapsed = time.perf_counter() - began
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        states = [state_cls(matrix)]
+        for _ in range(args.nodes):
+            states.append(states[-1].move_blank(0, -1) or states[-1].move_blank(0, 1))
+        per_node = (tracemalloc.get_traced_memory()[0] - before) / len(states)
+        tracemalloc.stop()
+
+        print(f"{name:>7}: {nodes / elapsed:10.0f} nodes/sec  {per_node:7.1f} bytes/node")
+
+
+def run_solver(solver_cls, start, target, heuristic=None):
+    solver = solver_cls(Puzzle(start.matrix), target, heuristic)
+    began = time.perf_counter()
+    result = solver.solve()
+    return result.expanded, time.perf_counter() - began
+
+
+def bench_frontier(args):
+    target, instances = make_instances(args.size, args.count, args.steps, args.seed)
+    print(f"{args.count} instances, {args.size}x{args.size}, {args.steps} scramble steps")
+    for name, solver_cls in (("list", ListFrontierAStar), ("heap", AStar)):
+        expanded = 0
+        elapsed = 0.0
+        for start in instances:
+            e, t = run_solver(solver_cls, start, target)
+            expanded += e
+            elapsed += t
+        print(f"{name:>5}: {expanded:8d} expanded  {elapsed:8.3f}s  "
+              f"{expanded / elapsed:10.0f} nodes/sec")
+
+
+def bench_heuristic(args):
+    target, instances = make_instances(args.size, args.count, args.steps, args.seed)
+    pdb_dir = args.pdb_dir
+    if pdb_dir is None:
+        pdb_dir = tempfile.mkdtemp()
+        build_databases(target, pdb_dir)
+    paths = [table_path(pdb_dir, args.size, p) for p in DEFAULT_PARTITIONS[args.size]]
+    if not all(os.path.exists(p) for p in paths):
+        raise SystemExit(f"missing pattern databases in {pdb_dir}; run pattern_db.py first")
+
+    print(f"{args.count} instances, {args.size}x{args.size}, {args.steps} scramble steps")
+    heuristics = (
+        ("manhattan", ManhattanHeuristic(target)),
+        ("linear-conflict", LinearConflictHeuristic(target)),
+        ("pattern-db", PatternDatabaseHeuristic(target, paths)),
+    )
+    for name, heuristic in heuristics:
+        expanded = 0
+        elapsed = 0.0
+        for start in instances:
+            e, t = run_solver(AStar, start, target, heuristic)
+            expanded += e
+            elapsed += t
+        print(f"{name:>15}: {expanded:8d} expanded  {elapsed:8.3f}s")
+
+
+def bench_batch(args):
+    _, puzzles = make_instances(args.size, args.count, args.steps, args.seed)
+    instances = [{"id": i, "start": p.matrix, "target": goal_matrix(args.size)}
+                 for i, p in enumerate(puzzles)]
+    print(f"{args.count} instances, {args.size}x{args.size}, {args.steps} scramble steps, "
+          f"chunksize {args.chunksize}")
+    workers = 1
+    while workers <= args.max_workers:
+        began = time.perf_counter()
+        solved = sum(1 for _ in solve_batch(instances, workers, args.chunksize))
+        elapsed = time.perf_counter() - began
+        print(f"{workers:3d} workers: {solved / elapsed:8.1f} instances/sec")
+        workers *= 2
+
+
+def bench_bidirectional(args):
+    target, instances = make_instances(args.size, args.count, args.steps, args.seed)
+    print(f"{args.count} instances, {args.size}x{args.size}, {args.steps} scramble steps")
+    for name, solver_cls in (("forward", AStar), ("bidirectional", BidirectionalAStar)):
+        expanded = 0
+        elapsed = 0.0
+        for start in instances:
+            e, t = run_solver(solver_cls, start, target)
+            expanded += e
+            elapsed += t
+        print(f"{name:>13}: {expanded:9d} expanded  {elapsed:8.3f}s")
+
+
+def bench_table(args):
+    target, instances = make_instances(3, args.count, args.steps, args.seed)
+    path = distance_table_path(args.table_dir or tempfile.mkdtemp(), target.blank)
+    if not os.path.exists(path):
+        write_table(path, target.blank, build_table(target.blank))
+    table = EightPuzzleTable(path)
+    print(f"{args.count} 8-puzzles, {args.steps} scramble steps")
+
+    began = time.perf_counter()
+    for start in instances:
+        table.distance(start, target)
+    print(f" table distance: {args.count / (time.perf_counter() - began):10.0f} lookups/sec")
+
+    began = time.perf_counter()
+    for start in instances:
+        table.solve(start, target)
+    print(f"    table solve: {args.count / (time.perf_counter() - began):10.0f} solves/sec")
+
+    began = time.perf_counter()
+    for start in instances:
+        AStar(Puzzle(start.matrix), target).solve()
+    print(f"       A* solve: {args.count / (time.perf_counter() - began):10.0f} solves/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="A* sliding puzzle benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    frontier = sub.add_parser("frontier", help="heap vs sorted-list open list")
+    frontier.add_argument("--size", type=int, default=3)
+    frontier.add_argument("--count", type=int, default=10)
+    frontier.add_argument("--steps", type=int, default=20)
+    frontier.add_argument("--seed", type=int, default=1)
+    frontier.set_defaults(func=bench_frontier)
+
+    state = sub.add_parser("state", help="matrix vs packed puzzle state")
+    state.add_argument("--size", type=int, default=4)
+    state.add_argument("--nodes", type=int, default=50000)
+    state.set_defaults(func=bench_state)
+
+    heuristic = sub.add_parser("heuristic", help="manhattan vs linear conflict vs pattern databases")
+    heuristic.add_argument("--size", type=int, default=3)
+    heuristic.add_argument("--count", type=int, default=10)
+    heuristic.add_argument("--steps", type=int, default=30)
+    heuristic.add_argument("--seed", type=int, default=1)
+    heuristic.add_argument("--pdb-dir", help="directory of prebuilt tables (built on the fly if omitted)")
+    heuristic.set_defaults(func=bench_heuristic)
+
+    batch = sub.add_parser("batch", help="process pool throughput by worker count")
+    batch.add_argument("--size", type=int, default=3)
+    batch.add_argument("--count", type=int, default=400)
+    batch.add_argument("--steps", type=int, default=40)
+    batch.add_argument("--seed", type=int, default=1)
+    batch.add_argument("--chunksize", type=int, default=8)
+    batch.add_argument("--max-workers", type=int, default=os.cpu_count())
+    batch.set_defaults(func=bench_batch)
+
+    bidirectional = sub.add_parser("bidirectional", help="forward vs bidirectional A*")
+    bidirectional.add_argument("--size", type=int, default=3)
+    bidirectional.add_argument("--count", type=int, default=40)
+    bidirectional.add_argument("--steps", type=int, default=60)
+    bidirectional.add_argument("--seed", type=int, default=11)
+    bidirectional.set_defaults(func=bench_bidirectional)
+
+    table = sub.add_parser("table", help="8-puzzle distance table vs A*")
+    table.add_argument("--count", type=int, default=200)
+    table.add_argument("--steps", type=int, default=60)
+    table.add_argument("--seed", type=int, default=1)
+    table.add_argument("--table-dir", help="directory of prebuilt tables (built on the fly if omitted)")
+    table.set_defaults(func=bench_table)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
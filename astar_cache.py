@@ -0,0 +1,124 @@
+import sqlite3
+from collections import OrderedDict
+
+from astar import MOVE_NAMES, Puzzle, SearchResult, solve
+
+MOVE_DELTAS = {name: delta for delta, name in MOVE_NAMES.items()}
+MOVE_CODES = {'up': 'u', 'down': 'd', 'left': 'l', 'right': 'r'}
+CODE_MOVES = {code: name for name, code in MOVE_CODES.items()}
+# Bumped whenever relabel() changes, so keys written under an older
+# labelling never match (v1 counted labels from cell 0, not the blank)
+KEY_VERSION = 2
+
+
+def relabel(start_state, target_state):
+    """Relabel each tile by its goal cell, counted on from the target's
+    blank cell, so any target with the same blank cell maps to one
+    canonical goal and the blank stays 0. Blank moves do not depend on
+    labels, so solutions of the relabelled board solve the original."""
+    n = target_state.n
+    cells = n * n
+    label = {}
+    for index in range(cells):
+        label[target_state.tile_at(index)] = (index - target_state.blank) % cells
+    tiles = 0
+    for index in range(cells):
+        tiles |= label[start_state.tile_at(index)] << (index * start_state.bits)
+    return Puzzle.from_packed(n, start_state.bits, tiles, start_state.blank)
+
+
+def canonical_key(start_state, target_state):
+    # One cached move sequence answers every pair with the same key
+    return f"v{KEY_VERSION}:{target_state.n}:{target_state.blank}:{relabel(start_state, target_state).tiles:x}"
+
+
+def replay(start_state, moves):
+    path = [start_state]
+    for move in moves:
+        path.append(path[-1].move_blank(*MOVE_DELTAS[move]))
+    return path
+
+
+class LRUBackend:
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        moves = self.entries.get(key)
+        if moves is not None:
+            self.entries.move_to_end(key)
+        return moves
+
+    def put_many(self, items):
+        for key, moves in items:
+            self.entries[key] = moves
+            self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+
+class SQLiteBackend:
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS solutions (key TEXT PRIMARY KEY, moves TEXT NOT NULL)")
+        # Rows from an older key scheme can never be hit again
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != KEY_VERSION:
+            self.conn.execute("DELETE FROM solutions")
+            self.conn.execute(f"PRAGMA user_version = {KEY_VERSION}")
+        self.conn.commit()
+
+    def get(self, key):
+        row = self.conn.execute("SELECT moves FROM solutions WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put_many(self, items):
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO solutions (key, moves) VALUES (?, ?)", items)
+
+    def close(self):
+        self.conn.close()
+
+
+class SolutionCache:
+    """Answer repeated queries from cached optimal move sequences.
+
+    backends are checked in order (e.g. an LRUBackend in front of an
+    SQLiteBackend) and a hit in a slower one is copied into the faster
+    ones. Every state on a solved path is stored with its remaining moves,
+    so later queries passing through that path are answered directly.
+    """
+
+    def __init__(self, *backends):
+        self.backends = list(backends) or [LRUBackend()]
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        for level, backend in enumerate(self.backends):
+            moves = backend.get(key)
+            if moves is not None:
+                for faster in self.backends[:level]:
+                    faster.put_many([(key, moves)])
+                return moves
+        return None
+
+    def store(self, target_state, result):
+        codes = ''.join(MOVE_CODES[m] for m in result.moves)
+        items = [(canonical_key(state, target_state), codes[i:]) for i, state in enumerate(result.path)]
+        for backend in self.backends:
+            backend.put_many(items)
+
+    def solve(self, start_state, target_state, mode="auto", heuristic=None, **limits):
+        key = canonical_key(start_state, target_state)
+        codes = self.lookup(key)
+        if codes is not None:
+            self.hits += 1
+            return SearchResult(replay(start_state, [CODE_MOVES[c] for c in codes]))
+
+        self.misses += 1
+        result = solve(start_state, target_state, mode, heuristic, **limits)
+        # Every mode returns optimal paths, so each suffix is optimal too
+        if result:
+            self.store(target_state, result)
+        return result
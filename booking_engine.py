@@ -0,0 +1,147 @@
+import asyncio
+import threading
+
+from expert import CargoFlight, PassengerFlight
+
+
+class BookingEngine:
+    """Thread-safe front end to a Scheduler.
+
+    Each flight has its own lock, so bookings and cargo reservations on
+    different flights run concurrently while the capacity or weight check
+    and the update it guards are atomic for any one flight. Scheduling,
+    cancelling and rescheduling change the shared schedule indexes and
+    are serialized on one scheduler lock; they also take the flight's lock,
+    so a booking can never land on a flight that is being cancelled.
+
+    The engine listens to the scheduler and drops a flight's lock when the
+    flight is cancelled, so locks do not pile up as flights come and go.
+    """
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.schedule_lock = threading.RLock()
+        self.locks = {}  # flight_id -> threading.Lock, for scheduled flights only
+        self.locks_lock = threading.Lock()
+        self.replacing = None  # flight_id being rescheduled in place by schedule_flight
+        scheduler.add_listener(self)
+
+    def lock_for(self, flight_id, create=False):
+        """The flight's lock, or None if no such flight is scheduled. With
+        create=True the lock is made for a flight about to be scheduled."""
+        lock = self.locks.get(flight_id)
+        if lock is None:
+            with self.locks_lock:
+                lock = self.locks.get(flight_id)
+                # Checked under locks_lock: cancel_flight removes the flight
+                # before the lock, so a lock is never made for a gone flight
+                if lock is None and (create or flight_id in self.scheduler.flights):
+                    lock = self.locks[flight_id] = threading.Lock()
+        return lock
+
+    def drop_lock(self, flight_id):
+        with self.locks_lock:
+            self.locks.pop(flight_id, None)
+
+    def on_flight_cancelled(self, flight):
+        # A flight replaced by schedule_flight keeps the lock being held
+        if flight.flight_id != self.replacing:
+            self.drop_lock(flight.flight_id)
+
+    def with_flight(self, flight_id, kind, action, *args):
+        while True:
+            lock = self.lock_for(flight_id)
+            if lock is None:
+                return False
+            with lock:
+                if self.locks.get(flight_id) is not lock:
+                    continue  # cancelled while we waited; a new flight may have the id now
+                flight = self.scheduler.flights.get(flight_id)
+                if not isinstance(flight, kind):
+                    return False
+                return action(flight, *args)
+
+    def book_seat(self, flight_id, passenger):
+        return self.with_flight(flight_id, PassengerFlight, PassengerFlight.book_seat, passenger)
+
+    def book_many(self, flight_id, passengers):
+        """Book a batch under one lock acquisition, returning True/False per passenger"""
+        result = self.with_flight(flight_id, PassengerFlight, PassengerFlight.book_many, passengers)
+        return result or [False] * len(passengers)
+
+    def cancel_booking(self, flight_id, passenger_id):
+        return self.with_flight(flight_id, PassengerFlight, PassengerFlight.cancel_booking, passenger_id)
+
+    def add_cargo(self, flight_id, cargo):
+        return self.with_flight(flight_id, CargoFlight, CargoFlight.add_cargo, cargo)
+
+    def remove_cargo(self, flight_id, cargo_id):
+        return self.with_flight(flight_id, CargoFlight, CargoFlight.remove_cargo, cargo_id)
+
+    def schedule_flight(self, flight, check_conflicts=True):
+        flight_id = flight.flight_id
+        with self.schedule_lock, self.lock_for(flight_id, create=True):
+            self.replacing = flight_id
+            try:
+                scheduled = self.scheduler.schedule_flight(flight, check_conflicts)
+            finally:
+                self.replacing = None
+            if flight_id not in self.scheduler.flights:
+                self.drop_lock(flight_id)
+            return scheduled
+
+    def cancel_flight(self, flight_id):
+        with self.schedule_lock:
+            lock = self.lock_for(flight_id)
+            if lock is None:
+                return False
+            with lock:
+                return self.scheduler.cancel_flight(flight_id)
+
+    def reschedule(self, flight_id, new_departure, new_arrival):
+        with self.schedule_lock:
+            lock = self.lock_for(flight_id)
+            if lock is None:
+                return False
+            with lock:
+                flight = self.scheduler.flights.get(flight_id)
+                if flight is None:
+                    return False
+                return flight.reschedule(new_departure, new_arrival)
+
+
+class AsyncBookingEngine:
+    """asyncio API over a BookingEngine. Calls run on an executor so that
+    lock waits and store writes never block the event loop."""
+
+    def __init__(self, engine, executor=None):
+        self.engine = engine
+        self.executor = executor
+
+    async def call(self, method, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, method, *args)
+
+    async def book_seat(self, flight_id, passenger):
+        return await self.call(self.engine.book_seat, flight_id, passenger)
+
+    async def book_many(self, flight_id, passengers):
+        return await self.call(self.engine.book_many, flight_id, passengers)
+
+    async def cancel_booking(self, flight_id, passenger_id):
+        return await self.call(self.engine.cancel_booking, flight_id, passenger_id)
+
+    async def add_cargo(self, flight_id, cargo):
+        return await self.call(self.engine.add_cargo, flight_id, cargo)
+
+    async def remove_cargo(self, flight_id, cargo_id):
+        return await self.call(self.engine.remove_cargo, flight_id, cargo_id)
+
+    async def schedule_flight(self, flight, check_conflicts=True):
+        return await self.call(self.engine.schedule_flight, flight, check_conflicts)
+
+    async def cancel_flight(self, flight_id):
+        return await self.call(self.engine.cancel_flight, flight_id)
+
+    async def reschedule(self, flight_id, new_departure, new_arrival):
+        return await self.call(self.engine.reschedule, flight_id, new_departure, new_arrival)
@@ -0,0 +1,53 @@
+import os
+from functools import lru_cache
+
+from chat_patterns import books, patterns
+
+# chatbot.py wraps these in st.cache_resource, so each is built once per
+# process rather than on every Streamlit rerun. Setting BOOKWORLD_NO_CACHE
+# turns the cache off, for timing the difference (chatbot_bench.py reruns).
+CATALOG_ENV = "BOOKWORLD_CATALOG"
+NO_CACHE_ENV = "BOOKWORLD_NO_CACHE"
+# Chat history: messages kept in memory per session, and an optional
+# SQLite file for the older ones (otherwise compressed in memory)
+HISTORY_WINDOW_ENV = "BOOKWORLD_HISTORY_WINDOW"
+HISTORY_DB_ENV = "BOOKWORLD_HISTORY_DB"
+HISTORY_WINDOW = 200
+
+
+def build_chatbot():
+    # nltk is only imported once a message actually needs the chatbot
+    from nltk.chat.util import reflections
+
+    from intent_matcher import IntentMatcher
+    return IntentMatcher(patterns, reflections)
+
+
+def build_catalog(source=None):
+    """Catalog from `source` (a .csv or SQLite path), else the sample books"""
+    from catalog import Catalog, open_catalog
+    if source:
+        return open_catalog(source)
+    return Catalog.from_dict(books)
+
+
+def catalog_source():
+    return os.environ.get(CATALOG_ENV) or None
+
+
+def caching_enabled():
+    return not os.environ.get(NO_CACHE_ENV)
+
+
+@lru_cache(maxsize=None)
+def history_db(path):
+    # One connection per file for every session in the process
+    from chat_history import open_history_db
+    return open_history_db(path)
+
+
+def new_history(session_id):
+    from chat_history import ChatHistory, SQLiteSpill
+    window = int(os.environ.get(HISTORY_WINDOW_ENV) or HISTORY_WINDOW)
+    path = os.environ.get(HISTORY_DB_ENV)
+    return ChatHistory(window, SQLiteSpill(path, session_id, history_db(path)) if path else None)
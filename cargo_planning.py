@@ -0,0 +1,236 @@
+import math
+import operator
+import re
+from array import array
+
+from expert import CargoFlight
+
+# Knapsack tables work in whole weight units. When every weight is a whole
+# number of some step (to the gram) and the capacity fits the cell budget
+# in those steps, the step is the unit and the table is exact. Otherwise
+# the unit is capacity / cell budget: weights are rounded up and capacity
+# down, so a plan never overloads a flight, but it can fall short of the
+# optimum by up to one unit per loaded item.
+MAX_CELLS = 1 << 17
+MAX_VALUE_WORK = 5000000
+# Only the best items by value per kg, up to this multiple of the
+# capacity, go into a value knapsack; the rest would almost never be picked
+CORE_FACTOR = 2
+NONZERO = re.compile(rb"[^\x00]")
+
+
+class LoadPlan:
+    def __init__(self, flights):
+        self.flights = {flight.flight_id: flight for flight in flights}
+        self.assignments = {flight_id: [] for flight_id in self.flights}
+        self.unassigned = []
+
+    def loaded_weight(self):
+        return sum(cargo.weight for items in self.assignments.values() for cargo in items)
+
+    def total_value(self, value):
+        return sum(value(cargo) for items in self.assignments.values() for cargo in items)
+
+    def utilization(self):
+        capacity = sum(flight.available_cargo_space() for flight in self.flights.values())
+        return self.loaded_weight() / capacity if capacity else 0.0
+
+    def apply(self):
+        """Load the planned items, returning the ones that no longer fit"""
+        rejected = []
+        for flight_id, items in self.assignments.items():
+            flight = self.flights[flight_id]
+            rejected.extend(cargo for cargo in items if not flight.add_cargo(cargo))
+        return rejected
+
+
+def units(items, capacity, max_cells):
+    if capacity <= 0:
+        return [1 if cargo.weight > 0 else 0 for cargo in items], 0
+    grams = [cargo.weight * 1000 for cargo in items]
+    step = 0
+    if all(abs(g - round(g)) < 1e-6 for g in grams):
+        grams = [round(g) for g in grams]
+        step = math.gcd(*grams)
+    if step and capacity * 1000 / step <= max_cells:
+        return [g // step for g in grams], math.floor(capacity * 1000 / step + 1e-9)
+    unit = capacity / max_cells
+    return [math.ceil(cargo.weight / unit) for cargo in items], max_cells
+
+
+def best_weight_subset(items, capacity, max_cells=MAX_CELLS):
+    """Indexes of the items whose total weight comes closest to capacity.
+
+    Subset sum on a Python int used as a bitset: bit s is set once some
+    subset weighs s units, so each item costs one shift-and-or over the
+    whole table. For reconstruction each sum remembers the item that first
+    reached it; a sum is only ever reached once, so that stays linear."""
+    weights, cells = units(items, capacity, max_cells)
+    full = (1 << (cells + 1)) - 1
+    reach = 1
+    first = array('i', [-1]) * (cells + 1)
+    for i, w in enumerate(weights):
+        if w > cells:
+            continue
+        new = (reach << w) & full & ~reach
+        if not new:
+            continue
+        reach |= new
+        raw = new.to_bytes((cells + 8) // 8, 'little')
+        for match in NONZERO.finditer(raw):
+            byte = raw[match.start()]
+            base = match.start() * 8
+            for bit in range(8):
+                if byte >> bit & 1:
+                    first[base + bit] = i
+        if reach >> cells & 1:
+            break  # filled exactly
+    chosen = []
+    s = reach.bit_length() - 1
+    while s > 0:
+        i = first[s]
+        chosen.append(i)
+        s -= weights[i]
+    return chosen
+
+
+def best_value_subset(items, capacity, value, max_work=MAX_VALUE_WORK):
+    """Indexes of the most valuable items that fit, by 0-1 knapsack DP.
+
+    The table is sized so items x cells stays within max_work, which bounds
+    the runtime; rows are built with map() so the inner loop runs in C."""
+    items = list(items)
+    if not items:
+        return []
+    weights, cells = units(items, capacity, max(1, max_work // len(items)))
+    best = [0] * (cells + 1)  # best value within c units
+    taken = []
+    for w, cargo in zip(weights, items):
+        if w > cells:
+            taken.append(None)
+            continue
+        v = value(cargo)
+        with_item = [total + v for total in best[:cells + 1 - w]]
+        taken.append(bytes(w) + bytes(map(operator.gt, with_item, best[w:])))
+        best = best[:w] + list(map(max, best[w:], with_item))
+    chosen = []
+    c = cells
+    for i in range(len(items) - 1, -1, -1):
+        if taken[i] is not None and taken[i][c]:
+            chosen.append(i)
+            c -= weights[i]
+    return chosen
+
+
+def density_order(items, value):
+    return sorted(items, key=lambda cargo: value(cargo) / cargo.weight if cargo.weight else math.inf,
+                  reverse=True)
+
+
+def core(items, capacity, value):
+    ordered = density_order(items, value)
+    weight = 0.0
+    for index, cargo in enumerate(ordered):
+        weight += cargo.weight
+        if weight > CORE_FACTOR * capacity:
+            return ordered[:index + 1]
+    return ordered
+
+
+def plan_single(flight, items, value=None, max_cells=MAX_CELLS, max_work=MAX_VALUE_WORK):
+    """Optimal load for one flight: the heaviest fitting subset of items,
+    or the most valuable one when value(cargo) is given. It is exact when
+    the weights share a step fine enough for the table (see units());
+    otherwise it is optimal up to that rounding. The knapsack's
+    rounding slack is then topped up greedily with whatever still fits,
+    and the first-fit load (largest or densest first, or in arrival
+    order) is returned instead if it does better."""
+    items = list(items)
+    capacity = flight.available_cargo_space()
+    fitting = [cargo for cargo in items if cargo.weight <= capacity]
+    if value is None:
+        candidates = fitting
+        chosen = best_weight_subset(candidates, capacity, max_cells)
+    else:
+        candidates = core(fitting, capacity, value)
+        chosen = best_value_subset(candidates, capacity, value, max_work)
+    loaded = [candidates[i] for i in sorted(chosen)]
+    kept = {id(cargo) for cargo in loaded}
+    room = capacity - sum(cargo.weight for cargo in loaded)
+    for cargo in greedy_order([cargo for cargo in fitting if id(cargo) not in kept], value):
+        if cargo.weight <= room:
+            room -= cargo.weight
+            loaded.append(cargo)
+            kept.add(id(cargo))
+
+    # Rounding can cost the knapsack more than either greedy order loses:
+    # never return less than first-fit decreasing or plain arrival order
+    greedy = max((first_fit([flight], order) for order in (greedy_order(items, value), items)),
+                 key=lambda plan: gain(plan, flight, value))
+    if gain(greedy, flight, value) >= total(loaded, value):
+        return greedy
+    plan = LoadPlan([flight])
+    plan.assignments[flight.flight_id] = loaded
+    plan.unassigned = [cargo for cargo in items if id(cargo) not in kept]
+    return plan
+
+
+def greedy_order(items, value):
+    if value is None:
+        return sorted(items, key=lambda cargo: cargo.weight, reverse=True)
+    return density_order(items, value)
+
+
+def first_fit(flights, items):
+    """Each item, in the order given, into the first flight with room"""
+    plan = LoadPlan(flights)
+    space = [flight.available_cargo_space() for flight in flights]
+    for cargo in items:
+        for index, room in enumerate(space):
+            if cargo.weight <= room:
+                space[index] = room - cargo.weight
+                plan.assignments[flights[index].flight_id].append(cargo)
+                break
+        else:
+            plan.unassigned.append(cargo)
+    return plan
+
+
+def plan_batch(flights, items, value=None, refine=True, max_work=MAX_VALUE_WORK):
+    """Spread items over several flights by first-fit decreasing.
+
+    Items go heaviest first (highest value per kg first when value is
+    given) into the first flight with room. With refine=True each flight
+    then gets one knapsack pass over its own items plus everything still
+    unassigned, which fills the gaps first-fit leaves; the flights share
+    max_work so the whole batch stays within one knapsack's budget."""
+    flights = list(flights)
+    plan = first_fit(flights, greedy_order(items, value))
+    if refine and plan.unassigned:
+        for flight in flights:
+            pool = plan.assignments[flight.flight_id] + plan.unassigned
+            single = plan_single(flight, pool, value, max_work=max_work // len(flights))
+            if gain(single, flight, value) > gain(plan, flight, value):
+                plan.assignments[flight.flight_id] = single.assignments[flight.flight_id]
+                plan.unassigned = single.unassigned
+    return plan
+
+
+def total(items, value):
+    if value is None:
+        return sum(cargo.weight for cargo in items)
+    return sum(value(cargo) for cargo in items)
+
+
+def gain(plan, flight, value):
+    return total(plan.assignments[flight.flight_id], value)
+
+
+def plan_route(scheduler, source, destination, items, value=None):
+    """Plan items over every cargo flight scheduled from source to destination"""
+    flights = [flight for flight in scheduler.get_flights_by_criteria('source', source)
+               if isinstance(flight, CargoFlight) and flight.destination.casefold() == destination.casefold()]
+    flights.sort(key=lambda flight: flight.departure)
+    if len(flights) == 1:
+        return plan_single(flights[0], items, value)
+    return plan_batch(flights, items, value)
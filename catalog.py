@@ -0,0 +1,170 @@
+import csv
+import heapq
+import re
+import sqlite3
+from array import array
+from collections import Counter
+from functools import lru_cache
+from operator import itemgetter
+
+NON_WORD = re.compile(r"[\W_]+")
+# A title within two typos of the query keeps all but six of its trigrams,
+# so it appears in at least one of the query's seven rarest; count a couple
+# more for slack, reading at most MAX_POSTINGS posting entries in all
+RAREST_GRAMS = 9
+MAX_POSTINGS = 8000
+# Titles rescored exactly per query
+SHORTLIST = 64
+
+
+def normalize(text):
+    return NON_WORD.sub(" ", text.casefold()).strip()
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Catalog:
+    """Book catalog with an inverted token index and a trigram index, both
+    built once. Posting lists are array('I') of book ids in id order.
+
+    search() ranks titles by trigram overlap with the query (Dice
+    coefficient), so misspelt, partial or reordered titles still match.
+    """
+
+    def __init__(self):
+        self.titles = []
+        self.categories = []  # category per book id
+        self.keys = []  # normalized title per book id
+        self.by_key = {}  # normalized title -> first book id
+        self.category_names = {}  # normalized category -> display name
+        self.by_category = {}  # display name -> array of book ids
+        self.tokens = {}  # token -> array of book ids
+        self.grams = {}  # trigram -> array of book ids
+
+    def add(self, title, category):
+        book_id = len(self.titles)
+        key = normalize(title)
+        category_key = normalize(category)
+        self.titles.append(title)
+        category = self.category_names.setdefault(category_key, category)
+        self.categories.append(category)
+        if category not in self.by_category:
+            self.by_category[category] = array('I')
+        self.by_category[category].append(book_id)
+        self.keys.append(key)
+        self.by_key.setdefault(key, book_id)
+        for token in set(key.split()):
+            postings = self.tokens.get(token)
+            if postings is None:
+                postings = self.tokens[token] = array('I')
+            postings.append(book_id)
+        for gram in trigrams(key):
+            postings = self.grams.get(gram)
+            if postings is None:
+                postings = self.grams[gram] = array('I')
+            postings.append(book_id)
+        return book_id
+
+    @classmethod
+    def from_rows(cls, rows):
+        catalog = cls()
+        for title, category in rows:
+            catalog.add(title, category)
+        return catalog
+
+    @classmethod
+    def from_dict(cls, books):
+        return cls.from_rows((title, category) for category, titles in books.items() for title in titles)
+
+    @classmethod
+    def from_csv(cls, path):
+        with open(path, newline='', encoding='utf-8') as f:
+            return cls.from_rows((row['title'], row['category']) for row in csv.DictReader(f))
+
+    @classmethod
+    def from_sqlite(cls, path, table='books'):
+        conn = sqlite3.connect(path)
+        try:
+            return cls.from_rows(conn.execute(f"SELECT title, category FROM {table} ORDER BY rowid"))
+        finally:
+            conn.close()
+
+    def __len__(self):
+        return len(self.titles)
+
+    def find_category(self, text):
+        """Display name of the category text names, tolerating case and a typo"""
+        key = normalize(text)
+        if key in self.category_names:
+            return self.category_names[key]
+        grams = trigrams(key)
+        best, score = None, 0.0
+        for category_key, name in self.category_names.items():
+            other = trigrams(category_key)
+            similarity = 2 * len(grams & other) / (len(grams) + len(other))
+            if similarity > score:
+                best, score = name, similarity
+        return best if score >= 0.5 else None
+
+    def in_category(self, category, limit=None):
+        ids = self.by_category.get(category, ())
+        return [self.titles[book_id] for book_id in ids[:limit]]
+
+    def search(self, query, category=None, limit=5):
+        """Up to `limit` (score, title) pairs, best first; an exact title
+        scores 1.0.
+
+        Titles are shortlisted by how many of the query's rarest trigrams
+        they contain, tallied straight off the posting lists, plus titles
+        holding every query word (from the token index). Only the shortlist
+        is ranked by the Dice coefficient of the full trigram sets."""
+        key = normalize(query)
+        if not key:
+            return []
+        exact = self.by_key.get(key)
+        if exact is not None and (category is None or self.categories[exact] == category):
+            return [(1.0, self.titles[exact])]
+        grams = trigrams(key)
+        postings = sorted((self.grams[gram] for gram in grams if gram in self.grams), key=len)
+        counts = Counter()
+        budget = MAX_POSTINGS
+        for ids in postings[:RAREST_GRAMS]:
+            if len(ids) > budget and counts:
+                break
+            counts.update(ids[:budget])
+            budget -= len(ids)
+        tallies = counts.items()
+        if category is not None:
+            tallies = [(book_id, n) for book_id, n in tallies if self.categories[book_id] == category]
+        shortlist = [book_id for book_id, _ in heapq.nlargest(SHORTLIST, tallies, key=itemgetter(1))]
+
+        words = sorted((self.tokens.get(token, ()) for token in set(key.split())), key=len)
+        if words and 0 < len(words[0]) <= MAX_POSTINGS:
+            both = set(words[0])
+            for ids in words[1:]:
+                both.intersection_update(ids)
+            if len(both) <= SHORTLIST:
+                shortlist.extend(both)
+
+        scored = {}
+        for book_id in shortlist:
+            if book_id in scored or (category is not None and self.categories[book_id] != category):
+                continue
+            other = trigrams(self.keys[book_id])
+            scored[book_id] = 2 * len(grams & other) / (len(grams) + len(other))
+        best = heapq.nlargest(limit, scored.items(), key=lambda item: (item[1], -item[0]))
+        return [(round(score, 3), self.titles[book_id]) for book_id, score in best]
+
+
+def open_catalog(source):
+    """Catalog from a .csv or SQLite file path"""
+    if source.endswith('.csv'):
+        return Catalog.from_csv(source)
+    return Catalog.from_sqlite(source)
+
+
+# Built once per process (chatbot.py caches through Streamlit instead)
+load_catalog = lru_cache(maxsize=4)(open_catalog)
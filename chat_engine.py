@@ -0,0 +1,197 @@
+import argparse
+import asyncio
+import functools
+import json
+import re
+import time
+from collections import OrderedDict
+
+from bot_resources import build_catalog, build_chatbot, catalog_source, new_history
+
+# Fuzzy title matches scoring at least BOOK_MATCH are taken as the book
+# meant; weaker ones down to SUGGEST_MATCH are offered as suggestions
+BOOK_MATCH = 0.6
+SUGGEST_MATCH = 0.3
+SHOWN_TITLES = 10
+
+START_ORDER = re.compile(r'\bstart\s+order\b')
+YES = ('yes', 'y', 'yeah', 'yep', 'sure')
+FALLBACK = "I'm not sure how to respond to that. Can I help you find a book or place an order?"
+
+
+class Session:
+    """One conversation: where it is in the order flow, what has been
+    chosen so far, and its chat history"""
+
+    def __init__(self, session_id, history):
+        self.session_id = session_id
+        self.history = history
+        self.order_mode = False
+        self.step = 0
+        self.category = None
+        self.book = None
+        self.last_seen = time.monotonic()
+
+
+class ConversationEngine:
+    """The BookWorld conversation with no UI attached. All state lives in
+    the Session passed to respond(), so one engine serves any number of
+    sessions. `chatbot` is called for the intent matcher the first time a
+    message needs one."""
+
+    def __init__(self, catalog, chatbot):
+        self.catalog = catalog
+        self.chatbot = chatbot
+        self.category_list = ", ".join(catalog.by_category)
+        self.steps = {0: self.step_0, 1: self.step_1, 2: self.step_2}
+
+    def respond(self, session, message):
+        session.history.append("user", message)
+        if session.order_mode:
+            response = self.steps[session.step](session, message)
+        elif START_ORDER.search(message.lower()):
+            session.order_mode = True
+            session.step = 0
+            response = f"Ok let's start. Which category book would you like to browse? ({self.category_list})"
+        else:
+            response = self.chatbot().respond(message) or FALLBACK
+        session.history.append("assistant", response)
+        return response
+
+    def step_0(self, session, message):
+        category = self.catalog.find_category(message)
+        if category is None:
+            return f"Category not found. Please choose from {self.category_list}."
+        session.category = category
+        session.step = 1
+        titles = self.catalog.in_category(category, SHOWN_TITLES)
+        more = " and more" if len(self.catalog.by_category[category]) > len(titles) else ""
+        return f"You selected {category} category. We have {', '.join(titles)}{more} books for this category. Which one would you like to buy? You can also type 'nothing' if you would like to exit."
+
+    def step_1(self, session, message):
+        if message.lower() == 'nothing':
+            session.order_mode = False
+            session.step = 0
+            return "Thank you for chatting with us. Feel free to browse more books!"
+
+        # Look the title up in the selected category, allowing for typos
+        category = session.category
+        matches = self.catalog.search(message, category, limit=3)
+        if not matches or matches[0][0] < BOOK_MATCH or (len(matches) > 1 and matches[1][0] == matches[0][0]):
+            suggestions = [title for score, title in matches if score >= SUGGEST_MATCH]
+            if suggestions:
+                return f"Sorry, we don't have '{message}' in our {category} collection. Did you mean: {', '.join(suggestions)}?"
+            return f"Sorry, we don't have '{message}' in our {category} collection. Please select from: {', '.join(self.catalog.in_category(category, SHOWN_TITLES))}"
+
+        session.book = matches[0][1]
+        session.step = 2
+        return f"'{session.book}' added to your cart. Cost is ₹500. Should I confirm the order? (yes/no)"
+
+    def step_2(self, session, message):
+        session.order_mode = False
+        session.step = 0
+
+        if message.lower() in YES:
+            return "Order confirmed! Your book will be delivered soon. Thank you for shopping with BookWorld! 📖"
+        else:
+            return "No worries! Your order has been cancelled. Feel free to browse more books!"
+
+
+class ChatServer:
+    """Sessions of one ConversationEngine served over asyncio, as JSON
+    lines: each request {"session": id, "message": text} is answered with
+    {"session": id, "response": text}, and {"stats": true} with session
+    counts. A connection may carry many sessions and a session may move
+    between connections. Sessions idle for `ttl` seconds are evicted."""
+
+    def __init__(self, engine, ttl=1800.0, history=new_history):
+        self.engine = engine
+        self.ttl = ttl
+        self.new_history = history
+        self.sessions = OrderedDict()  # session id -> Session, least recently active first
+        self.evicted = 0
+
+    def session(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = self.sessions[session_id] = Session(session_id, self.new_history(session_id))
+        else:
+            self.sessions.move_to_end(session_id)
+        session.last_seen = time.monotonic()
+        return session
+
+    def respond(self, session_id, message):
+        return self.engine.respond(self.session(session_id), message)
+
+    def evict(self, now=None):
+        """Drop sessions idle longer than the TTL, returning how many"""
+        cutoff = (time.monotonic() if now is None else now) - self.ttl
+        count = 0
+        while self.sessions:
+            oldest = next(iter(self.sessions.values()))
+            if oldest.last_seen > cutoff:
+                break
+            self.sessions.popitem(last=False)
+            oldest.history.close()
+            count += 1
+        self.evicted += count
+        return count
+
+    async def evict_idle(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            self.evict()
+
+    async def client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if request.get('stats'):
+                        reply = {'sessions': len(self.sessions), 'evicted': self.evicted}
+                    else:
+                        reply = {'session': request['session'],
+                                 'response': self.respond(str(request['session']), str(request['message']))}
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    reply = {'error': 'expected {"session": ..., "message": ...}'}
+                writer.write(json.dumps(reply, ensure_ascii=False).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765, ready=None):
+        server = await asyncio.start_server(self.client, host, port)
+        evictor = asyncio.create_task(self.evict_idle(min(self.ttl, 60.0)))
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[1])
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            evictor.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BookWorld chatbot over a JSON-lines socket")
+    parser.add_argument("--catalog", help="catalog .csv or SQLite file (default: $BOOKWORLD_CATALOG or the sample books)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ttl", type=float, default=1800.0, help="seconds before an idle session is evicted")
+    args = parser.parse_args()
+
+    engine = ConversationEngine(build_catalog(args.catalog or catalog_source()), functools.cache(build_chatbot))
+    server = ChatServer(engine, args.ttl)
+    print(f"Serving BookWorld chat on {args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import json
+import sqlite3
+import threading
+import zlib
+from collections import deque
+
+# Spilled messages are compressed this many at a time
+SPILL_BLOCK = 64
+
+
+class CompressedSpill:
+    """Messages that fell out of a ChatHistory window, kept in memory as
+    zlib-compressed blocks of JSON lines. Only the newest, unfilled block
+    stays as plain dicts."""
+
+    def __init__(self, block=SPILL_BLOCK):
+        self.block = block
+        self.blocks = []  # compressed, `block` messages each
+        self.pending = []
+        self.count = 0
+
+    def append(self, message):
+        self.pending.append(message)
+        self.count += 1
+        if len(self.pending) == self.block:
+            lines = "\n".join(json.dumps(item, ensure_ascii=False) for item in self.pending)
+            self.blocks.append(zlib.compress(lines.encode()))
+            self.pending = []
+
+    def __len__(self):
+        return self.count
+
+    def slice(self, start, end):
+        """Messages [start, end) in the order they were spilled"""
+        messages = []
+        for index in range(start // self.block, (end - 1) // self.block + 1):
+            if index < len(self.blocks):
+                block = [json.loads(line) for line in zlib.decompress(self.blocks[index]).decode().split("\n")]
+            else:
+                block = self.pending
+            offset = index * self.block
+            messages.extend(block[max(start - offset, 0):end - offset])
+        return messages
+
+    def nbytes(self):
+        return sum(map(len, self.blocks))
+
+    def close(self):
+        self.blocks = []
+        self.pending = []
+        self.count = 0
+
+
+def open_history_db(path):
+    """A connection for SQLiteSpill, meant to be shared by every session"""
+    conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS chat_history (session TEXT, seq INTEGER, role TEXT, "
+                 "content TEXT, PRIMARY KEY (session, seq)) WITHOUT ROWID")
+    return conn
+
+
+class SQLiteSpill:
+    """Spilled messages in a SQLite table keyed by session, so they also
+    outlive the process. Pass `conn` (from open_history_db) to share one
+    connection between sessions; otherwise the spill opens its own and
+    close() closes it."""
+
+    def __init__(self, path, session_id, conn=None):
+        self.session_id = session_id
+        self.owns_conn = conn is None
+        if conn is None:
+            conn = open_history_db(path)
+        self.conn = conn
+        self.lock = threading.Lock()
+        self.count = conn.execute("SELECT COUNT(*) FROM chat_history WHERE session = ?", (session_id,)).fetchone()[0]
+
+    def append(self, message):
+        with self.lock:
+            self.conn.execute("INSERT INTO chat_history VALUES (?, ?, ?, ?)",
+                              (self.session_id, self.count, message["role"], message["content"]))
+            self.count += 1
+
+    def __len__(self):
+        return self.count
+
+    def slice(self, start, end):
+        rows = self.conn.execute("SELECT role, content FROM chat_history WHERE session = ? AND seq >= ? AND seq < ? "
+                                 "ORDER BY seq", (self.session_id, start, end))
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def close(self):
+        if self.owns_conn:
+            self.conn.close()
+
+
+class ChatHistory:
+    """A session's messages: the newest `window` in a ring buffer, older
+    ones handed to `spill` (a CompressedSpill unless given). With window=0
+    every message goes straight to the spill. Messages are numbered from 0
+    in the order they were added."""
+
+    def __init__(self, window=200, spill=None):
+        self.recent = deque(maxlen=window)
+        self.spill = CompressedSpill() if spill is None else spill
+
+    def append(self, role, content):
+        message = {"role": role, "content": content}
+        if not self.recent.maxlen:
+            self.spill.append(message)
+            return
+        if len(self.recent) == self.recent.maxlen:
+            self.spill.append(self.recent[0])
+        self.recent.append(message)
+
+    def __len__(self):
+        return len(self.spill) + len(self.recent)
+
+    def close(self):
+        """Release the spill store; the history is not used afterwards"""
+        self.spill.close()
+
+    def last(self, count):
+        """The newest `count` messages, oldest first"""
+        return self.page(len(self) - count, len(self))
+
+    def page(self, start, end):
+        """Messages numbered [start, end), oldest first"""
+        start, end = max(start, 0), min(end, len(self))
+        if start >= end:
+            return []
+        spilled = len(self.spill)
+        messages = self.spill.slice(start, min(end, spilled)) if start < spilled else []
+        recent = self.recent
+        messages.extend(recent[i - spilled] for i in range(max(start, spilled), end))
+        return messages
@@ -0,0 +1,36 @@
+# Book inventory
+books = {
+    'fiction': ["The Alchemist", "1984", "The Great Gatsby"],
+    'non-fiction': ["Sapiens", "Atomic Habits", "Educated"],
+    'academic': ["Engineering Mathematics", "Human Anatomy", "Principles of Management"]
+}
+
+# Conversation patterns
+patterns = [
+    (r'hi|hello|hey', [
+        'Hello! Welcome to BookWorld 📚. How can I assist you today?',
+        'Hey there! Need help with books or orders?',
+        'Hi! Looking for something to read?']),
+    (r'how are you', [
+        "I'm just a bot, but I'm here to help you find the perfect book!"]),
+    (r'(.*)book(.*)', [
+        'We have fiction, non-fiction, and academic books. What are you looking for?']),
+    (r'(.*)fiction(.*)', [
+        f"Our fiction section includes: {', '.join(books['fiction'])}. Would you like to buy one?"]),
+    (r'(.*)non[- ]fiction(.*)', [
+        f"Our non-fiction books include: {', '.join(books['non-fiction'])}. Would you like to buy one?"]),
+    (r'(.*)academic(.*)', [
+        f"Our academic books include: {', '.join(books['academic'])}. Interested in purchasing?"]),
+    (r'(.*)price(.*)|(.*)cost(.*)', [
+        'Most books range from ₹200 to ₹1500 depending on the category and author.']),
+    (r'(.*)buy(.*)|(.*)order(.*)', [
+        "Great! Let's proceed with your order. Type 'start order' to begin."]),
+    (r'(.*)help(.*)', [
+        'I can assist you with book categories, prices, and placing orders.']),
+    (r'(.*)contact(.*)', [
+        'You can email us at support@bookworld.com or call 1800-BOOK-123.']),
+    (r'(.*)bye|goodbye|exit', [
+        'Thank you for visiting BookWorld! 📖 Goodbye!']),
+    (r'(yes|yeah|yep)', [
+        "Great! Let's proceed with your order. Type 'start order' to begin."]),
+]
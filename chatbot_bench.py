@@ -0,0 +1,419 @@
+import argparse
+import asyncio
+import csv
+import functools
+import gc
+import importlib.util
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from bot_resources import CATALOG_ENV, NO_CACHE_ENV, build_catalog, build_chatbot
+from catalog import Catalog
+from chat_engine import ChatServer, ConversationEngine, Session
+from chat_history import ChatHistory, SQLiteSpill
+from chat_patterns import patterns
+from intent_matcher import IntentMatcher
+
+MESSAGES = ["hi", "hello there", "how are you", "do you have any good books?", "show me fiction",
+            "what non-fiction do you have", "academic titles please", "what is the price", "how much does it cost",
+            "I want to buy something", "where is my order", "help", "contact details?", "bye", "yes",
+            "recommend something", "what's the weather like", "tell me a joke", "thanks a lot",
+            "Can you HELP me pick a BOOK for my sister who likes history?"]
+
+
+class SequentialChat:
+    # nltk.chat.util.Chat's matching loop, for comparison: one re.match per
+    # pattern, in order
+    def __init__(self, pairs):
+        self._pairs = [(re.compile(pattern, re.IGNORECASE), responses) for pattern, responses in pairs]
+
+    def match(self, message):
+        for pattern, responses in self._pairs:
+            found = pattern.match(message)
+            if found:
+                return found, responses
+        return None
+
+
+def adversarial(length, rng):
+    words = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit", "sed", "do"]
+    filler = " ".join(rng.choice(words) for _ in range(length // 5 + 1))[:length]
+    return {
+        "no keyword": filler,
+        "keyword at end": filler + " contact",
+        "keywords after newline": filler + "\n" + "book price cost order help contact " * 2,
+    }
+
+
+def same_match(a, b):
+    if a is None or b is None:
+        return a is b
+    return a[1] is b[1] and a[0].groups() == b[0].groups() and a[0].span() == b[0].span()
+
+
+def bench_intents(args):
+    rng = random.Random(args.seed)
+    sequential = SequentialChat(patterns)
+    matcher = IntentMatcher(patterns)
+
+    # First-match results must agree before timing anything
+    samples = MESSAGES + [rng.choice(MESSAGES).swapcase() + " " + rng.choice(MESSAGES) for _ in range(2000)]
+    for message in samples:
+        if not same_match(sequential.match(message), matcher.match(message)):
+            raise SystemExit(f"matchers disagree on {message!r}")
+
+    messages = [rng.choice(MESSAGES) for _ in range(args.messages)]
+    for name, engine in (("sequential", sequential), ("prefiltered", matcher)):
+        began = time.perf_counter()
+        for message in messages:
+            engine.match(message)
+        print(f"{name:>12}: {len(messages) / (time.perf_counter() - began):10.0f} messages/sec")
+
+    print("worst case on long inputs (ms):")
+    for length in args.lengths:
+        for label, message in adversarial(length, rng).items():
+            timings = []
+            for engine in (sequential, matcher):
+                began = time.perf_counter()
+                engine.match(message)
+                timings.append((time.perf_counter() - began) * 1000)
+            print(f"{length:>8} chars, {label:<24} sequential {timings[0]:9.3f}  prefiltered {timings[1]:9.3f}")
+
+
+STOPWORDS = ["the", "of", "and", "a", "in", "to", "for", "on", "with", "my"]
+CATEGORIES = ["fiction", "non-fiction", "academic", "children", "poetry", "comics", "travel", "cooking"]
+
+
+def make_titles(count, seed):
+    # Made-up words drawn with English letter frequencies, Zipf-ish word use
+    rng = random.Random(seed)
+    letters, frequencies = "etaoinshrdlcumwfgypbvkjxqz", [12, 9, 8, 7.5, 7, 6.7, 6.3, 6, 6, 4.3, 4, 2.8, 2.8, 2.4,
+                                                            2.4, 2.2, 2, 2, 1.9, 1.5, 1, 0.8, 0.2, 0.2, 0.1, 0.1]
+    vocabulary = sorted({"".join(rng.choices(letters, frequencies, k=rng.randrange(3, 10))) for _ in range(50000)})
+    rng.shuffle(vocabulary)
+    weights = list(itertools.accumulate(1 / (rank + 1) ** 0.8 for rank in range(len(vocabulary))))
+    titles = []
+    for _ in range(count):
+        words = rng.choices(vocabulary, cum_weights=weights, k=rng.randrange(1, 5))
+        if rng.random() < 0.6:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(STOPWORDS))
+        titles.append(" ".join(words).title())
+    return titles
+
+
+def typo(text, rng, edits):
+    chars = list(text)
+    for _ in range(edits):
+        i = rng.randrange(len(chars))
+        kind = rng.randrange(3)
+        if kind == 0:
+            chars[i] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+        elif kind == 1 and len(chars) > 1:
+            del chars[i]
+        else:
+            chars.insert(i, rng.choice("abcdefghijklmnopqrstuvwxyz"))
+    return "".join(chars)
+
+
+def bench_catalog(args):
+    rng = random.Random(args.seed)
+    titles = make_titles(args.titles, args.seed)
+    rows = [(title, rng.choice(CATEGORIES)) for title in titles]
+
+    tracemalloc.start()
+    began = time.perf_counter()
+    catalog = Catalog.from_rows(rows)
+    built = time.perf_counter() - began
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{len(catalog)} titles indexed in {built:.1f}s, {size / 2 ** 20:.0f} MiB")
+
+    targets = [rng.randrange(len(titles)) for _ in range(args.queries)]
+    for label, make_query in (("exact", lambda t: t),
+                              ("lowercase", str.lower),
+                              ("1 typo", lambda t: typo(t, rng, 1)),
+                              ("2 typos", lambda t: typo(t, rng, 2)),
+                              ("words swapped", lambda t: " ".join(reversed(t.split())))):
+        latencies, hits = [], 0
+        for target in targets:
+            title = titles[target]
+            query = make_query(title)
+            began = time.perf_counter()
+            results = catalog.search(query, limit=5)
+            latencies.append(time.perf_counter() - began)
+            hits += any(found == title for _, found in results)
+        latencies.sort()
+        print(f"{label:>14}: p50 {latencies[len(latencies) // 2] * 1000:6.3f}ms  "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.3f}ms  found in top 5: {hits / len(targets):6.1%}")
+
+
+RERUN_MESSAGES = ["hi", "start order", "fiction", "grate gatsbi", "yes", "what is the price", "bye"]
+
+
+def summary(timings):
+    ordered = sorted(timings)
+    return (f"p50 {ordered[len(ordered) // 2] * 1000:8.3f}ms  "
+            f"p99 {ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000:8.3f}ms")
+
+
+def catalog_file(titles, seed, directory):
+    rng = random.Random(seed)
+    path = os.path.join(directory, "catalog.csv")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["title", "category"])
+        for title in make_titles(titles, seed):
+            writer.writerow([title, rng.choice(CATEGORIES)])
+    return path
+
+
+def resource_reruns(args, source):
+    # The setup chatbot.py does at the top of every rerun, built fresh as
+    # it used to be, then through a per-process cache as it is now
+    build = build_chatbot
+    if importlib.util.find_spec("nltk") is None:
+        from chat_patterns import patterns
+        from intent_matcher import IntentMatcher
+        print("nltk is not installed: timing IntentMatcher without reflections")
+        build = functools.partial(IntentMatcher, patterns)
+    for label, get_chatbot, get_catalog in (("uncached", build, build_catalog),
+                                            ("cached", functools.cache(build), functools.cache(build_catalog))):
+        timings = []
+        for _ in range(args.reruns):
+            began = time.perf_counter()
+            get_catalog(source)
+            get_chatbot()
+            timings.append(time.perf_counter() - began)
+        print(f"{label:>9} setup per rerun: first {timings[0] * 1000:9.3f}ms  {summary(timings[1:] or timings)}")
+
+    if importlib.util.find_spec("nltk") is not None:
+        for module in ("bot_resources", "nltk.chat.util"):
+            began = time.perf_counter()
+            subprocess.run([sys.executable, "-c", f"import {module}"], check=True,
+                           cwd=os.path.dirname(os.path.abspath(__file__)))
+            print(f"cold import of {module}: {(time.perf_counter() - began) * 1000:.0f}ms (including interpreter start)")
+
+
+def app_reruns(args, source):
+    # Whole-script reruns through Streamlit's headless test runner
+    from streamlit.testing.v1 import AppTest
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chatbot.py")
+    if source:
+        os.environ[CATALOG_ENV] = source
+    for label, disabled in (("uncached", "1"), ("cached", "")):
+        os.environ[NO_CACHE_ENV] = disabled
+        app = AppTest.from_file(script, default_timeout=120)
+        began = time.perf_counter()
+        app.run()
+        first = time.perf_counter() - began
+        timings = []
+        for i in range(args.reruns):
+            app.chat_input[0].set_value(RERUN_MESSAGES[i % len(RERUN_MESSAGES)])
+            began = time.perf_counter()
+            app.run()
+            timings.append(time.perf_counter() - began)
+        print(f"{label:>9} app reruns: first {first * 1000:9.1f}ms  {summary(timings)}")
+    os.environ.pop(NO_CACHE_ENV, None)
+
+
+def bench_reruns(args):
+    with tempfile.TemporaryDirectory() as directory:
+        source = args.catalog
+        if source is None and args.titles:
+            source = catalog_file(args.titles, args.seed, directory)
+        print(f"catalog: {source or 'sample books'}")
+        if args.app:
+            app_reruns(args, source)
+        else:
+            resource_reruns(args, source)
+
+
+def conversation(count, seed):
+    rng = random.Random(seed)
+    for i in range(count):
+        if i % 2 == 0:
+            yield "user", rng.choice(MESSAGES)
+        else:
+            yield "assistant", "Hello! Welcome to BookWorld 📚. " * rng.randrange(1, 4) + f"(reply {i})"
+
+
+def rerun_cost(history, page, reruns):
+    # A rerun renders the whole list, or just the newest page of a ChatHistory
+    gc.collect()
+    began = time.perf_counter()
+    for _ in range(reruns):
+        shown = list(history) if isinstance(history, list) else history.last(page)
+        for message in shown:
+            message["role"], message["content"]
+    return (time.perf_counter() - began) / reruns
+
+
+def bench_history(args):
+    for count in args.messages:
+        print(f"{count} messages:")
+        for label, make in (("list", list),
+                            ("window+zlib", lambda: ChatHistory(args.window)),
+                            ("window+sqlite", lambda: ChatHistory(args.window, SQLiteSpill(":memory:", "s")))):
+            tracemalloc.start()
+            history = make()
+            began = time.perf_counter()
+            for role, content in conversation(count, args.seed):
+                if label == "list":
+                    history.append({"role": role, "content": content})
+                else:
+                    history.append(role, content)
+            appended = time.perf_counter() - began
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+
+            rerun = rerun_cost(history, args.page, args.reruns)
+            line = f"{label:>14}: {size / 2 ** 20:7.2f} MiB  append {appended / count * 1e6:6.2f}us  rerun {rerun * 1000:8.3f}ms"
+            if label != "list":
+                began = time.perf_counter()
+                history.page(0, args.page)
+                line += f"  oldest page {(time.perf_counter() - began) * 1000:6.3f}ms"
+            print(line)
+
+
+# Conversations replayed by the session load generator
+SCRIPTS = [
+    ["hi", "start order", "fiction", "grate gatsbi", "yes", "thanks a lot", "bye"],
+    ["hello there", "do you have any good books?", "what is the price", "start order", "academics",
+     "human anatomy", "no"],
+    ["how are you", "show me fiction", "start order", "non fiction", "harry potter", "nothing", "bye"],
+    ["help", "where is my order", "contact details?", "recommend something", "tell me a joke", "bye"],
+]
+
+
+def demo_engine():
+    if importlib.util.find_spec("nltk") is None:
+        from chat_patterns import patterns
+        from intent_matcher import IntentMatcher
+        chatbot = functools.cache(functools.partial(IntentMatcher, patterns))
+    else:
+        chatbot = functools.cache(build_chatbot)
+    return ConversationEngine(build_catalog(), chatbot)
+
+
+def serve_chat(ttl, port, started):
+    server = ChatServer(demo_engine(), ttl)
+    asyncio.run(server.serve("127.0.0.1", port, ready=lambda bound: started.set()))
+
+
+async def chat_client(host, port, sessions, latencies):
+    # Replays each session's script, taking the sessions' messages in turn
+    # so every session on the connection stays open to the end
+    reader, writer = await asyncio.open_connection(host, port)
+    for turn in range(max(len(script) for _, script in sessions)):
+        for session_id, script in sessions:
+            if turn < len(script):
+                began = time.perf_counter()
+                writer.write(json.dumps({"session": session_id, "message": script[turn]}).encode() + b"\n")
+                await reader.readline()
+                latencies.append(time.perf_counter() - began)
+    writer.close()
+
+
+async def chat_stats(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b'{"stats": true}\n')
+    stats = json.loads(await reader.readline())
+    writer.close()
+    return stats
+
+
+async def chat_load(host, port, sessions, connections):
+    latencies = []
+    began = time.perf_counter()
+    await asyncio.gather(*(chat_client(host, port, sessions[i::connections], latencies)
+                           for i in range(connections)))
+    return latencies, time.perf_counter() - began
+
+
+def bench_sessions(args):
+    rng = random.Random(args.seed)
+    sessions = [(f"s{i}", rng.choice(SCRIPTS)) for i in range(args.sessions)]
+    messages = sum(len(script) for _, script in sessions)
+
+    # The engine alone, without the socket
+    engine = demo_engine()
+    state = {session_id: Session(session_id, ChatHistory(50)) for session_id, _ in sessions}
+    began = time.perf_counter()
+    for session_id, script in sessions:
+        for message in script:
+            engine.respond(state[session_id], message)
+    print(f"    engine: {messages / (time.perf_counter() - began):8.0f} messages/sec in-process")
+
+    started = multiprocessing.Event()
+    server = multiprocessing.Process(target=serve_chat, args=(args.ttl, args.port, started), daemon=True)
+    server.start()
+    started.wait(120)
+    try:
+        latencies, elapsed = asyncio.run(chat_load("127.0.0.1", args.port, sessions, args.connections))
+        latencies.sort()
+        print(f"    server: {len(latencies) / elapsed:8.0f} messages/sec  p50 {latencies[len(latencies) // 2] * 1000:6.2f}ms  "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.2f}ms  "
+              f"({args.sessions} sessions over {args.connections} connections)")
+        print(f"  sessions: {asyncio.run(chat_stats('127.0.0.1', args.port))}")
+        time.sleep(2 * args.ttl + 0.5)
+        print(f"after {2 * args.ttl:g}s idle: {asyncio.run(chat_stats('127.0.0.1', args.port))}")
+    finally:
+        server.terminate()
+        server.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chatbot benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    intents = sub.add_parser("intents", help="intent matching throughput and long-input latency")
+    intents.add_argument("--messages", type=int, default=200000)
+    intents.add_argument("--lengths", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    intents.add_argument("--seed", type=int, default=1)
+    intents.set_defaults(func=bench_intents)
+
+    catalog = sub.add_parser("catalog", help="catalog build cost and fuzzy title lookup latency")
+    catalog.add_argument("--titles", type=int, default=300000)
+    catalog.add_argument("--queries", type=int, default=2000)
+    catalog.add_argument("--seed", type=int, default=1)
+    catalog.set_defaults(func=bench_catalog)
+
+    reruns = sub.add_parser("reruns", help="per-rerun setup cost of chatbot.py with and without resource caching")
+    reruns.add_argument("--reruns", type=int, default=50)
+    reruns.add_argument("--catalog", help="catalog .csv or SQLite file (default: the sample books)")
+    reruns.add_argument("--titles", type=int, default=0, help="generate a catalog of this many titles instead")
+    reruns.add_argument("--app", action="store_true", help="rerun the real script with streamlit's AppTest")
+    reruns.add_argument("--seed", type=int, default=1)
+    reruns.set_defaults(func=bench_reruns)
+
+    history = sub.add_parser("history", help="chat history memory and per-rerun cost for long sessions")
+    history.add_argument("--messages", type=int, nargs="+", default=[1000, 10000, 100000])
+    history.add_argument("--window", type=int, default=200)
+    history.add_argument("--page", type=int, default=20)
+    history.add_argument("--reruns", type=int, default=20)
+    history.add_argument("--seed", type=int, default=1)
+    history.set_defaults(func=bench_history)
+
+    sessions = sub.add_parser("sessions", help="replayed conversations against the chat server on localhost")
+    sessions.add_argument("--sessions", type=int, default=5000)
+    sessions.add_argument("--connections", type=int, default=100)
+    sessions.add_argument("--ttl", type=float, default=2.0, help="server's idle-session TTL in seconds")
+    sessions.add_argument("--port", type=int, default=8766)
+    sessions.add_argument("--seed", type=int, default=1)
+    sessions.set_defaults(func=bench_sessions)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import mmap
+import os
+import time
+from collections import deque
+
+from astar import Puzzle, SearchResult, is_solvable
+from astar_cache import relabel
+from pattern_db import rank, table_size
+
+# Boards are stored relabelled (see astar_cache.relabel), so one table per
+# target blank cell serves every 3x3 target. Within a solvable class the
+# cells of labels 0..6 fix the board, because the order of the last two
+# labels is forced by parity; ranking those 7 cells gives a perfect hash
+# onto 9!/2 = 181,440 one-byte distances.
+MAGIC = b"8PZ1"
+CELLS = 9
+RANKED = 7
+UNREACHED = 0xFF
+HEADER = len(MAGIC) + 1
+
+
+def state_rank(puzzle):
+    where = [0] * CELLS
+    for index in range(CELLS):
+        where[puzzle.tile_at(index)] = index
+    return rank(where[:RANKED], CELLS)
+
+
+def canonical_goal(blank):
+    return Puzzle([[(i * 3 + j - blank) % CELLS for j in range(3)] for i in range(3)])
+
+
+def build_table(blank):
+    """BFS outwards from the canonical goal over every reachable board."""
+    table = bytearray([UNREACHED]) * table_size(CELLS, RANKED)
+    goal = canonical_goal(blank)
+    table[state_rank(goal)] = 0
+    queue = deque([goal])
+    while queue:
+        state = queue.popleft()
+        distance = table[state_rank(state)] + 1
+        for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            child = state.move_blank(dx, dy)
+            if child is None:
+                continue
+            r = state_rank(child)
+            if table[r] == UNREACHED:
+                table[r] = distance
+                child.parent = None  # keep the BFS queue from pinning whole paths
+                queue.append(child)
+    return table
+
+
+def table_path(directory, blank):
+    return os.path.join(directory, f"eight_puzzle_blank{blank}.bin")
+
+
+def write_table(path, blank, table):
+    with open(path, "wb") as f:
+        f.write(MAGIC + bytes([blank]))
+        f.write(table)
+
+
+class EightPuzzleTable:
+    """Memory-mapped optimal-distance table for targets whose blank sits in
+    the cell the table was built for."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not an 8-puzzle distance table")
+        self.blank = self.data[len(MAGIC)]
+
+    def lookup(self, canonical):
+        return self.data[HEADER + state_rank(canonical)]
+
+    def check_target(self, target_state):
+        if target_state.n != 3 or target_state.blank != self.blank:
+            raise ValueError(f"table is for 3x3 targets with the blank in cell {self.blank}")
+
+    def distance(self, start_state, target_state):
+        self.check_target(target_state)
+        if not is_solvable(start_state, target_state):
+            return None
+        return self.lookup(relabel(start_state, target_state))
+
+    def solve(self, start_state, target_state):
+        """Walk down the table, always to a neighbour one move closer."""
+        self.check_target(target_state)
+        if not is_solvable(start_state, target_state):
+            return SearchResult()
+        canonical = relabel(start_state, target_state)
+        distance = self.lookup(canonical)
+        path = [start_state]
+        while distance > 0:
+            for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                child = canonical.move_blank(dx, dy)
+                if child is not None and self.lookup(child) == distance - 1:
+                    canonical = child
+                    path.append(path[-1].move_blank(dx, dy))
+                    distance -= 1
+                    break
+        return SearchResult(path)
+
+    def close(self):
+        self.data.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build 8-puzzle optimal distance tables")
+    parser.add_argument("--out", default="tables")
+    parser.add_argument("--blank", type=int, choices=range(CELLS), action="append",
+                        help="target blank cell (default: all nine)")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for blank in args.blank or range(CELLS):
+        began = time.perf_counter()
+        path = table_path(args.out, blank)
+        write_table(path, blank, build_table(blank))
+        print(f"{path}: {time.perf_counter() - began:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
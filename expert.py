@@ -1,5 +1,15 @@
-from datetime import datetime
+from array import array
+from datetime import datetime, timedelta
+import bisect
+import heapq
 import os
+import sys
+
+from route_search import RouteIndex
+
+# Cargo weights are float kg: a load that tops the limit only by float
+# rounding (0.1 + 0.2 > 0.3) still fits
+WEIGHT_SLACK = 1e-6
 
 # Base class
 class Flight:
@@ -10,17 +20,32 @@ class Flight:
         self.departure = departure  # datetime object
         self.arrival = arrival
         self.aircraft_id = aircraft_id
+        self.scheduler = None  # set while the flight is scheduled
 
     def display_schedule(self):
         print(f"[Flight {self.flight_id}] {self.source} ➡ {self.destination}")
         print(f"Departure: {self.departure} | Arrival: {self.arrival}")
 
     def reschedule(self, new_departure, new_arrival):
+        if self.scheduler is not None and self.scheduler.find_aircraft_conflict(
+                self.aircraft_id, new_departure, new_arrival, ignore=self.flight_id):
+            return False
+        old_departure, old_arrival = self.departure, self.arrival
         self.departure = new_departure
         self.arrival = new_arrival
+        if self.scheduler is not None:
+            self.scheduler.flight_rescheduled(self, old_departure, old_arrival)
+        return True
+
+    def notify(self, event, *args):
+        # Forward manifest changes to the scheduler's listeners
+        if self.scheduler is not None:
+            self.scheduler.notify(event, self, *args)
 
 
 class Passenger:
+    __slots__ = ('passenger_id', 'name', 'contact', 'passport_number')
+
     def __init__(self, passenger_id, name, contact, passport_number=None):
         self.passenger_id = passenger_id
         self.name = name
@@ -33,29 +58,64 @@ class Passenger:
 
 
 class PassengerFlight(Flight):
-    def __init__(self, flight_id, source, destination, departure, arrival, aircraft_id, capacity):
+    def __init__(self, flight_id, source, destination, departure, arrival, aircraft_id, capacity,
+                 columnar=False):
         super().__init__(flight_id, source, destination, departure, arrival, aircraft_id)
         self.passenger_capacity = capacity
-        self.passengers = []  # Store actual passenger objects
+        if columnar:
+            self.passengers = PassengerManifest()
+            self.seats = self.passengers.seats
+        else:
+            self.passengers = {}  # passenger_id -> Passenger, in booking order
+            self.seats = {}  # passenger_id -> seat number
+        self.free_seats = []  # seats released by cancellations
+        self.next_seat = 1
     
     def book_seat(self, passenger):
+        if passenger.passenger_id in self.passengers:
+            return False
         if len(self.passengers) < self.passenger_capacity:
-            self.passengers.append(passenger)
+            if self.free_seats:
+                seat = self.free_seats.pop()
+            else:
+                seat = self.next_seat
+                self.next_seat += 1
+            self.passengers[passenger.passenger_id] = passenger
+            self.seats[passenger.passenger_id] = seat
+            self.notify('booking_added', passenger, seat)
             return True
         return False
+
+    def restore_bookings(self, bookings):
+        """Reload (passenger, seat) pairs saved earlier, bypassing listeners"""
+        for passenger, seat in bookings:
+            self.passengers[passenger.passenger_id] = passenger
+            self.seats[passenger.passenger_id] = seat
+            self.next_seat = max(self.next_seat, seat + 1)
+        taken = {self.seats.get(passenger.passenger_id) for passenger in self.passengers.values()}
+        self.free_seats = [seat for seat in range(self.next_seat - 1, 0, -1) if seat not in taken]
+
+    def book_many(self, passengers):
+        """Book a batch of passengers, returning True/False per passenger"""
+        return [self.book_seat(passenger) for passenger in passengers]
     
     def get_passenger(self, passenger_id):
-        for passenger in self.passengers:
-            if passenger.passenger_id == passenger_id:
-                return passenger
-        return None
+        return self.passengers.get(passenger_id)
+
+    def get_seat(self, passenger_id):
+        return self.seats.get(passenger_id)
     
     def cancel_booking(self, passenger_id):
-        for passenger in self.passengers:
-            if passenger.passenger_id == passenger_id:
-                self.passengers.remove(passenger)
-                return True
-        return False
+        if passenger_id not in self.passengers:
+            return False
+        self.free_seats.append(self.seats.pop(passenger_id))
+        del self.passengers[passenger_id]
+        self.notify('booking_cancelled', passenger_id)
+        return True
+
+    def cancel_many(self, passenger_ids):
+        """Cancel a batch of bookings, returning True/False per passenger ID"""
+        return [self.cancel_booking(passenger_id) for passenger_id in passenger_ids]
 
     def available_seats(self):
         return self.passenger_capacity - len(self.passengers)
@@ -66,11 +126,13 @@ class PassengerFlight(Flight):
             return
         
         print(f"\nPassengers on Flight {self.flight_id} ({len(self.passengers)} total):")
-        for passenger in self.passengers:
+        for passenger in self.passengers.values():
             passenger.display_info()
 
 
 class Cargo:
+    __slots__ = ('cargo_id', 'description', 'weight', 'owner_name')
+
     def __init__(self, cargo_id, description, weight, owner_name):
         self.cargo_id = cargo_id
         self.description = description
@@ -78,25 +140,263 @@ class Cargo:
         self.owner_name = owner_name
 
 
+# Columnar manifests: one compact column per field instead of one Python
+# object per record. Records are read back through small view objects,
+# which stay valid until the next removal from the same manifest. IDs
+# are stored as strings: views return str(id), and lookups accept an ID
+# of any type by its str().
+
+class StringColumn:
+    """Append-only UTF-8 strings packed into a single buffer"""
+    __slots__ = ('data', 'offsets')
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array('I', [0])
+
+    def append(self, value):
+        self.data += ('' if value is None else str(value)).encode()
+        self.offsets.append(len(self.data))
+
+    def __getitem__(self, row):
+        return self.data[self.offsets[row]:self.offsets[row + 1]].decode()
+
+
+class RowIndex:
+    """Open-addressing hash index from the strings of a key column to row
+    numbers, 4 bytes per slot instead of a dict entry plus a key object"""
+    EMPTY = -1
+    DELETED = -2
+
+    def __init__(self, keys, capacity=8):
+        self.keys = keys
+        self.slots = array('i', [self.EMPTY]) * capacity
+        self.filled = 0  # live and deleted slots
+
+    def probe(self, key):
+        # Yields slot positions in linear probing order
+        mask = len(self.slots) - 1
+        position = hash(key) & mask
+        while True:
+            yield position
+            position = (position + 1) & mask
+
+    def get(self, key):
+        key = str(key)
+        for position in self.probe(key):
+            row = self.slots[position]
+            if row == self.EMPTY:
+                return None
+            if row >= 0 and self.keys[row] == key:
+                return row
+
+    def add(self, key, row):
+        key = str(key)
+        if (self.filled + 1) * 3 > len(self.slots) * 2:
+            self.resize(len(self.slots) * 2)
+        for position in self.probe(key):
+            if self.slots[position] == self.EMPTY:
+                self.slots[position] = row
+                self.filled += 1
+                return
+
+    def remove(self, key):
+        key = str(key)
+        for position in self.probe(key):
+            row = self.slots[position]
+            if row == self.EMPTY:
+                return None
+            if row >= 0 and self.keys[row] == key:
+                self.slots[position] = self.DELETED
+                return row
+
+    def resize(self, capacity):
+        rows = [row for row in self.slots if row >= 0]
+        self.slots = array('i', [self.EMPTY]) * capacity
+        self.filled = 0
+        for row in rows:
+            self.add(self.keys[row], row)
+
+
+def column_field(column, optional=False):
+    def get(view):
+        value = getattr(view.manifest, column)[view.row]
+        return (value or None) if optional else value
+    return property(get)
+
+
+class PassengerView:
+    __slots__ = ('manifest', 'row')
+
+    def __init__(self, manifest, row):
+        self.manifest = manifest
+        self.row = row
+
+    passenger_id = column_field('ids')
+    name = column_field('names')
+    contact = column_field('contacts')
+    passport_number = column_field('passports', optional=True)
+    display_info = Passenger.display_info
+
+
+class CargoView:
+    __slots__ = ('manifest', 'row')
+
+    def __init__(self, manifest, row):
+        self.manifest = manifest
+        self.row = row
+
+    cargo_id = column_field('ids')
+    description = column_field('descriptions')
+    weight = column_field('weights')
+    owner_name = column_field('owners')
+
+
+class ColumnarManifest:
+    COLUMNS = ()
+
+    def __init__(self):
+        for column in self.COLUMNS:
+            setattr(self, column, self.new_column(column))
+        self.alive = bytearray()
+        self.live = 0
+
+    def new_column(self, column):
+        return StringColumn()
+
+    def append_row(self, values):
+        for column, value in zip(self.COLUMNS, values):
+            getattr(self, column).append(value)
+        self.alive.append(1)
+        self.live += 1
+        return len(self.alive) - 1
+
+    def delete_row(self, row):
+        self.alive[row] = 0
+        self.live -= 1
+        if len(self.alive) > 64 and self.live * 2 < len(self.alive):
+            self.compact()
+
+    def live_rows(self):
+        return [row for row, alive in enumerate(self.alive) if alive]
+
+    def compact(self):
+        """Rewrite the columns without deleted rows; returns old -> new row"""
+        rows = self.live_rows()
+        old = {column: getattr(self, column) for column in self.COLUMNS}
+        for column in self.COLUMNS:
+            setattr(self, column, self.new_column(column))
+        self.alive = bytearray()
+        self.live = 0
+        for row in rows:
+            self.append_row([old[column][row] for column in self.COLUMNS])
+        return {row: new_row for new_row, row in enumerate(rows)}
+
+    def __len__(self):
+        return self.live
+
+
+class PassengerManifest(ColumnarManifest):
+    """Columnar passenger store with the dict-like interface PassengerFlight uses"""
+    COLUMNS = ('ids', 'names', 'contacts', 'passports', 'seat_numbers')
+
+    def __init__(self):
+        super().__init__()
+        self.rows = RowIndex(self.ids)  # passenger_id -> row
+        self.seats = ManifestSeats(self)
+
+    def new_column(self, column):
+        return array('I') if column == 'seat_numbers' else StringColumn()
+
+    def __contains__(self, passenger_id):
+        return self.rows.get(passenger_id) is not None
+
+    def __setitem__(self, passenger_id, passenger):
+        row = self.append_row([passenger_id, passenger.name, passenger.contact, passenger.passport_number, 0])
+        self.rows.add(passenger_id, row)
+
+    def __delitem__(self, passenger_id):
+        self.delete_row(self.rows.remove(passenger_id))
+
+    def compact(self):
+        moved = super().compact()
+        self.rows = RowIndex(self.ids, max(8, 1 << (self.live * 2).bit_length()))
+        for row in range(self.live):
+            self.rows.add(self.ids[row], row)
+        return moved
+
+    def get(self, passenger_id, default=None):
+        row = self.rows.get(passenger_id)
+        return default if row is None else PassengerView(self, row)
+
+    def values(self):
+        return [PassengerView(self, row) for row in self.live_rows()]
+
+
+class ManifestSeats:
+    # Seat numbers live in the manifest's seat_numbers column
+    __slots__ = ('manifest',)
+
+    def __init__(self, manifest):
+        self.manifest = manifest
+
+    def __setitem__(self, passenger_id, seat):
+        self.manifest.seat_numbers[self.manifest.rows.get(passenger_id)] = seat
+
+    def get(self, passenger_id, default=None):
+        row = self.manifest.rows.get(passenger_id)
+        return default if row is None else self.manifest.seat_numbers[row]
+
+    def pop(self, passenger_id):
+        return self.manifest.seat_numbers[self.manifest.rows.get(passenger_id)]
+
+
+class CargoManifest(ColumnarManifest):
+    """Columnar cargo store with the list-like interface CargoFlight uses"""
+    COLUMNS = ('ids', 'descriptions', 'weights', 'owners')
+
+    def new_column(self, column):
+        return array('d') if column == 'weights' else StringColumn()
+
+    def append(self, cargo):
+        self.append_row([cargo.cargo_id, cargo.description, cargo.weight, cargo.owner_name])
+
+    def remove(self, view):
+        self.delete_row(view.row)
+
+    def __iter__(self):
+        return iter([CargoView(self, row) for row in self.live_rows()])
+
+
 class CargoFlight(Flight):
-    def __init__(self, flight_id, source, destination, departure, arrival, aircraft_id, max_cargo_weight):
+    def __init__(self, flight_id, source, destination, departure, arrival, aircraft_id, max_cargo_weight,
+                 columnar=False):
         super().__init__(flight_id, source, destination, departure, arrival, aircraft_id)
         self.max_cargo_weight = max_cargo_weight
         self.current_cargo_weight = 0
-        self.cargo_list = []
+        self.cargo_list = CargoManifest() if columnar else []
 
     def add_cargo(self, cargo):
-        if self.current_cargo_weight + cargo.weight <= self.max_cargo_weight:
+        if self.current_cargo_weight + cargo.weight <= self.max_cargo_weight + WEIGHT_SLACK:
             self.cargo_list.append(cargo)
             self.current_cargo_weight += cargo.weight
+            self.notify('cargo_added', cargo)
             return True
         return False
 
+    def restore_cargo(self, cargo_items):
+        """Reload cargo saved earlier, bypassing listeners"""
+        for cargo in cargo_items:
+            self.cargo_list.append(cargo)
+            self.current_cargo_weight += cargo.weight
+
     def remove_cargo(self, cargo_id):
+        key = str(cargo_id) if isinstance(self.cargo_list, CargoManifest) else cargo_id
         for cargo in self.cargo_list:
-            if cargo.cargo_id == cargo_id:
+            if cargo.cargo_id == key:
                 self.current_cargo_weight -= cargo.weight
                 self.cargo_list.remove(cargo)
+                self.notify('cargo_removed', cargo_id)
                 return True
         return False
 
@@ -104,42 +404,188 @@ class CargoFlight(Flight):
         return self.max_cargo_weight - self.current_cargo_weight
 
 
+# A flight occupies its aircraft over [departure, arrival). One whose
+# arrival is not after its departure still holds the aircraft at the
+# departure instant, i.e. for datetime's one microsecond resolution.
+INSTANT = timedelta(microseconds=1)
+
+
+def occupied_until(departure, arrival):
+    return arrival if arrival > departure else departure + INSTANT
+
+
+class AircraftSchedule:
+    """One aircraft's flights as (departure, arrival, flight_id) intervals
+    sorted by departure. While the intervals do not overlap, a new one
+    overlaps some flight only if it overlaps its immediate neighbours, so a
+    check is a bisect plus two comparisons. Flights ending where another
+    starts do not overlap; zero-length ones are handled as occupied_until
+    says."""
+
+    def __init__(self):
+        self.intervals = []
+
+    def add(self, departure, arrival, flight_id):
+        bisect.insort(self.intervals, (departure, arrival, flight_id))
+
+    def remove(self, departure, arrival, flight_id):
+        pos = bisect.bisect_left(self.intervals, (departure, arrival, flight_id))
+        if pos < len(self.intervals) and self.intervals[pos] == (departure, arrival, flight_id):
+            del self.intervals[pos]
+
+    def find_conflict(self, departure, arrival, ignore=None):
+        """Return the ID of a flight overlapping [departure, arrival), or None"""
+        arrival = occupied_until(departure, arrival)
+        pos = bisect.bisect_left(self.intervals, (departure,))
+        before = pos - 1
+        if before >= 0 and self.intervals[before][2] == ignore:
+            before -= 1
+        if before >= 0 and occupied_until(*self.intervals[before][:2]) > departure:
+            return self.intervals[before][2]
+        after = pos
+        if after < len(self.intervals) and self.intervals[after][2] == ignore:
+            after += 1
+        if after < len(self.intervals) and self.intervals[after][0] < arrival:
+            return self.intervals[after][2]
+        return None
+
+    def __len__(self):
+        return len(self.intervals)
+
+
 class Scheduler:
+    INDEXED_FIELDS = ('source', 'destination', 'aircraft_id')
+
     def __init__(self):
         self.flights = {}
+        # Sorted (departure, flight_id) pairs for date and time range queries
+        self.departures = []
+        # field -> case-folded value -> {flight_id: flight}, in scheduling order
+        self.indexes = {field: {} for field in self.INDEXED_FIELDS}
+        # case-folded aircraft_id -> AircraftSchedule
+        self.aircraft = {}
+        # Objects notified of changes through on_<event> methods, e.g.
+        # on_flight_scheduled(flight) or on_booking_added(flight, passenger, seat)
+        self.listeners = []
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def notify(self, event, *args):
+        for listener in self.listeners:
+            handler = getattr(listener, 'on_' + event, None)
+            if handler is not None:
+                handler(*args)
+
+    def index_departure(self, flight):
+        bisect.insort(self.departures, (flight.departure, flight.flight_id))
+        if flight.aircraft_id:
+            key = flight.aircraft_id.casefold()
+            self.aircraft.setdefault(key, AircraftSchedule()).add(
+                flight.departure, flight.arrival, flight.flight_id)
 
-    def schedule_flight(self, flight):
+    def unindex_departure(self, flight, departure, arrival=None):
+        arrival = flight.arrival if arrival is None else arrival
+        pos = bisect.bisect_left(self.departures, (departure, flight.flight_id))
+        if pos < len(self.departures) and self.departures[pos] == (departure, flight.flight_id):
+            del self.departures[pos]
+        if flight.aircraft_id:
+            key = flight.aircraft_id.casefold()
+            schedule = self.aircraft.get(key)
+            if schedule is not None:
+                schedule.remove(departure, arrival, flight.flight_id)
+                if not schedule:
+                    del self.aircraft[key]
+
+    def find_aircraft_conflict(self, aircraft_id, departure, arrival, ignore=None):
+        """ID of a scheduled flight that would double-book the aircraft, or None"""
+        if not aircraft_id:
+            return None
+        schedule = self.aircraft.get(aircraft_id.casefold())
+        if schedule is None:
+            return None
+        return schedule.find_conflict(departure, arrival, ignore)
+
+    def find_all_conflicts(self):
+        """Sweep every aircraft's flights in departure order, keeping the
+        flights still in the air in a heap by arrival, and return each
+        overlapping (flight_id, flight_id) pair. O(n log n + conflicts)."""
+        conflicts = []
+        for schedule in self.aircraft.values():
+            airborne = []
+            for departure, arrival, flight_id in schedule.intervals:
+                while airborne and airborne[0][0] <= departure:
+                    heapq.heappop(airborne)
+                for _, other_id in airborne:
+                    conflicts.append((other_id, flight_id))
+                heapq.heappush(airborne, (occupied_until(departure, arrival), flight_id))
+        return conflicts
+
+    def index_flight(self, flight):
+        self.index_departure(flight)
+        for field in self.INDEXED_FIELDS:
+            value = getattr(flight, field)
+            if value:
+                self.indexes[field].setdefault(value.casefold(), {})[flight.flight_id] = flight
+
+    def unindex_flight(self, flight):
+        self.unindex_departure(flight, flight.departure)
+        for field in self.INDEXED_FIELDS:
+            value = getattr(flight, field)
+            if value:
+                bucket = self.indexes[field].get(value.casefold(), {})
+                bucket.pop(flight.flight_id, None)
+                if not bucket:
+                    self.indexes[field].pop(value.casefold(), None)
+
+    def schedule_flight(self, flight, check_conflicts=True):
+        """Schedule a flight, refusing it if its aircraft is already flying
+        then. Bulk loads can pass check_conflicts=False and audit afterwards
+        with find_all_conflicts()."""
+        if check_conflicts and self.find_aircraft_conflict(
+                flight.aircraft_id, flight.departure, flight.arrival, ignore=flight.flight_id):
+            return False
+        if flight.flight_id in self.flights:
+            self.cancel_flight(flight.flight_id)
         self.flights[flight.flight_id] = flight
+        flight.scheduler = self
+        self.index_flight(flight)
+        self.notify('flight_scheduled', flight)
         return True
 
     def cancel_flight(self, flight_id):
         if flight_id in self.flights:
-            del self.flights[flight_id]
+            flight = self.flights.pop(flight_id)
+            self.unindex_flight(flight)
+            flight.scheduler = None
+            self.notify('flight_cancelled', flight)
             return True
         return False
 
+    def flight_rescheduled(self, flight, old_departure, old_arrival):
+        """Called by Flight.reschedule to keep the time indexes in order"""
+        self.unindex_departure(flight, old_departure, old_arrival)
+        self.index_departure(flight)
+        self.notify('flight_rescheduled', flight, old_departure, old_arrival)
+
+    def get_flights_in_range(self, start, end):
+        """Flights departing in [start, end), ordered by departure time"""
+        lo = bisect.bisect_left(self.departures, (start,))
+        hi = bisect.bisect_left(self.departures, (end,))
+        return [self.flights[flight_id] for _, flight_id in self.departures[lo:hi]]
+
     def get_schedule_by_date(self, date, sort=False):
-        flights_on_date = []
-        for flight in self.flights.values():
-            if flight.departure.date() == date.date():
-                flights_on_date.append(flight)
-        
-        if sort:
-            flights_on_date.sort(key=lambda f: f.departure)
-        
-        return flights_on_date
+        # The departure index is already sorted, so `sort` is always honoured
+        day = datetime.combine(date.date(), datetime.min.time())
+        return self.get_flights_in_range(day, day + timedelta(days=1))
     
     def get_flights_by_criteria(self, criteria_type, criteria_value):
-        matching_flights = []
-        for flight in self.flights.values():
-            if criteria_type == 'source' and flight.source.lower() == criteria_value.lower():
-                matching_flights.append(flight)
-            elif criteria_type == 'destination' and flight.destination.lower() == criteria_value.lower():
-                matching_flights.append(flight)
-            elif criteria_type == 'aircraft_id' and flight.aircraft_id and flight.aircraft_id.lower() == criteria_value.lower():
-                matching_flights.append(flight)
-        
-        return matching_flights
+        if criteria_type not in self.indexes:
+            return []
+        return list(self.indexes[criteria_type].get(criteria_value.casefold(), {}).values())
 
 
 def get_valid_datetime(prompt):
@@ -166,27 +612,35 @@ def get_valid_date(prompt):
 def main():
     scheduler = Scheduler()
     
-    # Sample data for testing
-    # Add some sample flights to make testing easier
-    today = datetime.now()
+    # An optional database path makes every change persistent
+    if len(sys.argv) > 1:
+        from flight_store import SQLiteStore
+        SQLiteStore(sys.argv[1]).load(scheduler)
     
-    # Add a passenger flight
-    pf = PassengerFlight(
-        "BA123", "London", "New York", 
-        datetime(today.year, today.month, today.day, 9, 0), 
-        datetime(today.year, today.month, today.day, 17, 0),
-        "A380-001", 250
-    )
-    scheduler.schedule_flight(pf)
+    if not scheduler.flights:
+        # Sample data for testing
+        # Add some sample flights to make testing easier
+        today = datetime.now()
+        
+        # Add a passenger flight
+        pf = PassengerFlight(
+            "BA123", "London", "New York", 
+            datetime(today.year, today.month, today.day, 9, 0), 
+            datetime(today.year, today.month, today.day, 17, 0),
+            "A380-001", 250
+        )
+        scheduler.schedule_flight(pf)
+        
+        # Add a cargo flight
+        cf = CargoFlight(
+            "CG456", "Dubai", "Singapore", 
+            datetime(today.year, today.month, today.day, 14, 0), 
+            datetime(today.year, today.month, today.day, 22, 0),
+            "B747-002", 5000
+        )
+        scheduler.schedule_flight(cf)
     
-    # Add a cargo flight
-    cf = CargoFlight(
-        "CG456", "Dubai", "Singapore", 
-        datetime(today.year, today.month, today.day, 14, 0), 
-        datetime(today.year, today.month, today.day, 22, 0),
-        "B747-002", 5000
-    )
-    scheduler.schedule_flight(cf)
+    routes = RouteIndex(scheduler)
     
     while True:
         print("\n===== FLIGHT MANAGEMENT SYSTEM =====")
@@ -215,6 +669,8 @@ def main():
                     flight = PassengerFlight(flight_id, source, destination, departure, arrival, aircraft_id, capacity)
                     if scheduler.schedule_flight(flight):
                         print(f"Passenger flight {flight_id} scheduled successfully.")
+                    else:
+                        print(f"Aircraft {aircraft_id} is already booked during that time.")
                 except ValueError:
                     print("Invalid capacity. Please enter a number.")
             
@@ -224,6 +680,8 @@ def main():
                     flight = CargoFlight(flight_id, source, destination, departure, arrival, aircraft_id, max_weight)
                     if scheduler.schedule_flight(flight):
                         print(f"Cargo flight {flight_id} scheduled successfully.")
+                    else:
+                        print(f"Aircraft {aircraft_id} is already booked during that time.")
                 except ValueError:
                     print("Invalid weight. Please enter a number.")
             
@@ -251,8 +709,10 @@ def main():
                 if flight_id in scheduler.flights:
                     new_departure = get_valid_datetime("New departure time")
                     new_arrival = get_valid_datetime("New arrival time")
-                    scheduler.flights[flight_id].reschedule(new_departure, new_arrival)
-                    print(f"Flight {flight_id} rescheduled successfully.")
+                    if scheduler.flights[flight_id].reschedule(new_departure, new_arrival):
+                        print(f"Flight {flight_id} rescheduled successfully.")
+                    else:
+                        print("The aircraft is already booked during that time.")
                 else:
                     print("Flight not found.")
         
@@ -291,7 +751,7 @@ def main():
                         print(f"Booking confirmed for {name} on flight {flight_id}.")
                         print(f"{flight.available_seats()} seats remaining.")
                     else:
-                        print("Booking failed. Flight might be full.")
+                        print("Booking failed. Flight might be full or this passenger ID is already booked.")
                 else:
                     print("Invalid flight ID or not a passenger flight.")
             
@@ -355,9 +815,10 @@ def main():
             print("2. View flights by source")
             print("3. View flights by destination")
             print("4. View flights by aircraft ID")
-            print("5. Return to main menu")
+            print("5. Find connections")
+            print("6. Return to main menu")
             
-            sub_choice = input("Enter choice (1-5): ")
+            sub_choice = input("Enter choice (1-6): ")
             
             if sub_choice == '1':
                 date = get_valid_date("Enter date")
@@ -393,6 +854,19 @@ def main():
                     print(f"\nFlights with {criteria_name} '{criteria_value}':")
                     for flight in flights:
                         flight.display_schedule()
+            
+            elif sub_choice == '5':
+                source = input("From airport: ")
+                destination = input("To airport: ")
+                depart_after = get_valid_datetime("Depart after")
+                journeys = routes.connections_pareto(source, destination, depart_after)
+                
+                if not journeys:
+                    print(f"No connections found from {source} to {destination}")
+                for legs in journeys:
+                    print(f"\n{len(legs)} leg(s), arriving {legs[-1].arrival}:")
+                    for flight in legs:
+                        flight.display_schedule()
         
         elif choice == '5':
             print("Thank you for using the Flight Management System. Goodbye!")
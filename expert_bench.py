@@ -0,0 +1,504 @@
+import argparse
+import asyncio
+import gc
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+
+from booking_engine import BookingEngine
+from cargo_planning import plan_batch, plan_single
+from expert import Cargo, CargoFlight, Passenger, PassengerFlight, Scheduler
+from flight_service import FlightService, TTLCache
+from flight_io import MANIFEST_FIELDS, manifest_rows, parse_datetime, write_rows
+from flight_store import OpLogStore, SQLiteStore
+from route_search import RouteIndex
+
+AIRPORTS = ["London", "New York", "Dubai", "Singapore", "Paris", "Tokyo", "Mumbai", "Sydney",
+            "Frankfurt", "Toronto", "Delhi", "Hong Kong", "Madrid", "Rome", "Doha", "Seoul"]
+
+
+def make_flights(count, seed, days=60):
+    rng = random.Random(seed)
+    base = datetime(2025, 1, 1)
+    flights = []
+    for i in range(count):
+        source, destination = rng.sample(AIRPORTS, 2)
+        departure = base + timedelta(minutes=rng.randrange(days * 24 * 60))
+        arrival = departure + timedelta(minutes=rng.randrange(60, 16 * 60))
+        flights.append(PassengerFlight(f"F{i}", source, destination, departure, arrival,
+                                       f"AC{rng.randrange(count // 4 + 1)}", 200))
+    return flights
+
+
+def scan_by_date(flights, date):
+    # The original full-scan query, for comparison
+    return [f for f in flights.values() if f.departure.date() == date.date()]
+
+
+def scan_by_criteria(flights, criteria_type, criteria_value):
+    return [f for f in flights.values()
+            if getattr(f, criteria_type) and getattr(f, criteria_type).lower() == criteria_value.lower()]
+
+
+class DictPassenger:
+    # The original record type with a per-instance __dict__, for comparison
+    def __init__(self, passenger_id, name, contact, passport_number=None):
+        self.passenger_id = passenger_id
+        self.name = name
+        self.contact = contact
+        self.passport_number = passport_number
+
+
+class DictCargo:
+    def __init__(self, cargo_id, description, weight, owner_name):
+        self.cargo_id = cargo_id
+        self.description = description
+        self.weight = weight
+        self.owner_name = owner_name
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def bench_manifest(args):
+    count = args.passengers
+    when = datetime(2025, 1, 1)
+
+    # Strings are built inside each run so every booking owns its data, as
+    # it would when parsed from a request
+    def book(record_cls, columnar):
+        def build():
+            flight = PassengerFlight("F1", "A", "B", when, when, None, count, columnar=columnar)
+            for i in range(count):
+                flight.book_seat(record_cls(f"P{i:09d}", f"Passenger Name {i}", f"user{i}@example.com",
+                                            f"X{i:08d}"))
+            return flight
+        return build
+
+    def load(record_cls, columnar):
+        def build():
+            flight = CargoFlight("C1", "A", "B", when, when, None, float("inf"), columnar=columnar)
+            for i in range(count):
+                flight.add_cargo(record_cls(f"C{i}", "General cargo", float(i % 500), f"Owner {i}"))
+            return flight
+        return build
+
+    print(f"{count} records")
+    for name, passenger_cls, cargo_cls, columnar in (
+            ("__dict__ objects", DictPassenger, DictCargo, False),
+            ("__slots__ objects", Passenger, Cargo, False),
+            ("columnar", Passenger, Cargo, True)):
+        per_passenger = measure(book(passenger_cls, columnar)) / count
+        per_cargo = measure(load(cargo_cls, columnar)) / count
+        print(f"{name:>18}: {per_passenger:7.1f} bytes/passenger  {per_cargo:7.1f} bytes/cargo item")
+
+
+def bench_query(args):
+    scheduler = Scheduler()
+    began = time.perf_counter()
+    for flight in make_flights(args.flights, args.seed):
+        scheduler.schedule_flight(flight)
+    print(f"{args.flights} flights scheduled in {time.perf_counter() - began:.2f}s")
+
+    rng = random.Random(args.seed)
+    dates = [datetime(2025, 1, 1) + timedelta(days=rng.randrange(60)) for _ in range(args.queries)]
+    sources = [rng.choice(AIRPORTS).upper() for _ in range(args.queries)]
+
+    for name, by_date, by_source in (
+            ("scan", lambda d: scan_by_date(scheduler.flights, d),
+             lambda s: scan_by_criteria(scheduler.flights, "source", s)),
+            ("indexed", scheduler.get_schedule_by_date,
+             lambda s: scheduler.get_flights_by_criteria("source", s))):
+        began = time.perf_counter()
+        for date in dates:
+            by_date(date)
+        date_rate = args.queries / (time.perf_counter() - began)
+        began = time.perf_counter()
+        for source in sources:
+            by_source(source)
+        source_rate = args.queries / (time.perf_counter() - began)
+        print(f"{name:>8}: {date_rate:10.0f} date queries/sec  {source_rate:10.0f} source queries/sec")
+
+
+def bench_store(args):
+    stores = {
+        "sqlite": lambda path: SQLiteStore(path),
+        "oplog": lambda path: OpLogStore(path, durable=args.per_booking),
+    }
+    flight_count = args.bookings // 200 + 1
+    with tempfile.TemporaryDirectory() as directory:
+        for name, open_store in stores.items():
+            path = os.path.join(directory, name)
+            store = open_store(path)
+            scheduler = store.load(Scheduler())
+            flights = make_flights(flight_count, args.seed)
+            with store.batch():
+                for flight in flights:
+                    scheduler.schedule_flight(flight, check_conflicts=False)
+
+            began = time.perf_counter()
+            booked = 0
+            for flight in flights:
+                with nullcontext() if args.per_booking else store.batch():
+                    for seat in range(min(200, args.bookings - booked)):
+                        flight.book_seat(Passenger(f"{flight.flight_id}-{seat}", f"Passenger {seat}",
+                                                   f"p{seat}@example.com"))
+                booked += min(200, args.bookings - booked)
+                if booked >= args.bookings:
+                    break
+            rate = booked / (time.perf_counter() - began)
+            store.close()
+
+            began = time.perf_counter()
+            store = open_store(path)
+            scheduler = store.load(Scheduler())
+            cold = time.perf_counter() - began
+            restored = sum(len(f.passengers) for f in scheduler.flights.values())
+            store.close()
+            print(f"{name:>7}: {rate:10.0f} bookings/sec  cold start {cold:6.2f}s for {restored} bookings")
+
+
+class SlowListener:
+    # Stands in for a synchronous store commit made while the flight is locked
+    def __init__(self, latency):
+        self.latency = latency
+
+    def on_booking_added(self, flight, passenger, seat):
+        time.sleep(self.latency)
+
+
+def overbookings(flights):
+    """Bookings beyond capacity plus seats handed out twice or out of range"""
+    count = 0
+    for flight in flights:
+        seats = list(flight.seats.values())
+        count += max(0, len(flight.passengers) - flight.passenger_capacity)
+        count += len(seats) - len(set(seats))
+        count += sum(1 for seat in seats if not 1 <= seat <= flight.passenger_capacity)
+    return count
+
+
+def bench_concurrency(args):
+    rng = random.Random(args.seed)
+    requests = [(f"F{rng.randrange(args.flights)}", i) for i in range(args.requests)]
+    # A tiny switch interval makes thread interleavings, and so races, far more likely
+    sys.setswitchinterval(1e-6)
+    print(f"{args.requests} booking requests over {args.flights} flights of {args.capacity} seats, "
+          f"{args.latency * 1000:.1f}ms store latency")
+
+    for mode in ("global lock", "per-flight"):
+        for threads in args.threads:
+            scheduler = Scheduler()
+            for flight in make_flights(args.flights, args.seed):
+                flight.passenger_capacity = args.capacity
+                scheduler.schedule_flight(flight, check_conflicts=False)
+            scheduler.add_listener(SlowListener(args.latency))
+            engine = BookingEngine(scheduler)
+            global_lock = threading.Lock()
+
+            def book(request):
+                flight_id, i = request
+                passenger = Passenger(f"P{i}", f"Passenger {i}", f"p{i}@example.com")
+                if mode == "per-flight":
+                    return engine.book_seat(flight_id, passenger)
+                with global_lock:
+                    return scheduler.flights[flight_id].book_seat(passenger)
+
+            began = time.perf_counter()
+            with ThreadPoolExecutor(threads) as pool:
+                booked = sum(pool.map(book, requests, chunksize=16))
+            rate = len(requests) / (time.perf_counter() - began)
+            print(f"{mode:>12} {threads:3d} threads: {rate:9.0f} requests/sec  {booked:6d} booked  "
+                  f"{overbookings(scheduler.flights.values())} overbookings")
+
+
+def make_cargo(count, seed):
+    rng = random.Random(seed)
+    # Mostly pallets with a long tail of heavy freight; priority is not
+    # proportional to weight, so value per kg varies between items
+    items, priority = [], {}
+    for i in range(count):
+        weight = round(min(rng.lognormvariate(6.5, 1.0), 20000), 1)
+        items.append(Cargo(f"C{i}", "General cargo", weight, f"Owner {i}"))
+        priority[f"C{i}"] = weight ** 0.8 * rng.uniform(0.5, 2.0)
+    return items, priority
+
+
+def first_come(flights, items):
+    # The original behaviour: add_cargo in arrival order, flight by flight
+    loaded = []
+    space = [flight.available_cargo_space() for flight in flights]
+    for cargo in items:
+        for index, room in enumerate(space):
+            if cargo.weight <= room:
+                space[index] = room - cargo.weight
+                loaded.append(cargo)
+                break
+    return loaded
+
+
+def bench_cargo(args):
+    when = datetime(2025, 1, 1)
+    items, priority = make_cargo(args.items, args.seed)
+    value = lambda cargo: priority[cargo.cargo_id]
+    pending = sum(cargo.weight for cargo in items)
+    rng = random.Random(args.seed)
+    shares = [rng.uniform(0.5, 1.5) for _ in range(args.flights)]
+    fleet = [CargoFlight(f"F{i}", "A", "B", when, when, None,
+                         round(pending / args.oversubscription * share / sum(shares)))
+             for i, share in enumerate(shares)]
+    single = [CargoFlight("S1", "A", "B", when, when, None, args.capacity)]
+    print(f"{len(items)} items, {pending / 1000:.0f}t pending")
+
+    for flights in (single, fleet):
+        capacity = sum(flight.available_cargo_space() for flight in flights)
+        print(f"{len(flights)} flight(s), {capacity / 1000:.0f}t capacity")
+        baseline = first_come(flights, items)
+        best_value = sum(map(value, baseline))
+        print(f"{'first come':>12}: {sum(c.weight for c in baseline) / capacity:8.3%} of capacity  "
+              f"{1:6.3f}x value")
+        for mode, planner in (("greedy", lambda v: plan_batch(flights, items, v, refine=False)),
+                              ("optimized", lambda v: plan_single(flights[0], items, v) if len(flights) == 1
+                               else plan_batch(flights, items, v))):
+            began = time.perf_counter()
+            by_weight = planner(None)
+            weight_time = time.perf_counter() - began
+            began = time.perf_counter()
+            by_value = planner(value)
+            value_time = time.perf_counter() - began
+            print(f"{mode:>12}: {by_weight.utilization():8.3%} of capacity ({weight_time:6.3f}s)  "
+                  f"{by_value.total_value(value) / best_value:6.3f}x value ({value_time:6.3f}s)")
+
+
+def scan_connections(flights, source, destination, depart_after, layover):
+    # Nested scans over every flight, the only option before the route index
+    best = None
+    for first in flights.values():
+        if first.source.casefold() != source.casefold() or first.departure < depart_after:
+            continue
+        if first.destination.casefold() == destination.casefold():
+            if best is None or first.arrival < best[-1].arrival:
+                best = [first]
+            continue
+        for second in flights.values():
+            if (second.source.casefold() == first.destination.casefold()
+                    and second.destination.casefold() == destination.casefold()
+                    and second.departure >= first.arrival + layover
+                    and (best is None or second.arrival < best[-1].arrival)):
+                best = [first, second]
+    return best
+
+
+def bench_routes(args):
+    scheduler = Scheduler()
+    for flight in make_flights(args.flights, args.seed, days=args.days):
+        scheduler.schedule_flight(flight, check_conflicts=False)
+    began = time.perf_counter()
+    index = RouteIndex(scheduler)
+    print(f"{args.flights} flights indexed in {time.perf_counter() - began:.2f}s")
+
+    rng = random.Random(args.seed)
+    queries = [(*rng.sample(AIRPORTS, 2), datetime(2025, 1, 1) + timedelta(hours=rng.randrange(args.days * 24)))
+               for _ in range(args.queries)]
+    for name, query in (
+            ("nested scan (2 legs)", lambda q: scan_connections(scheduler.flights, *q, index.min_layover)),
+            ("earliest arrival", lambda q: index.earliest_arrival(*q)),
+            ("pareto (3 legs)", lambda q: index.connections_pareto(*q))):
+        count = args.queries if name != "nested scan (2 legs)" else max(1, args.queries // 100)
+        began = time.perf_counter()
+        for q in queries[:count]:
+            query(q)
+        print(f"{name:>20}: {count / (time.perf_counter() - began):9.1f} queries/sec")
+
+    # Incremental upkeep: reschedule flights with the index listening
+    flights = list(scheduler.flights.values())[:args.queries]
+    began = time.perf_counter()
+    for flight in flights:
+        flight.reschedule(flight.departure + timedelta(minutes=5), flight.arrival + timedelta(minutes=5))
+    rate = len(flights) / (time.perf_counter() - began)
+    print(f"{'reschedule':>20}: {rate:9.1f} updates/sec with the index attached")
+
+
+def bench_io(args):
+    rng = random.Random(args.seed)
+    stamps = [f"2025-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d} {rng.randrange(24):02d}:{rng.randrange(60):02d}"
+              for _ in range(args.rows)]
+    for name, parse in (("strptime", lambda s: datetime.strptime(s, "%Y-%m-%d %H:%M")),
+                        ("fromisoformat", parse_datetime)):
+        began = time.perf_counter()
+        for stamp in stamps:
+            parse(stamp)
+        print(f"{name:>14}: {args.rows / (time.perf_counter() - began):10.0f} datetimes/sec")
+
+    # Export peak memory should not grow with the number of rows written
+    flights = make_flights(args.rows // 200 + 1, args.seed)
+    for flight in flights:
+        flight.restore_bookings((Passenger(f"{flight.flight_id}-{seat}", f"Passenger {seat}", "p@example.com"), seat)
+                                for seat in range(1, 201))
+    for count in (len(flights) // 10, len(flights)):
+        gc.collect()
+        tracemalloc.start()
+        began = time.perf_counter()
+        written = write_rows(manifest_rows(flights[:count]), os.devnull, MANIFEST_FIELDS, "csv")
+        elapsed = time.perf_counter() - began
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{'export':>14}: {written:8d} rows {written / elapsed:10.0f} rows/sec  peak {peak / 1024:7.1f} KiB")
+
+
+def serve_demo(flights, seed, ttl, port, started):
+    scheduler = Scheduler()
+    for flight in make_flights(flights, seed):
+        scheduler.schedule_flight(flight, check_conflicts=False)
+    service = FlightService(scheduler, TTLCache(ttl=ttl) if ttl > 0 else None)
+    asyncio.run(service.serve("127.0.0.1", port, ready=lambda bound: started.set()))
+
+
+async def load_client(host, port, paths, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    for path in paths:
+        began = time.perf_counter()
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - began)
+    writer.close()
+
+
+async def load_test(host, port, paths, connections):
+    latencies = []
+    share = len(paths) // connections
+    began = time.perf_counter()
+    await asyncio.gather(*(load_client(host, port, paths[i * share:(i + 1) * share], latencies)
+                           for i in range(connections)))
+    return latencies, time.perf_counter() - began
+
+
+def bench_service(args):
+    rng = random.Random(args.seed)
+    paths = []
+    for _ in range(args.requests):
+        kind = rng.random()
+        if kind < 0.4:
+            paths.append(f"/flights?date=2025-01-{rng.randrange(1, 29):02d}")
+        elif kind < 0.7:
+            paths.append(f"/flights?source={rng.choice(AIRPORTS).replace(' ', '%20')}")
+        else:
+            paths.append(f"/flights/F{rng.randrange(args.flights)}/seats")
+
+    for ttl in (0, args.ttl):
+        if args.url:
+            url = args.url.split("//")[-1]
+            host, port, server = url.split(":")[0], int(url.split(":")[1].strip("/")), None
+        else:
+            host, port = "127.0.0.1", args.port
+            started = multiprocessing.Event()
+            server = multiprocessing.Process(target=serve_demo, args=(args.flights, args.seed, ttl, port, started),
+                                             daemon=True)
+            server.start()
+            started.wait(120)
+        try:
+            latencies, elapsed = asyncio.run(load_test(host, port, paths, args.connections))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.join()
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        label = "external" if args.url else (f"ttl {ttl:g}s" if ttl else "no cache")
+        print(f"{label:>10}: {len(latencies) / elapsed:8.0f} requests/sec  p50 {p50:6.2f}ms  p99 {p99:6.2f}ms")
+        if args.url:
+            break
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flight management benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    query = sub.add_parser("query", help="full scan vs indexed schedule queries")
+    query.add_argument("--flights", type=int, default=200000)
+    query.add_argument("--queries", type=int, default=200)
+    query.add_argument("--seed", type=int, default=1)
+    query.set_defaults(func=bench_query)
+
+    manifest = sub.add_parser("manifest", help="memory per booked passenger and cargo item")
+    manifest.add_argument("--passengers", type=int, default=100000)
+    manifest.add_argument("--seed", type=int, default=1)
+    manifest.set_defaults(func=bench_manifest)
+
+    store = sub.add_parser("store", help="write-through booking rate and cold start of the stores")
+    store.add_argument("--bookings", type=int, default=1000000)
+    store.add_argument("--per-booking", action="store_true",
+                       help="commit each booking on its own instead of one transaction per flight")
+    store.add_argument("--seed", type=int, default=1)
+    store.set_defaults(func=bench_store)
+
+    concurrency = sub.add_parser("concurrency", help="overbookings and throughput as booking threads increase")
+    concurrency.add_argument("--requests", type=int, default=4000)
+    concurrency.add_argument("--flights", type=int, default=64)
+    concurrency.add_argument("--capacity", type=int, default=40)
+    concurrency.add_argument("--latency", type=float, default=0.0005,
+                             help="seconds each booking spends in a simulated store write")
+    concurrency.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    concurrency.add_argument("--seed", type=int, default=1)
+    concurrency.set_defaults(func=bench_concurrency)
+
+    cargo = sub.add_parser("cargo", help="load planning quality vs time")
+    cargo.add_argument("--items", type=int, default=10000)
+    cargo.add_argument("--flights", type=int, default=20)
+    cargo.add_argument("--capacity", type=float, default=100000, help="kg on the single flight")
+    cargo.add_argument("--oversubscription", type=float, default=1.2,
+                       help="pending weight over total fleet capacity")
+    cargo.add_argument("--seed", type=int, default=1)
+    cargo.set_defaults(func=bench_cargo)
+
+    routes = sub.add_parser("routes", help="multi-leg connection queries")
+    routes.add_argument("--flights", type=int, default=50000)
+    routes.add_argument("--days", type=int, default=30)
+    routes.add_argument("--queries", type=int, default=200)
+    routes.add_argument("--seed", type=int, default=1)
+    routes.set_defaults(func=bench_routes)
+
+    io = sub.add_parser("io", help="datetime parsing and streaming export")
+    io.add_argument("--rows", type=int, default=1000000)
+    io.add_argument("--seed", type=int, default=1)
+    io.set_defaults(func=bench_io)
+
+    service = sub.add_parser("service", help="HTTP load test: p50/p99 latency and requests/sec")
+    service.add_argument("--url", help="test a running flight_service.py instead, e.g. http://127.0.0.1:8080")
+    service.add_argument("--port", type=int, default=8765)
+    service.add_argument("--flights", type=int, default=50000)
+    service.add_argument("--requests", type=int, default=20000)
+    service.add_argument("--connections", type=int, default=32)
+    service.add_argument("--ttl", type=float, default=5.0)
+    service.add_argument("--seed", type=int, default=1)
+    service.set_defaults(func=bench_service)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+import argparse
+import bisect
+import csv
+import json
+import sys
+import time
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from itertools import islice
+
+from expert import Cargo, CargoFlight, Flight, Passenger, PassengerFlight, Scheduler
+
+# Everything here streams: readers yield one row at a time and exporters
+# are generators, so file size never shows up in memory use. Imports hold
+# at most one batch of rows at a time.
+SCHEDULE_FIELDS = ('flight_id', 'kind', 'source', 'destination', 'departure', 'arrival',
+                   'aircraft_id', 'capacity', 'max_cargo_weight')
+MANIFEST_FIELDS = ('flight_id', 'passenger_id', 'name', 'contact', 'passport_number', 'seat',
+                   'cargo_id', 'description', 'weight', 'owner_name')
+
+
+def parse_datetime(text):
+    # fromisoformat is implemented in C and accepts both "2025-01-01 09:00"
+    # and "2025-01-01T09:00:00", at a fraction of strptime's cost
+    return datetime.fromisoformat(text)
+
+
+def file_format(path, fmt=None):
+    if fmt:
+        return fmt
+    return 'jsonl' if path.endswith(('.jsonl', '.json', '.ndjson')) else 'csv'
+
+
+def read_rows(path, fmt=None):
+    """Yield one dict per CSV row or JSON line ("-" reads stdin)"""
+    fmt = file_format(path, fmt)
+    f = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+    try:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def write_rows(rows, path, fields, fmt=None):
+    """Stream rows to a CSV or JSONL file ("-" writes stdout), returning the count"""
+    fmt = file_format(path, fmt)
+    f = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+    count = 0
+    try:
+        if fmt == 'csv':
+            writer = csv.DictWriter(f, fields, extrasaction='ignore')
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in rows:
+                f.write(json.dumps(row, default=str) + "\n")
+                count += 1
+    finally:
+        if f is not sys.stdout:
+            f.close()
+    return count
+
+
+def blank(value):
+    return value is None or value == ''
+
+
+def flight_from_row(row, columnar=False):
+    kind = (row.get('kind') or 'P').upper()[0]
+    args = (row['flight_id'], row['source'], row['destination'], parse_datetime(row['departure']),
+            parse_datetime(row['arrival']), None if blank(row.get('aircraft_id')) else row['aircraft_id'])
+    if kind == 'P':
+        return PassengerFlight(*args, int(row['capacity']), columnar=columnar)
+    if kind == 'C':
+        return CargoFlight(*args, float(row['max_cargo_weight']), columnar=columnar)
+    return Flight(*args)
+
+
+def flight_row(flight):
+    row = {'flight_id': flight.flight_id, 'kind': 'F', 'source': flight.source,
+           'destination': flight.destination, 'departure': flight.departure.isoformat(' '),
+           'arrival': flight.arrival.isoformat(' '), 'aircraft_id': flight.aircraft_id or ''}
+    if isinstance(flight, PassengerFlight):
+        row['kind'], row['capacity'] = 'P', flight.passenger_capacity
+    elif isinstance(flight, CargoFlight):
+        row['kind'], row['max_cargo_weight'] = 'C', flight.max_cargo_weight
+    return row
+
+
+def chunks(rows, size):
+    # Each chunk is read in full before the caller opens a transaction on
+    # it, so no transaction stays open while the caller's reader is suspended
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_chunk(chunk, parse):
+    """(parsed rows, how many failed to parse). Runs before batch() is
+    entered, so a malformed row is rejected instead of aborting the
+    import and leaving the scheduler ahead of a rolled-back store."""
+    parsed = []
+    for row in chunk:
+        try:
+            parsed.append(parse(row))
+        except (KeyError, ValueError, TypeError, AttributeError):
+            pass
+    return parsed, len(chunk) - len(parsed)
+
+
+def import_flights(scheduler, rows, check_conflicts=True, columnar=False, batch=None, batch_size=10000):
+    """Schedule a flight per row, returning (scheduled, rejected) counts.
+    Each batch_size rows are applied inside one batch() (e.g. a store's
+    transaction). Malformed rows count as rejected."""
+    scheduled = rejected = 0
+    batch = batch or nullcontext
+    for chunk in chunks(rows, batch_size):
+        flights, malformed = parse_chunk(chunk, lambda row: flight_from_row(row, columnar))
+        rejected += malformed
+        with batch():
+            for flight in flights:
+                if scheduler.schedule_flight(flight, check_conflicts):
+                    scheduled += 1
+                else:
+                    rejected += 1
+    return scheduled, rejected
+
+
+def manifest_entry(row):
+    # (flight_id, Passenger or None, Cargo or None)
+    passenger = cargo = None
+    if not blank(row.get('passenger_id')):
+        passenger = Passenger(row['passenger_id'], row['name'], row['contact'],
+                              None if blank(row.get('passport_number')) else row['passport_number'])
+    if not blank(row.get('cargo_id')):
+        cargo = Cargo(row['cargo_id'], row['description'], float(row['weight']), row['owner_name'])
+    return row['flight_id'], passenger, cargo
+
+
+def import_entry(flights, flight_id, passenger, cargo):
+    flight = flights.get(flight_id)
+    if passenger is not None and isinstance(flight, PassengerFlight):
+        return flight.book_seat(passenger)
+    if cargo is not None and isinstance(flight, CargoFlight):
+        return flight.add_cargo(cargo)
+    return False
+
+
+def import_manifest(scheduler, rows, batch=None, batch_size=10000):
+    """Book a passenger (rows with passenger_id) or load cargo (rows with
+    cargo_id) per row, returning (accepted, rejected) counts. Rows for
+    unknown flights, full flights or duplicate passengers are rejected,
+    as are malformed rows. Batches work as in import_flights."""
+    accepted = rejected = 0
+    batch = batch or nullcontext
+    for chunk in chunks(rows, batch_size):
+        entries, malformed = parse_chunk(chunk, manifest_entry)
+        rejected += malformed
+        with batch():
+            for entry in entries:
+                if import_entry(scheduler.flights, *entry):
+                    accepted += 1
+                else:
+                    rejected += 1
+    return accepted, rejected
+
+
+def flights_departing(scheduler, start=None, end=None):
+    """Flights departing in [start, end) in departure order, one at a time"""
+    departures = scheduler.departures
+    lo = 0 if start is None else bisect.bisect_left(departures, (start,))
+    hi = len(departures) if end is None else bisect.bisect_left(departures, (end,))
+    for index in range(lo, hi):
+        yield scheduler.flights[departures[index][1]]
+
+
+def schedule_rows(scheduler, start=None, end=None):
+    for flight in flights_departing(scheduler, start, end):
+        yield flight_row(flight)
+
+
+def passenger_rows(flight):
+    for passenger in flight.passengers.values():
+        yield {'flight_id': flight.flight_id, 'passenger_id': passenger.passenger_id, 'name': passenger.name,
+               'contact': passenger.contact, 'passport_number': passenger.passport_number or '',
+               'seat': flight.get_seat(passenger.passenger_id)}
+
+
+def cargo_rows(flight):
+    for cargo in flight.cargo_list:
+        yield {'flight_id': flight.flight_id, 'cargo_id': cargo.cargo_id, 'description': cargo.description,
+               'weight': cargo.weight, 'owner_name': cargo.owner_name}
+
+
+def manifest_rows(flights):
+    """Passenger and cargo rows for each flight in turn"""
+    for flight in flights:
+        if isinstance(flight, PassengerFlight):
+            yield from passenger_rows(flight)
+        elif isinstance(flight, CargoFlight):
+            yield from cargo_rows(flight)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import and export for the flight management system")
+    parser.add_argument("--db", required=True, help="SQLite database holding the schedule")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="default: from the file extension")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    flights = sub.add_parser("import-flights", help="schedule flights from a file")
+    flights.add_argument("input")
+    flights.add_argument("--no-conflict-check", action="store_true",
+                         help="trust the file; audit later with Scheduler.find_all_conflicts()")
+    manifest = sub.add_parser("import-manifest", help="book passengers and load cargo from a file")
+    manifest.add_argument("input")
+
+    for name in ("export-schedule", "export-manifest"):
+        export = sub.add_parser(name)
+        export.add_argument("output")
+        export.add_argument("--date", help="only flights departing on this day (YYYY-MM-DD)")
+    sub.choices["export-manifest"].add_argument("--flight", action="append", help="flight ID (repeatable)")
+    args = parser.parse_args()
+
+    from flight_store import SQLiteStore
+    store = SQLiteStore(args.db)
+    scheduler = store.load(Scheduler())
+    began = time.perf_counter()
+    try:
+        if args.command == "import-flights":
+            ok, rejected = import_flights(scheduler, read_rows(args.input, args.format),
+                                          not args.no_conflict_check, batch=store.batch)
+        elif args.command == "import-manifest":
+            ok, rejected = import_manifest(scheduler, read_rows(args.input, args.format), batch=store.batch)
+        else:
+            start = end = None
+            if args.date:
+                start = datetime.fromisoformat(args.date)
+                end = start + timedelta(days=1)
+            if args.command == "export-schedule":
+                ok = write_rows(schedule_rows(scheduler, start, end), args.output, SCHEDULE_FIELDS, args.format)
+            else:
+                if args.flight:
+                    chosen = (scheduler.flights[flight_id] for flight_id in args.flight if flight_id in scheduler.flights)
+                else:
+                    chosen = flights_departing(scheduler, start, end)
+                ok = write_rows(manifest_rows(chosen), args.output, MANIFEST_FIELDS, args.format)
+            rejected = 0
+    finally:
+        store.close()
+    elapsed = time.perf_counter() - began
+    print(f"{ok} rows, {rejected} rejected in {elapsed:.2f}s ({(ok + rejected) / max(elapsed, 1e-9):.0f} rows/sec)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
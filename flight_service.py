@@ -0,0 +1,239 @@
+import argparse
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from expert import CargoFlight, PassengerFlight, Scheduler
+from flight_io import flight_row
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+def encode(body):
+    return json.dumps(body, separators=(',', ':')).encode()
+
+
+class TTLCache:
+    """LRU cache whose entries also expire after `ttl` seconds. It listens
+    to the scheduler: schedule changes clear it, booking and cargo changes
+    drop only the entries for that flight. Listeners can fire on booking
+    threads (see booking_engine), hence the lock.
+
+    A value computed while an invalidation lands may already be stale, so
+    callers read `generation` before computing and pass it to put(), which
+    drops the value if its key was invalidated since."""
+
+    def __init__(self, maxsize=1024, ttl=5.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires, value)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0  # bumped by every invalidation
+        self.cleared = 0  # generation of the last clear()
+        self.discarded = {}  # key -> generation of its last discard() since then
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, generation=None):
+        with self.lock:
+            if generation is not None and (generation < self.cleared or
+                                           generation < self.discarded.get(key, 0)):
+                return
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def discard(self, *keys):
+        with self.lock:
+            self.generation += 1
+            for key in keys:
+                self.entries.pop(key, None)
+                self.discarded[key] = self.generation
+            if len(self.discarded) > self.maxsize:
+                # Forget per-key generations; values in flight are dropped
+                self.cleared = self.generation
+                self.discarded.clear()
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.cleared = self.generation
+            self.discarded.clear()
+            self.entries.clear()
+
+    def on_flight_scheduled(self, flight):
+        self.clear()
+
+    def on_flight_cancelled(self, flight):
+        self.clear()
+
+    def on_flight_rescheduled(self, flight, old_departure, old_arrival):
+        self.clear()
+
+    def flight_changed(self, flight, *args):
+        self.discard(('seats', flight.flight_id))
+
+    on_booking_added = on_booking_cancelled = on_cargo_added = on_cargo_removed = flight_changed
+
+
+class FlightService:
+    """JSON lookups over a shared Scheduler:
+
+        GET /flights?date=YYYY-MM-DD
+        GET /flights?source=...  (or destination=..., aircraft_id=...)
+        GET /flights/<id>
+        GET /flights/<id>/seats
+        GET /stats
+    """
+
+    def __init__(self, scheduler, cache=None):
+        self.scheduler = scheduler
+        self.cache = cache
+        if cache is not None:
+            scheduler.add_listener(cache)
+
+    def cached(self, key, compute):
+        # Responses are cached already encoded, so a hit skips serialisation too
+        if self.cache is None:
+            return encode(compute())
+        payload = self.cache.get(key)
+        if payload is None:
+            generation = self.cache.generation
+            payload = encode(compute())
+            self.cache.put(key, payload, generation)
+        return payload
+
+    def flights_by_date(self, date):
+        day = datetime.fromisoformat(date)
+        return [flight_row(flight) for flight in self.scheduler.get_schedule_by_date(day)]
+
+    def flights_by(self, field, value):
+        flights = sorted(self.scheduler.get_flights_by_criteria(field, value), key=lambda f: f.departure)
+        return [flight_row(flight) for flight in flights]
+
+    def seats(self, flight):
+        if isinstance(flight, PassengerFlight):
+            return {'flight_id': flight.flight_id, 'available_seats': flight.available_seats()}
+        if isinstance(flight, CargoFlight):
+            return {'flight_id': flight.flight_id, 'available_cargo_space': flight.available_cargo_space()}
+        return {'flight_id': flight.flight_id}
+
+    def handle(self, path, query):
+        """Route one GET request, returning (status, JSON body bytes)"""
+        parts = [unquote(part) for part in path.strip('/').split('/')]
+        if parts == ['flights']:
+            if 'date' in query:
+                try:
+                    return 200, self.cached(('date', query['date']), lambda: self.flights_by_date(query['date']))
+                except ValueError:
+                    return 400, encode({'error': 'date must be YYYY-MM-DD'})
+            for field in self.scheduler.INDEXED_FIELDS:
+                if field in query:
+                    key = (field, query[field].casefold())
+                    return 200, self.cached(key, lambda: self.flights_by(field, query[field]))
+            return 400, encode({'error': 'filter by date, source, destination or aircraft_id'})
+        if len(parts) in (2, 3) and parts[0] == 'flights':
+            flight = self.scheduler.flights.get(parts[1])
+            if flight is None:
+                return 404, encode({'error': f'no flight {parts[1]}'})
+            if len(parts) == 2:
+                return 200, encode(flight_row(flight))
+            if parts[2] == 'seats':
+                return 200, self.cached(('seats', flight.flight_id), lambda: self.seats(flight))
+        if parts == ['stats']:
+            stats = {'flights': len(self.scheduler.flights)}
+            if self.cache is not None:
+                stats.update(cache_entries=len(self.cache.entries), hits=self.cache.hits, misses=self.cache.misses)
+            return 200, encode(stats)
+        return 404, encode({'error': 'not found'})
+
+    async def client(self, reader, writer):
+        # HTTP/1.1 with keep-alive; requests on a connection are answered in order
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                keep_alive = True
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode('latin-1').partition(':')
+                    if name.strip().lower() == 'connection' and value.strip().lower() == 'close':
+                        keep_alive = False
+                try:
+                    method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                except ValueError:
+                    status, body, keep_alive = 400, encode({'error': 'bad request line'}), False
+                else:
+                    if method != 'GET':
+                        # Request bodies are never read, so the connection cannot be reused
+                        status, body, keep_alive = 405, encode({'error': 'only GET is supported'}), False
+                    else:
+                        url = urlsplit(target)
+                        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                        status, body = self.handle(url.path, query)
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(body)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode())
+                writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8080, ready=None):
+        server = await asyncio.start_server(self.client, host, port)
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP/JSON lookups over the flight schedule")
+    parser.add_argument("--db", help="SQLite database to serve (see flight_store.py)")
+    parser.add_argument("--flights", help="CSV/JSONL schedule to import instead (see flight_io.py)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--ttl", type=float, default=5.0, help="cache TTL in seconds (0 disables the cache)")
+    parser.add_argument("--cache-size", type=int, default=1024)
+    args = parser.parse_args()
+
+    scheduler = Scheduler()
+    if args.db:
+        from flight_store import SQLiteStore
+        SQLiteStore(args.db).load(scheduler)
+    elif args.flights:
+        from flight_io import import_flights, read_rows
+        import_flights(scheduler, read_rows(args.flights), check_conflicts=False)
+    cache = TTLCache(args.cache_size, args.ttl) if args.ttl > 0 else None
+    service = FlightService(scheduler, cache)
+    print(f"Serving {len(scheduler.flights)} flights on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
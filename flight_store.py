@@ -0,0 +1,322 @@
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+
+from expert import Cargo, CargoFlight, Flight, Passenger, PassengerFlight
+
+# Persistence backends for the flight management system. A store is a
+# Scheduler listener: once attached it writes every schedule, booking and
+# cargo change through to disk, and load() rebuilds a Scheduler from it.
+
+
+def flight_record(flight):
+    if isinstance(flight, PassengerFlight):
+        kind, limit = 'P', flight.passenger_capacity
+    elif isinstance(flight, CargoFlight):
+        kind, limit = 'C', flight.max_cargo_weight
+    else:
+        kind, limit = 'F', None
+    return (flight.flight_id, kind, flight.source, flight.destination,
+            flight.departure.isoformat(), flight.arrival.isoformat(), flight.aircraft_id, limit)
+
+
+def make_flight(flight_id, kind, source, destination, departure, arrival, aircraft_id, limit,
+                columnar=False):
+    departure = datetime.fromisoformat(departure)
+    arrival = datetime.fromisoformat(arrival)
+    if kind == 'P':
+        return PassengerFlight(flight_id, source, destination, departure, arrival, aircraft_id,
+                               int(limit), columnar=columnar)
+    if kind == 'C':
+        return CargoFlight(flight_id, source, destination, departure, arrival, aircraft_id,
+                           limit, columnar=columnar)
+    return Flight(flight_id, source, destination, departure, arrival, aircraft_id)
+
+
+def restore(scheduler, flights, bookings, cargo):
+    """Bulk-load path shared by the stores: flights skip the conflict
+    checks they passed when first scheduled, and manifests are restored
+    in one pass per flight without notifying listeners."""
+    listeners, scheduler.listeners = scheduler.listeners, []
+    try:
+        for flight in flights:
+            scheduler.schedule_flight(flight, check_conflicts=False)
+        for flight_id, items in bookings.items():
+            if items:
+                scheduler.flights[flight_id].restore_bookings(items)
+        for flight_id, items in cargo.items():
+            if items:
+                scheduler.flights[flight_id].restore_cargo(items)
+    finally:
+        scheduler.listeners = listeners
+    return scheduler
+
+
+class SQLiteStore:
+    """SQLite backend in WAL mode. Each change commits on its own unless
+    it happens inside `with store.batch():`, which groups everything into
+    one transaction. Writes are serialized on a lock, so the store can
+    listen to flights booked from several threads."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS flights (
+            flight_id TEXT PRIMARY KEY, kind TEXT NOT NULL, source TEXT, destination TEXT,
+            departure TEXT NOT NULL, arrival TEXT NOT NULL, aircraft_id TEXT, flight_limit REAL);
+        CREATE TABLE IF NOT EXISTS bookings (
+            flight_id TEXT NOT NULL, passenger_id TEXT NOT NULL, name TEXT, contact TEXT,
+            passport_number TEXT, seat INTEGER NOT NULL);
+        CREATE UNIQUE INDEX IF NOT EXISTS bookings_key ON bookings (flight_id, passenger_id);
+        CREATE TABLE IF NOT EXISTS cargo (
+            flight_id TEXT NOT NULL, cargo_id TEXT NOT NULL, description TEXT,
+            weight REAL NOT NULL, owner_name TEXT);
+        CREATE INDEX IF NOT EXISTS cargo_key ON cargo (flight_id, cargo_id);
+    """
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, isolation_level=None, cached_statements=64,
+                                    check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.lock = threading.RLock()
+        self.in_batch = False
+
+    def write(self, sql, params):
+        # Constant SQL strings hit sqlite3's prepared statement cache
+        with self.lock:
+            if self.in_batch:
+                self.conn.execute(sql, params)
+            else:
+                with self.transaction():
+                    self.conn.execute(sql, params)
+
+    @contextmanager
+    def transaction(self):
+        self.conn.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    @contextmanager
+    def batch(self):
+        with self.lock:
+            if self.in_batch:
+                yield
+                return
+            self.in_batch = True
+            try:
+                with self.transaction():
+                    yield
+            finally:
+                self.in_batch = False
+
+    def on_flight_scheduled(self, flight):
+        self.write("INSERT OR REPLACE INTO flights VALUES (?, ?, ?, ?, ?, ?, ?, ?)", flight_record(flight))
+
+    def on_flight_cancelled(self, flight):
+        with self.batch():
+            for table in ("flights", "bookings", "cargo"):
+                self.conn.execute(f"DELETE FROM {table} WHERE flight_id = ?", (flight.flight_id,))
+
+    def on_flight_rescheduled(self, flight, old_departure, old_arrival):
+        self.write("UPDATE flights SET departure = ?, arrival = ? WHERE flight_id = ?",
+                   (flight.departure.isoformat(), flight.arrival.isoformat(), flight.flight_id))
+
+    def on_booking_added(self, flight, passenger, seat):
+        self.write("INSERT INTO bookings VALUES (?, ?, ?, ?, ?, ?)",
+                   (flight.flight_id, passenger.passenger_id, passenger.name, passenger.contact,
+                    passenger.passport_number, seat))
+
+    def on_booking_cancelled(self, flight, passenger_id):
+        self.write("DELETE FROM bookings WHERE flight_id = ? AND passenger_id = ?",
+                   (flight.flight_id, passenger_id))
+
+    def on_cargo_added(self, flight, cargo):
+        self.write("INSERT INTO cargo VALUES (?, ?, ?, ?, ?)",
+                   (flight.flight_id, cargo.cargo_id, cargo.description, cargo.weight, cargo.owner_name))
+
+    def on_cargo_removed(self, flight, cargo_id):
+        # CargoFlight.remove_cargo drops the first matching item
+        self.write("DELETE FROM cargo WHERE rowid = (SELECT MIN(rowid) FROM cargo "
+                   "WHERE flight_id = ? AND cargo_id = ?)", (flight.flight_id, cargo_id))
+
+    def load(self, scheduler, columnar=False):
+        """Rebuild scheduler from the database and attach the store to it"""
+        flights = [make_flight(*row, columnar=columnar) for row in self.conn.execute("SELECT * FROM flights")]
+        bookings = {}
+        for flight_id, passenger_id, name, contact, passport, seat in self.conn.execute(
+                "SELECT * FROM bookings ORDER BY rowid"):
+            bookings.setdefault(flight_id, []).append((Passenger(passenger_id, name, contact, passport), seat))
+        cargo = {}
+        for flight_id, cargo_id, description, weight, owner in self.conn.execute(
+                "SELECT * FROM cargo ORDER BY rowid"):
+            cargo.setdefault(flight_id, []).append(Cargo(cargo_id, description, weight, owner))
+        restore(scheduler, flights, bookings, cargo)
+        scheduler.add_listener(self)
+        return scheduler
+
+    def close(self):
+        self.conn.close()
+
+
+def log_line(op):
+    body = json.dumps(op, separators=(',', ':'))
+    return f"{zlib.crc32(body.encode()):08x} {body}"
+
+
+def read_log_line(raw):
+    """The op in one log line, or None if the line is damaged. Lines
+    written before checksums were added are bare JSON."""
+    if not raw.endswith(b"\n"):
+        return None
+    raw = raw.rstrip(b"\n")
+    try:
+        if raw.startswith(b"["):
+            return json.loads(raw)
+        checksum, body = raw.split(b" ", 1)
+        if int(checksum, 16) != zlib.crc32(body):
+            return None
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+class OpLogStore:
+    """Append-only operation log, one JSON record per line behind a CRC32
+    of it, replayed on load. Writes are buffered and flushed every
+    `flush_every` operations, at the end of a batch() and on close(); with
+    durable=True each flush is fsync'd.
+
+    A crash can leave the last record half-written: load() drops it and
+    truncates the file back to the last whole record. A damaged record
+    followed by good ones is not a torn write, so load() raises instead."""
+
+    def __init__(self, path, flush_every=1, durable=True):
+        self.path = path
+        self.flush_every = flush_every
+        self.durable = durable
+        self.pending = []
+        self.batch_depth = 0
+        self.lock = threading.RLock()
+        self.log = open(path, "a", encoding="utf-8")
+
+    def append(self, *op):
+        line = log_line(op)
+        with self.lock:
+            self.pending.append(line)
+            if not self.batch_depth and len(self.pending) >= self.flush_every:
+                self.flush()
+
+    def flush(self):
+        with self.lock:
+            if self.pending:
+                self.log.write("\n".join(self.pending) + "\n")
+                self.pending = []
+            self.log.flush()
+            if self.durable:
+                os.fsync(self.log.fileno())
+
+    @contextmanager
+    def batch(self):
+        with self.lock:
+            self.batch_depth += 1
+            try:
+                yield
+            finally:
+                self.batch_depth -= 1
+                if not self.batch_depth:
+                    self.flush()
+
+    def on_flight_scheduled(self, flight):
+        self.append('schedule', *flight_record(flight))
+
+    def on_flight_cancelled(self, flight):
+        self.append('cancel', flight.flight_id)
+
+    def on_flight_rescheduled(self, flight, old_departure, old_arrival):
+        self.append('reschedule', flight.flight_id, flight.departure.isoformat(), flight.arrival.isoformat())
+
+    def on_booking_added(self, flight, passenger, seat):
+        self.append('book', flight.flight_id, passenger.passenger_id, passenger.name,
+                    passenger.contact, passenger.passport_number, seat)
+
+    def on_booking_cancelled(self, flight, passenger_id):
+        self.append('unbook', flight.flight_id, passenger_id)
+
+    def on_cargo_added(self, flight, cargo):
+        self.append('load', flight.flight_id, cargo.cargo_id, cargo.description, cargo.weight, cargo.owner_name)
+
+    def on_cargo_removed(self, flight, cargo_id):
+        self.append('unload', flight.flight_id, cargo_id)
+
+    def records(self):
+        """Yield every op in the log, truncating a torn last record"""
+        if not os.path.exists(self.path):
+            return
+        with self.lock:
+            self.flush()
+            good_end = 0
+            damaged = None
+            with open(self.path, "rb") as f:
+                for number, raw in enumerate(f, 1):
+                    if not raw.strip():
+                        # Past a damaged record nothing counts as good, or
+                        # truncating would keep part of the damage
+                        if damaged is None:
+                            good_end += len(raw)
+                        continue
+                    if damaged is not None:
+                        raise ValueError(f"{self.path}: record on line {damaged} is damaged")
+                    op = read_log_line(raw)
+                    if op is None:
+                        damaged = number
+                        continue
+                    good_end += len(raw)
+                    yield op
+            if damaged is not None:
+                os.truncate(self.path, good_end)
+
+    def load(self, scheduler, columnar=False):
+        """Replay the log into plain dicts first, then bulk-load the result"""
+        flights, bookings, cargo = {}, {}, {}
+        for op, flight_id, *args in self.records():
+            if op == 'schedule':
+                flights[flight_id] = args
+                bookings[flight_id] = {}
+                cargo[flight_id] = []
+            elif op == 'cancel':
+                flights.pop(flight_id, None)
+                bookings.pop(flight_id, None)
+                cargo.pop(flight_id, None)
+            elif op == 'reschedule':
+                flights[flight_id][3:5] = args
+            elif op == 'book':
+                passenger_id, name, contact, passport, seat = args
+                bookings[flight_id][passenger_id] = (Passenger(passenger_id, name, contact, passport), seat)
+            elif op == 'unbook':
+                bookings[flight_id].pop(args[0], None)
+            elif op == 'load':
+                cargo[flight_id].append(Cargo(*args))
+            elif op == 'unload':
+                items = cargo[flight_id]
+                for index, item in enumerate(items):
+                    if item.cargo_id == args[0]:
+                        del items[index]
+                        break
+        restore(scheduler,
+                [make_flight(flight_id, *args, columnar=columnar) for flight_id, args in flights.items()],
+                {flight_id: list(items.values()) for flight_id, items in bookings.items()},
+                cargo)
+        scheduler.add_listener(self)
+        return scheduler
+
+    def close(self):
+        self.flush()
+        self.log.close()
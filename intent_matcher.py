@@ -0,0 +1,153 @@
+import random
+import re
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Messages up to this length go through the combined alternation in one
+# regex call; longer ones are prefiltered by keyword first
+SHORT_MESSAGE = 256
+
+# Characters outside ASCII that re.IGNORECASE matches against an ASCII
+# letter and that str.lower() does not already map onto it
+CASE_FIXES = str.maketrans({'ı': 'i', 'ſ': 's'})
+
+
+def refers_to_groups(items):
+    # Numbered backreferences would point at the wrong group once combined
+    for op, av in items:
+        if op in (sre_parse.GROUPREF, sre_parse.GROUPREF_EXISTS):
+            return True
+        if op is sre_parse.SUBPATTERN and refers_to_groups(av[-1]):
+            return True
+        if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and refers_to_groups(av[2]):
+            return True
+        if op is sre_parse.BRANCH and any(refers_to_groups(branch) for branch in av[1]):
+            return True
+        if op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT) and refers_to_groups(av[1]):
+            return True
+    return False
+
+
+def combine(pairs):
+    """One regex trying every pattern in order at the start of a message;
+    the empty marker group closing branch i reports which one matched.
+    Alternation tries branches left to right and nothing follows the
+    alternation, so branch i matches exactly when pattern i does."""
+    branches = []
+    for index, (pattern, _) in enumerate(pairs):
+        if re.compile(pattern, re.IGNORECASE).groupindex:
+            return None
+        if refers_to_groups(sre_parse.parse(pattern, re.IGNORECASE)):
+            return None
+        branches.append(f"(?:{pattern})(?P<_{index}>)")
+    try:
+        return re.compile("|".join(branches), re.IGNORECASE)
+    except re.error:  # e.g. inline global flags in a later pattern
+        return None
+
+
+def required_literals(items):
+    """Lowercase ASCII strings, one of which every match must contain, or
+    None when no such set can be read off the parsed pattern."""
+    options = []
+    run = []
+    for op, av in list(items) + [(None, None)]:
+        if op is sre_parse.LITERAL and av < 128:
+            run.append(chr(av).lower())
+            continue
+        if run:
+            options.append({''.join(run)})
+            run = []
+        if op is sre_parse.SUBPATTERN:
+            inner = required_literals(av[-1])
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            inner = required_literals(av[2])
+        elif op is sre_parse.BRANCH:
+            branches = [required_literals(branch) for branch in av[1]]
+            inner = None if None in branches else set().union(*branches)
+        else:
+            inner = None
+        if inner:
+            options.append(inner)
+    if not options:
+        return None
+    # The most selective option is the one whose shortest literal is longest
+    return max(options, key=lambda option: min(map(len, option)))
+
+
+class IntentMatcher:
+    """Drop-in replacement for nltk.chat.util.Chat built from the same
+    (pattern, responses) pairs.
+
+    Chat.respond runs every pattern's re.match in turn. Short messages go
+    through all patterns combined into one alternation instead. For long
+    ones, where every (.*)keyword(.*) pattern rescans the whole message,
+    each pattern is first reduced to the literals any match must contain,
+    e.g. "book" for (.*)book(.*), and only patterns whose literals occur in
+    the message are tried. Either way patterns are tried in the original
+    order, so the first matching pattern and its groups are exactly Chat's.
+    """
+
+    def __init__(self, pairs, reflections={}):
+        self._pairs = [(re.compile(pattern, re.IGNORECASE), responses) for pattern, responses in pairs]
+        self._reflections = reflections
+        words = "|".join(map(re.escape, sorted(reflections, key=len, reverse=True)))
+        self._regex = re.compile(r"\b({})\b".format(words), re.IGNORECASE) if words else None
+        self._literals = []
+        for pattern, _ in pairs:
+            try:
+                literals = required_literals(sre_parse.parse(pattern, re.IGNORECASE))
+            except Exception:
+                literals = None
+            self._literals.append(tuple(sorted(literals)) if literals else None)
+        self._combined = combine(pairs)
+
+    def candidates(self, message):
+        folded = message.translate(CASE_FIXES).lower()
+        for (pattern, responses), literals in zip(self._pairs, self._literals):
+            if literals is None or any(literal in folded for literal in literals):
+                yield pattern, responses
+
+    def match(self, message):
+        """(match, responses) for the first pattern matching message, or None"""
+        if self._combined is not None and len(message) <= SHORT_MESSAGE:
+            found = self._combined.match(message)
+            if found is None:
+                return None
+            pattern, responses = self._pairs[int(found.lastgroup[1:])]
+            # Re-match alone so group numbers are the pattern's own
+            return pattern.match(message), responses
+        for pattern, responses in self.candidates(message):
+            found = pattern.match(message)
+            if found:
+                return found, responses
+        return None
+
+    def _substitute(self, text):
+        if self._regex is None:
+            return text.lower()
+        return self._regex.sub(lambda mo: self._reflections[mo.string[mo.start():mo.end()]], text.lower())
+
+    def _wildcards(self, response, match):
+        pos = response.find('%')
+        while pos >= 0:
+            num = int(response[pos + 1:pos + 2])
+            response = response[:pos] + self._substitute(match.group(num)) + response[pos + 2:]
+            pos = response.find('%')
+        return response
+
+    def respond(self, message):
+        found = self.match(message)
+        if found is None:
+            return None
+        match, responses = found
+        response = self._wildcards(random.choice(responses), match)
+        # Same punctuation clean-up as Chat.respond
+        if response[-2:] == '?.':
+            response = response[:-2] + '.'
+        if response[-2:] == '??':
+            response = response[:-2] + '?'
+        return response
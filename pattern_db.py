@@ -0,0 +1,209 @@
+import argparse
+import mmap
+import os
+import struct
+import time
+from collections import deque
+
+from astar import Puzzle, goal_matrix
+
+# File layout: magic, board size n, pattern size k, the k pattern tiles,
+# the n*n target layout, then one byte per (ranked placement of the
+# tiles, blank cell). Keeping the blank makes the heuristic consistent:
+# the minimum over blank cells is not, as pattern tiles can wall the
+# blank off, and AStar never reopens a closed state.
+MAGIC = b"PDB2"
+UNREACHED = 0xFF
+
+DEFAULT_PARTITIONS = {
+    3: [(1, 2, 3, 4), (5, 6, 7, 8)],
+    4: [(1, 2, 3, 4, 5), (6, 7, 8, 9, 10), (11, 12, 13, 14, 15)],
+    5: [(1, 2, 3, 4), (5, 6, 7, 8), (9, 10, 11, 12),
+        (13, 14, 15, 16), (17, 18, 19, 20), (21, 22, 23, 24)],
+}
+
+
+def table_size(cells, k):
+    size = 1
+    for i in range(k):
+        size *= cells - i
+    return size
+
+
+def rank(positions, cells):
+    # Mixed-radix rank of k distinct cells out of `cells`, i.e. a perfect
+    # hash onto range(cells! / (cells - k)!)
+    r = 0
+    for i, p in enumerate(positions):
+        smaller = 0
+        for q in positions[:i]:
+            if q < p:
+                smaller += 1
+        r = r * (cells - i) + (p - smaller)
+    return r
+
+
+def unrank(r, cells, k):
+    digits = []
+    for i in range(k - 1, -1, -1):
+        r, digit = divmod(r, cells - i)
+        digits.append(digit)
+    digits.reverse()
+    positions = []
+    for digit in digits:
+        p = 0
+        while True:
+            if p not in positions:
+                if digit == 0:
+                    break
+                digit -= 1
+            p += 1
+        positions.append(p)
+    return positions
+
+
+def neighbours(n):
+    result = []
+    for index in range(n * n):
+        i, j = divmod(index, n)
+        cells = []
+        for di, dj in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            if 0 <= i + di < n and 0 <= j + dj < n:
+                cells.append((i + di) * n + j + dj)
+        result.append(cells)
+    return result
+
+
+def build_table(target_state, pattern):
+    """Retrograde 0-1 BFS from the target over (pattern placement, blank)
+    states, indexed rank * cells + blank. Only moves of pattern tiles cost
+    1, which keeps the tables of a disjoint partition additive."""
+    n = target_state.n
+    cells = n * n
+    k = len(pattern)
+    adjacent = neighbours(n)
+    goal_index = {target_state.tile_at(i): i for i in range(cells)}
+
+    table = bytearray([UNREACHED]) * (table_size(cells, k) * cells)
+
+    start = rank([goal_index[t] for t in pattern], cells) * cells + goal_index[0]
+    queue = deque([(start, 0)])
+    while queue:
+        # A state's first pop carries its distance; later ones are stale
+        state, cost = queue.popleft()
+        if table[state] != UNREACHED:
+            continue
+        table[state] = cost
+        r, blank = divmod(state, cells)
+        positions = unrank(r, cells, k)
+        for cell in adjacent[blank]:
+            if cell in positions:
+                moved = positions[:]
+                moved[positions.index(cell)] = blank
+                nxt = rank(moved, cells) * cells + cell
+                if table[nxt] == UNREACHED:
+                    queue.append((nxt, cost + 1))
+            else:
+                nxt = r * cells + cell
+                if table[nxt] == UNREACHED:
+                    queue.appendleft((nxt, cost))
+    return table
+
+
+def write_table(path, target_state, pattern, table):
+    n = target_state.n
+    header = MAGIC + struct.pack("<BB", n, len(pattern)) + bytes(pattern)
+    header += bytes(target_state.tile_at(i) for i in range(n * n))
+    with open(path, "wb") as f:
+        f.write(header)
+        f.write(table)
+
+
+def table_path(directory, n, pattern):
+    return os.path.join(directory, f"pdb_{n}x{n}_{'-'.join(map(str, pattern))}.bin")
+
+
+def build_databases(target_state, directory, partition=None):
+    partition = partition or DEFAULT_PARTITIONS[target_state.n]
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for pattern in partition:
+        path = table_path(directory, target_state.n, pattern)
+        write_table(path, target_state, pattern, build_table(target_state, pattern))
+        paths.append(path)
+    return paths
+
+
+class PatternTable:
+    # One memory-mapped table. Pages are shared through the page cache by
+    # every process that maps the same file.
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data[:4] != MAGIC:
+            raise ValueError(f"{path} is not a pattern database in this format; rebuild it with pattern_db.py")
+        self.n, k = struct.unpack_from("<BB", self.data, 4)
+        self.pattern = tuple(self.data[6:6 + k])
+        cells = self.n * self.n
+        self.target = tuple(self.data[6 + k:6 + k + cells])
+        self.offset = 6 + k + cells
+
+    def lookup(self, positions, blank):
+        cells = self.n * self.n
+        return self.data[self.offset + rank(positions, cells) * cells + blank]
+
+    def close(self):
+        self.data.close()
+
+
+class PatternDatabaseHeuristic:
+    """Additive disjoint pattern database heuristic for AStar."""
+
+    def __init__(self, target_state, paths):
+        self.tables = [PatternTable(path) for path in paths]
+        target = tuple(target_state.tile_at(i) for i in range(target_state.n * target_state.n))
+        self.group_of = {}
+        for table in self.tables:
+            if table.n != target_state.n or table.target != target:
+                raise ValueError("pattern database was built for a different target")
+            for tile in table.pattern:
+                self.group_of[tile] = table
+
+    def group_value(self, puzzle, table):
+        cells = puzzle.n * puzzle.n
+        where = {}
+        for index in range(cells):
+            where[puzzle.tile_at(index)] = index
+        return table.lookup([where[t] for t in table.pattern], where[0])
+
+    def estimate(self, puzzle):
+        return sum(self.group_value(puzzle, table) for table in self.tables)
+
+    def update(self, parent, child):
+        table = self.group_of.get(child.tile_at(parent.blank))
+        if table is None:
+            return parent.h_cost
+        return parent.h_cost - self.group_value(parent, table) + self.group_value(child, table)
+
+    def close(self):
+        for table in self.tables:
+            table.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build additive pattern databases")
+    parser.add_argument("--size", type=int, default=4)
+    parser.add_argument("--out", default="pdb")
+    args = parser.parse_args()
+
+    target = Puzzle(goal_matrix(args.size))
+    for pattern in DEFAULT_PARTITIONS[args.size]:
+        began = time.perf_counter()
+        path = table_path(args.out, args.size, pattern)
+        os.makedirs(args.out, exist_ok=True)
+        write_table(path, target, pattern, build_table(target, pattern))
+        print(f"{path}: {time.perf_counter() - began:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
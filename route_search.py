@@ -0,0 +1,153 @@
+import bisect
+from datetime import timedelta
+
+
+class RouteIndex:
+    """Time-dependent route graph over a Scheduler's flights.
+
+    Airports are nodes; each keeps its departures sorted by time. All
+    flights also form one list of connections sorted by departure, which
+    is what the connection scan walks. Attached to a scheduler, the index
+    follows its flight_scheduled / flight_cancelled / flight_rescheduled
+    events, so it never needs rebuilding.
+    """
+
+    def __init__(self, scheduler=None, min_layover=timedelta(minutes=45)):
+        self.min_layover = min_layover
+        self.flights = {}
+        # (departure, arrival, source key, destination key, flight_id)
+        self.connections = []
+        # casefolded airport -> sorted [(departure, flight_id)]
+        self.airports = {}
+        if scheduler is not None:
+            self.attach(scheduler)
+
+    def attach(self, scheduler):
+        for flight in scheduler.flights.values():
+            self.add(flight)
+        scheduler.add_listener(self)
+
+    def connection(self, flight, departure=None, arrival=None):
+        return (departure or flight.departure, arrival or flight.arrival,
+                flight.source.casefold(), flight.destination.casefold(), flight.flight_id)
+
+    def add(self, flight):
+        self.flights[flight.flight_id] = flight
+        bisect.insort(self.connections, self.connection(flight))
+        bisect.insort(self.airports.setdefault(flight.source.casefold(), []),
+                      (flight.departure, flight.flight_id))
+        self.airports.setdefault(flight.destination.casefold(), [])
+
+    def remove(self, flight, departure=None, arrival=None):
+        departure = departure or flight.departure
+        entry = self.connection(flight, departure, arrival)
+        pos = bisect.bisect_left(self.connections, entry)
+        if pos < len(self.connections) and self.connections[pos] == entry:
+            del self.connections[pos]
+        outgoing = self.airports.get(flight.source.casefold(), [])
+        pos = bisect.bisect_left(outgoing, (departure, flight.flight_id))
+        if pos < len(outgoing) and outgoing[pos] == (departure, flight.flight_id):
+            del outgoing[pos]
+        self.flights.pop(flight.flight_id, None)
+
+    def on_flight_scheduled(self, flight):
+        self.add(flight)
+
+    def on_flight_cancelled(self, flight):
+        self.remove(flight)
+
+    def on_flight_rescheduled(self, flight, old_departure, old_arrival):
+        self.remove(flight, old_departure, old_arrival)
+        self.add(flight)
+
+    def departures_from(self, airport, after, limit=None):
+        """Flights leaving airport at or after a time, in departure order"""
+        outgoing = self.airports.get(airport.casefold(), [])
+        start = bisect.bisect_left(outgoing, (after,))
+        end = len(outgoing) if limit is None else start + limit
+        return [self.flights[flight_id] for _, flight_id in outgoing[start:end]]
+
+    def window(self, start, end):
+        return self.connections[bisect.bisect_left(self.connections, (start,)):
+                                bisect.bisect_left(self.connections, (end,))]
+
+    def journey(self, reached_by, target):
+        legs = []
+        airport = target
+        while airport in reached_by:
+            flight = self.flights[reached_by[airport]]
+            legs.append(flight)
+            airport = flight.source.casefold()
+        legs.reverse()
+        return legs
+
+    def earliest_arrival(self, source, destination, depart_after, within=timedelta(days=2)):
+        """Legs of the journey reaching destination soonest, or None. Only
+        flights departing and arriving before depart_after + within are
+        used, so a journey must be over by then.
+
+        Connection scan: connections are taken in departure order, and one
+        is usable if its airport was reached at least min_layover before
+        it leaves. The scan stops once departures pass the best arrival
+        found at the destination."""
+        source, target = source.casefold(), destination.casefold()
+        arrival = {}
+        reached_by = {}
+        horizon = depart_after + within
+        layover = self.min_layover
+        for departure, arrive, origin, stop, flight_id in self.window(depart_after, horizon):
+            if departure >= arrival.get(target, horizon):
+                break
+            if origin == source:
+                usable = True
+            else:
+                reached = arrival.get(origin)
+                usable = reached is not None and departure >= reached + layover
+            if usable and arrive < arrival.get(stop, horizon) and stop != source:
+                arrival[stop] = arrive
+                reached_by[stop] = flight_id
+        if target not in arrival:
+            return None
+        return self.journey(reached_by, target)
+
+    def connections_pareto(self, source, destination, depart_after, max_legs=3, within=timedelta(days=2)):
+        """Journeys trading legs against arrival time: one per leg count
+        that arrives strictly earlier than any journey with fewer legs,
+        fewest legs first. As in earliest_arrival, `within` bounds arrivals
+        as well as departures.
+
+        Round k scans the connections once, extending only the airports
+        first reached (or reached earlier) in round k - 1, so each journey
+        found in round k has exactly k legs."""
+        source, target = source.casefold(), destination.casefold()
+        horizon = depart_after + within
+        layover = self.min_layover
+        window = self.window(depart_after, horizon)
+        # ready: airport -> earliest time a flight may leave it this round
+        ready = {source: depart_after}
+        best = {source: depart_after}
+        routes = {source: []}
+        journeys = []
+        for legs in range(1, max_legs + 1):
+            improved = {}
+            for departure, arrive, origin, stop, flight_id in window:
+                if departure >= best.get(target, horizon):
+                    break
+                if origin in ready and departure >= ready[origin] and arrive < best.get(stop, horizon) \
+                        and arrive < improved.get(stop, (horizon,))[0]:
+                    improved[stop] = (arrive, flight_id, origin)
+            if not improved:
+                break
+            new_routes = {}
+            for stop, (arrive, flight_id, origin) in improved.items():
+                best[stop] = arrive
+                new_routes[stop] = routes[origin] + [self.flights[flight_id]]
+            routes.update(new_routes)
+            if target in improved:
+                journeys.append(new_routes[target])
+            ready = {stop: arrive + layover for stop, (arrive, _, _) in improved.items() if stop != target}
+        return journeys
+
+    def fewest_connections(self, source, destination, depart_after, max_legs=3, within=timedelta(days=2)):
+        journeys = self.connections_pareto(source, destination, depart_after, max_legs, within)
+        return journeys[0] if journeys else None
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from astar import Puzzle, goal_matrix, solve
+
+MODES = ("astar", "bidirectional", "idastar")
+
+
+def scrambled(n, steps, seed):
+    rng = random.Random(seed)
+    puzzle = Puzzle(goal_matrix(n))
+    for _ in range(steps):
+        moves = [puzzle.can_move_up(), puzzle.can_move_down(), puzzle.can_move_left(), puzzle.can_move_right()]
+        puzzle = rng.choice([move for move in moves if move])
+    return Puzzle(puzzle.matrix)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_searches_agree_on_optimal_length(seed):
+    target = Puzzle(goal_matrix(3))
+    start = scrambled(3, 40, seed)
+    results = {mode: solve(start, target, mode) for mode in MODES}
+    assert len({len(result.path) for result in results.values()}) == 1
+    for result in results.values():
+        assert result.path[0] == start and result.path[-1] == target
+
+
+def test_start_taken_from_an_earlier_path():
+    target = Puzzle(goal_matrix(3))
+    start = scrambled(3, 60, 7)
+    path = solve(start, target, "astar").path
+    assert len(path) > 5
+    middle = path[4]
+    for mode in MODES:
+        result = solve(middle, target, mode)
+        assert result.path[0] == middle
+        assert len(result.path) == len(path) - 4
+    # The caller's states keep their own chain
+    assert middle.parent is path[3]
+
+
+def test_unsolvable():
+    target = Puzzle(goal_matrix(3))
+    start = Puzzle([[2, 1, 3], [4, 5, 6], [7, 8, 0]])
+    for mode in MODES:
+        assert not solve(start, target, mode)
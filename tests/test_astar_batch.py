@@ -0,0 +1,26 @@
+from astar_batch import parse_instance, read_instances, solve_batch, solve_instance
+
+NO_BLANK = {"id": "bad", "start": [[1, 2], [3, 4]], "target": [[1, 2], [4, 3]]}
+
+
+def test_batch_reports_bad_instances_without_aborting():
+    instances = [parse_instance("1 2 3 4 5 6 7 0 8", 1), NO_BLANK, parse_instance("2 1 3 4 5 6 7 8 0", 3)]
+    results = {result["id"]: result for result in solve_batch(instances, workers=1, chunksize=1)}
+    assert results[1]["length"] == 1
+    assert results["bad"]["status"] == "error"
+    assert results[3]["length"] is None and results[3]["status"] == "unsolvable"
+
+
+def test_solve_instance_catches_errors():
+    result = solve_instance(NO_BLANK)
+    assert result["status"] == "error" and result["moves"] is None
+
+
+def test_malformed_lines_become_error_results(tmp_path):
+    path = tmp_path / "instances.txt"
+    path.write_text("1 2 3 4 5 6 7 0 8\nnot json\n[1, 2, 3]\n{\"id\": \"x\"}\n1 2 3 4 5 6 0 7 8\n")
+    results = {result["id"]: result for result in solve_batch(read_instances(str(path)), workers=1, chunksize=2)}
+    assert results[1]["length"] == 1 and results[5]["length"] == 2
+    for line_number in (2, 3, 4):
+        assert results[line_number]["status"] == "error"
+        assert results[line_number]["error"].startswith(f"line {line_number}: ")
@@ -0,0 +1,31 @@
+import sqlite3
+
+from astar import Puzzle, goal_matrix, solve
+from astar_cache import LRUBackend, SQLiteBackend, SolutionCache, canonical_key
+
+
+def test_cached_answers_match_a_fresh_search(tmp_path):
+    target = Puzzle(goal_matrix(3))
+    start = Puzzle([[1, 8, 2], [4, 0, 5], [7, 3, 6]])
+    backend = SQLiteBackend(str(tmp_path / "cache.db"))
+    cache = SolutionCache(LRUBackend(), backend)
+    first = cache.solve(start, target)
+    again = cache.solve(start, target)
+    assert cache.hits == 1
+    assert again.moves == first.moves
+    assert len(again.path) == len(solve(start, target).path)
+    backend.close()
+
+
+def test_old_key_scheme_is_dropped(tmp_path):
+    path = str(tmp_path / "cache.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE solutions (key TEXT PRIMARY KEY, moves TEXT NOT NULL)")
+    conn.execute("INSERT INTO solutions VALUES ('3:8:0', 'uu')")
+    conn.commit()
+    conn.close()
+    backend = SQLiteBackend(path)
+    assert backend.get('3:8:0') is None
+    target = Puzzle(goal_matrix(3))
+    assert canonical_key(target, target).startswith("v2:")
+    backend.close()
@@ -0,0 +1,61 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from booking_engine import BookingEngine
+from expert import Passenger, PassengerFlight, Scheduler
+
+
+def make_flight(flight_id, capacity=50, aircraft_id=None):
+    return PassengerFlight(flight_id, "Delhi", "Mumbai", datetime(2025, 1, 1, 8), datetime(2025, 1, 1, 10),
+                           aircraft_id, capacity)
+
+
+def passenger(i):
+    return Passenger(f"P{i}", f"Passenger {i}", f"p{i}@example.com")
+
+
+def test_concurrent_bookings_never_overbook():
+    scheduler = Scheduler()
+    engine = BookingEngine(scheduler)
+    for i in range(4):
+        engine.schedule_flight(make_flight(f"F{i}"), check_conflicts=False)
+    gate = threading.Barrier(8)
+
+    def book(worker):
+        gate.wait()
+        return sum(engine.book_seat(f"F{i % 4}", passenger(worker * 1000 + i)) for i in range(200))
+
+    with ThreadPoolExecutor(8) as pool:
+        booked = sum(pool.map(book, range(8)))
+    assert booked == 4 * 50
+    for flight in scheduler.flights.values():
+        assert len(flight.passengers) == flight.passenger_capacity
+        assert sorted(flight.seats.values()) == list(range(1, 51))
+
+
+def test_cancelled_flights_release_their_locks():
+    scheduler = Scheduler()
+    engine = BookingEngine(scheduler)
+    for i in range(100):
+        engine.schedule_flight(make_flight(f"F{i}"), check_conflicts=False)
+        engine.book_seat(f"F{i}", passenger(i))
+        assert engine.cancel_flight(f"F{i}")
+    scheduler.schedule_flight(make_flight("direct"))
+    scheduler.cancel_flight("direct")
+    assert not engine.book_seat("F1", passenger(1))
+    assert not engine.cancel_flight("F1")
+    assert engine.locks == {}
+
+
+def test_refused_or_replaced_flights_keep_locks_consistent():
+    scheduler = Scheduler()
+    engine = BookingEngine(scheduler)
+    assert engine.schedule_flight(make_flight("F1", aircraft_id="A1"))
+    assert not engine.schedule_flight(make_flight("F2", aircraft_id="A1"))
+    assert set(engine.locks) == {"F1"}
+    lock = engine.locks["F1"]
+    assert engine.schedule_flight(make_flight("F1", capacity=1, aircraft_id="A1"))
+    assert engine.locks["F1"] is lock
+    assert engine.book_seat("F1", passenger(1))
+    assert not engine.book_seat("F1", passenger(2))
@@ -0,0 +1,61 @@
+import random
+from datetime import datetime
+from itertools import combinations
+
+from cargo_planning import best_value_subset, plan_single
+from expert import WEIGHT_SLACK, Cargo, CargoFlight
+
+
+def best_by_brute_force(items, capacity, value):
+    best = 0.0
+    for size in range(len(items) + 1):
+        for subset in combinations(items, size):
+            if sum(cargo.weight for cargo in subset) <= capacity + WEIGHT_SLACK:
+                best = max(best, sum(value(cargo) for cargo in subset))
+    return best
+
+
+def random_cases(count):
+    rng = random.Random(17)
+    for _ in range(count):
+        capacity = round(rng.uniform(0.5, 20), 2)
+        items = [Cargo(f"c{i}", "x" * rng.randint(1, 9), round(rng.uniform(0.05, 8), 2), "owner")
+                 for i in range(rng.randint(1, 9))]
+        yield capacity, items
+
+
+def test_small_fractional_loads_are_heaviest_possible():
+    weight = lambda cargo: cargo.weight
+    for capacity, items in random_cases(200):
+        flight = CargoFlight("C1", "Delhi", "Mumbai", datetime(2025, 1, 1, 8), datetime(2025, 1, 1, 10),
+                             "A1", capacity)
+        plan = plan_single(flight, items)
+        loaded = plan.assignments["C1"]
+        assert sum(cargo.weight for cargo in loaded) <= capacity + WEIGHT_SLACK
+        assert abs(sum(map(weight, loaded)) - best_by_brute_force(items, capacity, weight)) < 1e-6
+        assert plan.apply() == []
+
+
+def test_small_fractional_value_knapsack_is_exact():
+    price = lambda cargo: len(cargo.description)
+    for capacity, items in random_cases(200):
+        chosen = [items[i] for i in best_value_subset(items, capacity, price)]
+        assert sum(cargo.weight for cargo in chosen) <= capacity + WEIGHT_SLACK
+        assert sum(map(price, chosen)) == best_by_brute_force(items, capacity, price)
+
+
+def test_never_worse_than_first_come():
+    rng = random.Random(5)
+    priority = lambda cargo: len(cargo.description)
+    for seed in range(3):
+        items = [Cargo(f"C{i}", "x" * rng.randint(1, 9), round(min(rng.lognormvariate(6.5, 1.0), 20000), 1),
+                       "owner") for i in range(500)]
+        flight = CargoFlight("C1", "Delhi", "Mumbai", datetime(2025, 1, 1, 8), datetime(2025, 1, 1, 10),
+                             "A1", 100000.0)
+        for value in (None, priority):
+            arrival = CargoFlight("C1", "Delhi", "Mumbai", datetime(2025, 1, 1, 8), datetime(2025, 1, 1, 10),
+                                  "A1", 100000.0)
+            first_come = [cargo for cargo in items if arrival.add_cargo(cargo)]
+            total = lambda loaded: sum((value or (lambda cargo: cargo.weight))(cargo) for cargo in loaded)
+            planned = plan_single(flight, items, value).assignments["C1"]
+            assert total(planned) >= total(first_come) - 1e-6
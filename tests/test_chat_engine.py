@@ -0,0 +1,43 @@
+import functools
+
+from bot_resources import HISTORY_DB_ENV, build_catalog, history_db, new_history
+from chat_engine import ChatServer, ConversationEngine
+from chat_patterns import patterns
+from intent_matcher import IntentMatcher
+
+
+def engine():
+    return ConversationEngine(build_catalog(), functools.cache(functools.partial(IntentMatcher, patterns)))
+
+
+def test_order_flow_tolerates_typos():
+    server = ChatServer(engine())
+    assert "fiction" in server.respond("a", "start order")
+    assert "The Great Gatsby" in server.respond("a", "fictoin")
+    assert "added to your cart" in server.respond("a", "great gatsby")
+    assert "Order confirmed" in server.respond("a", "yes")
+    assert len(server.sessions["a"].history) == 8
+
+
+def test_sessions_share_one_history_connection_and_release_it(tmp_path, monkeypatch):
+    monkeypatch.setenv(HISTORY_DB_ENV, str(tmp_path / "history.db"))
+    server = ChatServer(engine(), ttl=60)
+    for i in range(50):
+        server.respond(f"s{i}", "hi")
+    spills = [session.history.spill for session in server.sessions.values()]
+    assert len({id(spill.conn) for spill in spills}) == 1
+    assert not any(spill.owns_conn for spill in spills)
+
+    closed = []
+    for session in server.sessions.values():
+        session.history.close = functools.partial(closed.append, session.session_id)
+    assert server.evict(now=float("inf")) == 50
+    assert len(closed) == 50 and not server.sessions
+    spills[0].conn.close()
+    history_db.cache_clear()
+
+
+def test_new_history_without_a_database():
+    history = new_history("x")
+    history.append("user", "hi")
+    assert history.last(5) == [{"role": "user", "content": "hi"}]
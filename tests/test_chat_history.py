@@ -0,0 +1,26 @@
+import pytest
+
+from chat_history import ChatHistory, SQLiteSpill
+
+
+def contents(messages):
+    return [message["content"] for message in messages]
+
+
+@pytest.mark.parametrize("window", [0, 1, 10, 500])
+@pytest.mark.parametrize("spill", ["memory", "sqlite"])
+def test_pages_cover_every_message_in_order(window, spill):
+    history = ChatHistory(window, SQLiteSpill(":memory:", "s") if spill == "sqlite" else None)
+    for i in range(300):
+        history.append("user" if i % 2 == 0 else "assistant", f"m{i}")
+    assert len(history) == 300
+    assert contents(history.page(0, 300)) == [f"m{i}" for i in range(300)]
+    assert contents(history.page(95, 140)) == [f"m{i}" for i in range(95, 140)]
+    assert contents(history.last(3)) == ["m297", "m298", "m299"]
+    assert history.page(-5, 0) == [] and history.page(299, 400) == [{"role": "assistant", "content": "m299"}]
+    history.close()
+
+
+def test_negative_window_is_rejected():
+    with pytest.raises(ValueError):
+        ChatHistory(-1)
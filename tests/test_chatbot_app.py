@@ -0,0 +1,30 @@
+import os
+
+import pytest
+
+pytest.importorskip("streamlit")
+from streamlit.testing.v1 import AppTest
+
+from bot_resources import CATALOG_ENV, NO_CACHE_ENV
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "chatbot.py")
+
+
+@pytest.mark.parametrize("no_cache", ["1", ""])
+def test_order_flow_through_the_app(tmp_path, monkeypatch, no_cache):
+    catalog = tmp_path / "catalog.csv"
+    catalog.write_text("title,category\nThe Alchemist,fiction\n1984,fiction\nSapiens,non-fiction\n")
+    monkeypatch.setenv(CATALOG_ENV, str(catalog))
+    monkeypatch.setenv(NO_CACHE_ENV, no_cache)
+    app = AppTest.from_file(SCRIPT, default_timeout=60)
+    app.run()
+    assert not app.exception
+    replies = []
+    for message in ["start order", "fiction", "the alchemst", "yes"]:
+        app.chat_input[0].set_value(message).run()
+        assert not app.exception
+        replies.append(app.chat_message[-1].markdown[0].value)
+    assert replies[1].startswith("You selected fiction category")
+    assert replies[2] == "'The Alchemist' added to your cart. Cost is ₹500. Should I confirm the order? (yes/no)"
+    assert replies[3].startswith("Order confirmed!")
+    assert [expander.label for expander in app.sidebar.expander] == ["Fiction Books", "Non-fiction Books"]
@@ -0,0 +1,103 @@
+import random
+from datetime import datetime, timedelta
+
+from expert import Flight, Scheduler, occupied_until
+
+DAY = datetime(2025, 1, 1)
+
+
+def at(hour):
+    return DAY + timedelta(hours=hour)
+
+
+def flight(flight_id, departure, arrival, aircraft_id="A1"):
+    return Flight(flight_id, "Delhi", "Mumbai", at(departure), at(arrival), aircraft_id)
+
+
+def overlaps(a, b):
+    return (a.departure < occupied_until(b.departure, b.arrival)
+            and b.departure < occupied_until(a.departure, a.arrival))
+
+
+def test_find_conflict_edges():
+    scheduler = Scheduler()
+    assert scheduler.schedule_flight(flight("F1", 8, 10))
+    assert scheduler.schedule_flight(flight("F2", 10, 12))  # adjacent
+    assert scheduler.schedule_flight(flight("F0", 6, 8))  # adjacent before
+    assert not scheduler.schedule_flight(flight("X1", 8, 10))  # identical
+    assert not scheduler.schedule_flight(flight("X2", 8.5, 9.5))  # nested inside
+    assert not scheduler.schedule_flight(flight("X3", 7, 13))  # nesting several
+    assert not scheduler.schedule_flight(flight("X4", 11, 14))  # straddling the end
+    assert scheduler.schedule_flight(flight("F3", 12, 13, "B1"))  # another aircraft
+    assert scheduler.find_aircraft_conflict("a1", at(9), at(9.5)) == "F1"  # aircraft IDs are case-folded
+    assert scheduler.find_aircraft_conflict("A1", at(12), at(13)) is None
+    assert scheduler.find_all_conflicts() == []
+
+
+def test_zero_length_flights_hold_their_instant():
+    scheduler = Scheduler()
+    assert scheduler.schedule_flight(flight("F1", 8, 10))
+    assert scheduler.find_aircraft_conflict("A1", at(8), at(8)) == "F1"  # same departure
+    assert scheduler.find_aircraft_conflict("A1", at(9), at(9)) == "F1"  # in the air
+    assert scheduler.find_aircraft_conflict("A1", at(10), at(10)) is None  # already landed
+    assert scheduler.schedule_flight(flight("Z1", 11, 11))
+    assert scheduler.find_aircraft_conflict("A1", at(11), at(11)) == "Z1"
+    assert scheduler.find_aircraft_conflict("A1", at(10), at(12)) == "Z1"
+    assert scheduler.find_aircraft_conflict("A1", at(10), at(11)) is None
+    scheduler.schedule_flight(flight("Z2", 11, 11), check_conflicts=False)
+    scheduler.schedule_flight(flight("F2", 9, 9), check_conflicts=False)
+    assert sorted(map(sorted, scheduler.find_all_conflicts())) == [["F1", "F2"], ["Z1", "Z2"]]
+
+
+def test_reschedule_checks_against_the_other_flights():
+    scheduler = Scheduler()
+    for f in (flight("F1", 8, 10), flight("F2", 12, 14)):
+        scheduler.schedule_flight(f)
+    f1 = scheduler.flights["F1"]
+    assert f1.reschedule(at(9), at(11))  # overlapping only its own old slot
+    assert not f1.reschedule(at(11), at(13))
+    assert (f1.departure, f1.arrival) == (at(9), at(11))
+    assert f1.reschedule(at(14), at(16))  # adjacent after F2
+    assert scheduler.find_aircraft_conflict("A1", at(10), at(12)) is None
+    assert scheduler.find_aircraft_conflict("A1", at(13), at(15)) == "F2"
+    assert scheduler.find_aircraft_conflict("A1", at(15), at(17)) == "F1"
+    scheduler.cancel_flight("F2")
+    assert scheduler.find_aircraft_conflict("A1", at(13), at(14)) is None
+
+
+def test_find_all_conflicts_matches_brute_force():
+    rng = random.Random(14)
+    for _ in range(50):
+        scheduler = Scheduler()
+        for i in range(40):
+            departure = rng.randrange(48) / 2
+            length = rng.choice([0, 0.5, 1, 2, 4])
+            scheduler.schedule_flight(flight(f"F{i}", departure, departure + length, rng.choice("AB")),
+                                      check_conflicts=False)
+        flights = list(scheduler.flights.values())
+        for f in flights[:10]:
+            scheduler.flights[f.flight_id].reschedule(f.departure + timedelta(hours=1), f.arrival + timedelta(hours=1))
+        expected = {frozenset((a.flight_id, b.flight_id)) for i, a in enumerate(flights) for b in flights[i + 1:]
+                    if a.aircraft_id == b.aircraft_id and overlaps(a, b)}
+        found = [frozenset(pair) for pair in scheduler.find_all_conflicts()]
+        assert len(found) == len(set(found)) and set(found) == expected
+
+
+def test_find_conflict_matches_brute_force_on_conflict_free_schedules():
+    rng = random.Random(15)
+    for _ in range(50):
+        scheduler = Scheduler()
+        for i in range(60):
+            departure = rng.randrange(48) / 2
+            scheduler.schedule_flight(flight(f"F{i}", departure, departure + rng.choice([0, 0.5, 1, 3])))
+        flights = list(scheduler.flights.values())
+        for f in flights[:10]:
+            shift = timedelta(hours=rng.choice([-2, 1, 3]))
+            f.reschedule(f.departure + shift, f.arrival + shift)
+        assert scheduler.find_all_conflicts() == []
+        for _ in range(40):
+            departure = rng.randrange(50) / 2
+            probe = flight("probe", departure, departure + rng.choice([0, 0.5, 2]))
+            conflict = scheduler.find_aircraft_conflict("A1", probe.departure, probe.arrival)
+            overlapping = {f.flight_id for f in flights if overlaps(f, probe)}
+            assert (conflict in overlapping) if overlapping else conflict is None
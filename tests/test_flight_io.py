@@ -0,0 +1,69 @@
+from contextlib import contextmanager
+
+from expert import Scheduler
+from flight_io import import_flights, import_manifest, schedule_rows
+from flight_store import SQLiteStore
+
+
+def flight_rows(count):
+    for i in range(count):
+        yield {'flight_id': f"F{i}", 'kind': 'P', 'source': "Delhi", 'destination': "Mumbai",
+               'departure': f"2025-01-01 {i % 24:02d}:00", 'arrival': f"2025-01-02 {i % 24:02d}:00",
+               'aircraft_id': '', 'capacity': '2'}
+
+
+def test_rows_are_never_read_inside_a_batch():
+    open_batches = []
+
+    @contextmanager
+    def batch():
+        open_batches.append(True)
+        try:
+            yield
+        finally:
+            open_batches.pop()
+
+    def watched(rows):
+        for row in rows:
+            assert not open_batches
+            yield row
+
+    scheduler = Scheduler()
+    assert import_flights(scheduler, watched(flight_rows(25)), batch=batch, batch_size=10) == (25, 0)
+    manifest = ({'flight_id': f"F{i % 30}", 'passenger_id': f"P{i}", 'name': "N", 'contact': "c"}
+                for i in range(60))
+    assert import_manifest(scheduler, watched(manifest), batch=batch, batch_size=7) == (50, 10)
+
+
+def test_import_round_trips_through_the_store(tmp_path):
+    path = str(tmp_path / "flights.db")
+    store = SQLiteStore(path)
+    scheduler = store.load(Scheduler())
+    import_flights(scheduler, flight_rows(25), check_conflicts=False, batch=store.batch, batch_size=10)
+    store.close()
+    store = SQLiteStore(path)
+    reloaded = store.load(Scheduler())
+    assert list(schedule_rows(reloaded)) == list(schedule_rows(scheduler))
+    store.close()
+
+
+def test_malformed_rows_are_rejected_without_splitting_memory_from_disk(tmp_path):
+    path = str(tmp_path / "flights.db")
+    store = SQLiteStore(path)
+    scheduler = store.load(Scheduler())
+    rows = list(flight_rows(10))
+    rows[3] = dict(rows[3], departure="not a date")
+    rows[5] = dict(rows[5], capacity="many")
+    del rows[7]['source']
+    assert import_flights(scheduler, rows, check_conflicts=False, batch=store.batch, batch_size=4) == (7, 3)
+    manifest = [{'flight_id': "F0", 'passenger_id': "P1", 'name': "N", 'contact': "c"},
+                {'flight_id': "F0", 'passenger_id': "P2", 'name': "N"},
+                {'flight_id': "F0", 'cargo_id': "C1", 'description': "box", 'weight': "heavy", 'owner_name': "O"},
+                {'flight_id': "F0", 'passenger_id': "P3", 'name': "N", 'contact': "c"}]
+    assert import_manifest(scheduler, manifest, batch=store.batch, batch_size=4) == (2, 2)
+    store.close()
+    store = SQLiteStore(path)
+    reloaded = store.load(Scheduler())
+    assert list(schedule_rows(reloaded)) == list(schedule_rows(scheduler))
+    assert list(reloaded.flights["F0"].passengers) == ["P1", "P3"]
+    store.close()
@@ -0,0 +1,46 @@
+import json
+from datetime import datetime
+
+from expert import Passenger, PassengerFlight, Scheduler
+from flight_service import FlightService, TTLCache
+
+
+def make_service():
+    scheduler = Scheduler()
+    scheduler.schedule_flight(PassengerFlight("F1", "Delhi", "Mumbai", datetime(2025, 1, 1, 8),
+                                              datetime(2025, 1, 1, 10), "A1", 10))
+    return scheduler, FlightService(scheduler, TTLCache(ttl=60))
+
+
+def seats(service):
+    return json.loads(service.handle("/flights/F1/seats", {})[1])["available_seats"]
+
+
+def test_result_computed_across_an_invalidation_is_not_cached():
+    scheduler, service = make_service()
+    flight = scheduler.flights["F1"]
+
+    def compute_then_book():
+        # The booking (and the cache invalidation it fires) lands after
+        # the value was computed but before it is stored
+        value = service.seats(flight)
+        flight.book_seat(Passenger("P1", "Passenger 1", "p1@example.com"))
+        return value
+
+    assert json.loads(service.cached(("seats", "F1"), compute_then_book))["available_seats"] == 10
+    assert seats(service) == 9
+    assert service.cache.hits == 0
+    assert seats(service) == 9
+    assert service.cache.hits == 1
+
+
+def test_clear_and_unrelated_discards():
+    cache = TTLCache(ttl=60)
+    generation = cache.generation
+    cache.discard(("seats", "F2"))
+    cache.put(("seats", "F1"), b"1", generation)
+    assert cache.get(("seats", "F1")) == b"1"
+    generation = cache.generation
+    cache.clear()
+    cache.put(("seats", "F1"), b"2", generation)
+    assert cache.get(("seats", "F1")) is None
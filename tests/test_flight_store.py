@@ -0,0 +1,98 @@
+from datetime import datetime
+
+import pytest
+
+from expert import Cargo, CargoFlight, Passenger, PassengerFlight, Scheduler
+from flight_store import OpLogStore, SQLiteStore
+
+
+def populate(scheduler):
+    day = datetime(2025, 1, 1, 9, 0)
+    passenger_flight = PassengerFlight("P1", "Delhi", "Mumbai", day, day.replace(hour=11), "A1", 3)
+    cargo_flight = CargoFlight("C1", "Delhi", "Pune", day, day.replace(hour=12), "A2", 1000.0)
+    scheduler.schedule_flight(passenger_flight)
+    scheduler.schedule_flight(cargo_flight)
+    passenger_flight.book_seat(Passenger("p1", "Asha", "555", "X1"))
+    passenger_flight.book_seat(Passenger("p2", "Ravi", "556", None))
+    passenger_flight.cancel_booking("p1")
+    cargo_flight.add_cargo(Cargo("c1", "Books", 120.0, "Shop"))
+    cargo_flight.add_cargo(Cargo("c2", "Tea", 80.5, "Shop"))
+    cargo_flight.remove_cargo("c1")
+
+
+def snapshot(scheduler):
+    flights = {}
+    for flight_id, flight in scheduler.flights.items():
+        if isinstance(flight, PassengerFlight):
+            items = sorted((p.passenger_id, flight.get_seat(p.passenger_id)) for p in flight.passengers.values())
+        else:
+            items = [(c.cargo_id, c.weight) for c in flight.cargo_list]
+        flights[flight_id] = (flight.departure, flight.arrival, items)
+    return flights
+
+
+@pytest.mark.parametrize("store_class, name", [(SQLiteStore, "flights.db"), (OpLogStore, "flights.log")])
+def test_round_trip(tmp_path, store_class, name):
+    path = str(tmp_path / name)
+    store = store_class(path)
+    scheduler = store.load(Scheduler())
+    populate(scheduler)
+    expected = snapshot(scheduler)
+    store.close()
+
+    store = store_class(path)
+    assert snapshot(store.load(Scheduler())) == expected
+    store.close()
+
+
+def test_op_log_torn_tail(tmp_path):
+    path = tmp_path / "flights.log"
+    store = OpLogStore(str(path))
+    populate(store.load(Scheduler()))
+    store.close()
+    whole = path.read_bytes()
+    path.write_bytes(whole + b'1234abcd ["book","P1","p3"')
+
+    store = OpLogStore(str(path))
+    scheduler = store.load(Scheduler())
+    assert "p3" not in scheduler.flights["P1"].passengers
+    assert path.read_bytes() == whole
+    # Appends after the truncation stay readable
+    scheduler.flights["P1"].book_seat(Passenger("p3", "Mira", "557", None))
+    store.close()
+    store = OpLogStore(str(path))
+    assert "p3" in store.load(Scheduler()).flights["P1"].passengers
+    store.close()
+
+
+def test_op_log_damaged_last_record_before_blank_lines(tmp_path):
+    path = tmp_path / "flights.log"
+    store = OpLogStore(str(path))
+    populate(store.load(Scheduler()))
+    store.close()
+    whole = path.read_bytes()
+    path.write_bytes(whole + b'1234abcd ["book","P1","p3"]\n\n\n')
+
+    store = OpLogStore(str(path))
+    scheduler = store.load(Scheduler())
+    assert path.read_bytes() == whole
+    scheduler.flights["P1"].book_seat(Passenger("p3", "Mira", "557", None))
+    store.close()
+    store = OpLogStore(str(path))
+    assert "p3" in store.load(Scheduler()).flights["P1"].passengers
+    store.close()
+
+
+def test_op_log_damage_in_the_middle(tmp_path):
+    path = tmp_path / "flights.log"
+    store = OpLogStore(str(path))
+    populate(store.load(Scheduler()))
+    store.close()
+    lines = path.read_bytes().split(b"\n")
+    lines[1] = lines[1].replace(b"Delhi", b"Delhy")
+    path.write_bytes(b"\n".join(lines))
+
+    store = OpLogStore(str(path))
+    with pytest.raises(ValueError):
+        store.load(Scheduler())
+    store.close()
@@ -0,0 +1,51 @@
+import random
+import re
+
+from chat_patterns import patterns
+from intent_matcher import SHORT_MESSAGE, IntentMatcher
+
+WORDS = ["hi", "hello", "how are you", "book", "BOOKS", "fiction", "non-fiction", "non fiction", "academic",
+         "price", "cost", "buy", "order", "help", "contact", "bye", "yes", "thanks", "weather", "ſale",
+         "bıg", "Kind", "\n", "?", "the", "my", "please", "x" * 40]
+
+
+def sequential_match(pairs, message):
+    # nltk.chat.util.Chat.respond's loop: the first pattern that matches
+    for pattern, responses in pairs:
+        found = re.match(pattern, message, re.IGNORECASE)
+        if found:
+            return found, responses
+    return None
+
+
+def assert_same(pairs, matcher, message):
+    expected, got = sequential_match(pairs, message), matcher.match(message)
+    if expected is None or got is None:
+        assert expected is got, message
+        return
+    assert got[1] is expected[1], message
+    assert got[0].span() == expected[0].span() and got[0].groups() == expected[0].groups(), message
+
+
+def messages(rng, count, longest):
+    for _ in range(count):
+        words = []
+        while len(" ".join(words)) < rng.randrange(1, longest):
+            words.append(rng.choice(WORDS))
+        yield " ".join(words)
+
+
+def test_matches_sequential_chat_on_short_and_long_messages():
+    matcher = IntentMatcher(patterns)
+    rng = random.Random(21)
+    for message in messages(rng, 2000, 4 * SHORT_MESSAGE):
+        assert_same(patterns, matcher, message)
+
+
+def test_falls_back_when_patterns_cannot_be_combined():
+    pairs = [(r"(\w+) and \1", ["twice %1"]), (r"(?P<word>hello)(.*)", ["hi"]), (r"(.*)book(.*)", ["books"])]
+    matcher = IntentMatcher(pairs)
+    assert matcher._combined is None
+    for message in ["cats and cats", "cats and dogs", "hello there", "a book", "nothing", "x" * 500 + " book"]:
+        assert_same(pairs, matcher, message)
+    assert matcher.respond("cats and cats") == "twice cats"
@@ -0,0 +1,83 @@
+import random
+from datetime import datetime
+
+from expert import Cargo, CargoFlight, Passenger, PassengerFlight, RowIndex, StringColumn
+
+
+def passenger_flight(columnar):
+    return PassengerFlight("F1", "Delhi", "Mumbai", datetime(2025, 1, 1, 8), datetime(2025, 1, 1, 10),
+                           "A1", 300, columnar=columnar)
+
+
+def snapshot(flight):
+    return [(str(p.passenger_id), p.name, p.contact, p.passport_number, flight.get_seat(p.passenger_id))
+            for p in flight.passengers.values()]
+
+
+def test_columnar_manifest_matches_dict_through_compaction():
+    rng = random.Random(13)
+    plain, columnar = passenger_flight(False), passenger_flight(True)
+    compactions = 0
+    rows = 0
+    for step in range(5000):
+        # Integer and string IDs alike; bursts of cancellations force compaction
+        passenger_id = rng.randrange(400)
+        if rng.random() < 0.5:
+            passenger_id = f"P{passenger_id}"
+        if rng.random() < (0.7 if step % 1000 < 600 else 0.2):
+            passenger = Passenger(passenger_id, f"Name {passenger_id}", f"{passenger_id}@example.com",
+                                  rng.choice([None, f"X{passenger_id}"]))
+            assert plain.book_seat(passenger) == columnar.book_seat(passenger)
+        else:
+            assert plain.cancel_booking(passenger_id) == columnar.cancel_booking(passenger_id)
+        compactions += len(columnar.passengers.alive) < rows
+        rows = len(columnar.passengers.alive)
+        assert len(plain.passengers) == len(columnar.passengers)
+        assert (passenger_id in plain.passengers) == (passenger_id in columnar.passengers)
+    assert compactions > 0
+    assert snapshot(plain) == snapshot(columnar)
+    assert plain.free_seats == columnar.free_seats
+
+
+def test_compaction_rebuilds_the_index():
+    flight = passenger_flight(True)
+    for i in range(200):
+        flight.book_seat(Passenger(i, f"Name {i}", "c"))
+    for i in range(150):
+        assert flight.cancel_booking(i)
+    # More than half the rows were dead, so the columns were rewritten
+    assert len(flight.passengers.alive) < 200
+    assert [p.passenger_id for p in flight.passengers.values()] == [str(i) for i in range(150, 200)]
+    for i in range(150, 200):
+        assert flight.get_seat(i) == i + 1 and flight.get_passenger(str(i)).name == f"Name {i}"
+    assert flight.get_passenger(10) is None
+
+
+def test_row_index_survives_deletes_and_resizes():
+    keys = StringColumn()
+    index = RowIndex(keys)
+    live = {}
+    rng = random.Random(3)
+    for row in range(2000):
+        # Row numbers follow the key column, one entry per step
+        key = f"k{rng.randrange(500)}"
+        keys.append(key)
+        if key in live:
+            assert index.remove(key) == live.pop(key)
+        else:
+            index.add(key, row)
+            live[key] = row
+    for key, row in live.items():
+        assert index.get(key) == row
+    assert index.get("missing") is None
+
+
+def test_columnar_cargo_accepts_non_string_ids():
+    flights = [CargoFlight("C1", "Delhi", "Mumbai", datetime(2025, 1, 1, 8), datetime(2025, 1, 1, 10),
+                           "A1", 1000.0, columnar=columnar) for columnar in (False, True)]
+    for flight in flights:
+        assert flight.add_cargo(Cargo(7, "box", 10.0, "owner"))
+        assert flight.add_cargo(Cargo("8", "crate", 20.0, "owner"))
+        assert flight.remove_cargo(7) and not flight.remove_cargo(7)
+        assert [str(cargo.cargo_id) for cargo in flight.cargo_list] == ["8"]
+        assert flight.current_cargo_weight == 20.0
@@ -0,0 +1,81 @@
+import random
+from itertools import permutations
+
+import pytest
+
+import eight_puzzle_table
+from astar import AStar, Puzzle, goal_matrix
+from pattern_db import (DEFAULT_PARTITIONS, PatternDatabaseHeuristic, PatternTable, build_databases, rank,
+                        table_size, unrank)
+
+
+def test_rank_is_a_bijection():
+    for cells, k in ((9, 4), (9, 1), (16, 3)):
+        ranks = []
+        for positions in permutations(range(cells), k):
+            r = rank(list(positions), cells)
+            assert unrank(r, cells, k) == list(positions)
+            ranks.append(r)
+        assert sorted(ranks) == list(range(table_size(cells, k)))
+
+
+@pytest.fixture(scope="module")
+def eight_puzzle(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("pdb")
+    target = Puzzle(goal_matrix(3))
+    paths = build_databases(target, str(directory))
+    heuristic = PatternDatabaseHeuristic(target, paths)
+    table_path = eight_puzzle_table.table_path(str(directory), target.blank)
+    eight_puzzle_table.write_table(table_path, target.blank, eight_puzzle_table.build_table(target.blank))
+    distances = eight_puzzle_table.EightPuzzleTable(table_path)
+    yield target, paths, heuristic, distances
+    heuristic.close()
+    distances.close()
+
+
+def random_state(target, rng, steps):
+    puzzle = target
+    for _ in range(steps):
+        puzzle = rng.choice([move for move in (puzzle.can_move_up(), puzzle.can_move_down(),
+                                               puzzle.can_move_left(), puzzle.can_move_right()) if move])
+    return Puzzle(puzzle.matrix)
+
+
+def test_tables_round_trip_through_mmap(eight_puzzle, tmp_path):
+    target, paths, _, _ = eight_puzzle
+    where = {target.tile_at(i): i for i in range(9)}
+    for path, pattern in zip(paths, DEFAULT_PARTITIONS[3]):
+        table = PatternTable(path)
+        assert table.pattern == pattern and table.n == 3
+        assert len(table.data) - table.offset == table_size(9, len(pattern)) * 9
+        assert table.lookup([where[t] for t in pattern], where[0]) == 0
+        table.close()
+    old = tmp_path / "old.bin"
+    old.write_bytes(b"PDB1" + bytes(40))
+    with pytest.raises(ValueError):
+        PatternTable(str(old))
+
+
+def test_heuristic_is_admissible_and_consistent(eight_puzzle):
+    target, _, heuristic, distances = eight_puzzle
+    rng = random.Random(4)
+    assert heuristic.estimate(target) == 0
+    for _ in range(300):
+        state = random_state(target, rng, rng.randrange(1, 80))
+        h = heuristic.estimate(state)
+        assert h <= distances.distance(state, target)
+        state.h_cost = h
+        for child in filter(None, (state.can_move_up(), state.can_move_down(),
+                                   state.can_move_left(), state.can_move_right())):
+            # update() is the incremental form of estimate(); one move changes h by at most 1
+            assert heuristic.update(state, child) == heuristic.estimate(child)
+            assert abs(heuristic.estimate(child) - h) <= 1
+
+
+def test_astar_with_the_tables_finds_optimal_paths(eight_puzzle):
+    target, _, heuristic, distances = eight_puzzle
+    rng = random.Random(5)
+    for _ in range(300):
+        state = random_state(target, rng, 80)
+        result = AStar(state, target, heuristic).solve()
+        assert len(result.moves) == distances.distance(state, target)
@@ -0,0 +1,105 @@
+import random
+from datetime import datetime, timedelta
+
+from expert import Flight, Scheduler
+from route_search import RouteIndex
+
+START = datetime(2025, 1, 1)
+AIRPORTS = ["DEL", "BOM", "BLR", "MAA", "CCU"]
+
+
+def random_scheduler(rng, count=60):
+    scheduler = Scheduler()
+    for i in range(count):
+        source, destination = rng.sample(AIRPORTS, 2)
+        departure = START + timedelta(minutes=15 * rng.randrange(4 * 40))
+        arrival = departure + timedelta(minutes=30 * rng.randrange(1, 8))
+        # Mixed case, to check airports are matched case-insensitively
+        scheduler.schedule_flight(Flight(f"F{i}", rng.choice([source, source.lower()]), destination,
+                                         departure, arrival), check_conflicts=False)
+    return scheduler
+
+
+def journeys(flights, source, depart_after, horizon, layover, max_legs):
+    # Every journey of up to max_legs legs from source, as lists of flights
+    def extend(path, airport, ready):
+        yield path
+        if len(path) == max_legs:
+            return
+        for flight in flights:
+            if (flight.source.casefold() == airport and flight.departure >= ready
+                    and flight.departure < horizon and flight.arrival < horizon):
+                yield from extend(path + [flight], flight.destination.casefold(), flight.arrival + layover)
+    for path in extend([], source.casefold(), depart_after):
+        if path:
+            yield path
+
+
+def best_arrivals(flights, source, destination, depart_after, within, layover, max_legs):
+    """Earliest arrival at destination using at most k legs, for each k"""
+    best = [None] * (max_legs + 1)
+    for path in journeys(flights, source, depart_after, depart_after + within, layover, max_legs):
+        if path[-1].destination.casefold() == destination.casefold():
+            for k in range(len(path), max_legs + 1):
+                if best[k] is None or path[-1].arrival < best[k]:
+                    best[k] = path[-1].arrival
+    return best
+
+
+def check_journey(legs, source, destination, depart_after, layover):
+    assert legs[0].source.casefold() == source.casefold() and legs[0].departure >= depart_after
+    assert legs[-1].destination.casefold() == destination.casefold()
+    for first, second in zip(legs, legs[1:]):
+        assert first.destination.casefold() == second.source.casefold()
+        assert second.departure >= first.arrival + layover
+
+
+def check_against_brute_force(index, flights, rng):
+    within = timedelta(hours=rng.choice([6, 12, 48]))
+    source, destination = rng.sample(AIRPORTS, 2)
+    depart_after = START + timedelta(hours=rng.randrange(30))
+    best = best_arrivals(flights, source, destination, depart_after, within, index.min_layover, 4)
+
+    legs = index.earliest_arrival(source, destination, depart_after, within)
+    if best[4] is None:
+        assert legs is None
+    else:
+        check_journey(legs, source, destination, depart_after, index.min_layover)
+        assert legs[-1].arrival == best[4]
+
+    pareto = index.connections_pareto(source, destination, depart_after, max_legs=3, within=within)
+    expected = [(k, best[k]) for k in range(1, 4) if best[k] is not None and (k == 1 or best[k - 1] is None
+                                                                            or best[k] < best[k - 1])]
+    assert [(len(legs), legs[-1].arrival) for legs in pareto] == expected
+    for legs in pareto:
+        check_journey(legs, source, destination, depart_after, index.min_layover)
+
+
+def test_searches_match_brute_force():
+    rng = random.Random(18)
+    for _ in range(40):
+        scheduler = random_scheduler(rng)
+        index = RouteIndex(scheduler)
+        for _ in range(5):
+            check_against_brute_force(index, list(scheduler.flights.values()), rng)
+
+
+def test_index_follows_reschedules_and_cancellations():
+    rng = random.Random(19)
+    for _ in range(20):
+        scheduler = random_scheduler(rng)
+        index = RouteIndex(scheduler)
+        for flight_id in rng.sample(sorted(scheduler.flights), 20):
+            flight = scheduler.flights[flight_id]
+            if rng.random() < 0.5:
+                shift = timedelta(minutes=15 * rng.randrange(-20, 20))
+                assert flight.reschedule(flight.departure + shift, flight.arrival + shift)
+            else:
+                assert scheduler.cancel_flight(flight_id)
+        fresh = RouteIndex(scheduler)
+        assert index.connections == fresh.connections
+        assert {airport: outgoing for airport, outgoing in index.airports.items() if outgoing} == \
+               {airport: outgoing for airport, outgoing in fresh.airports.items() if outgoing}
+        assert index.flights == fresh.flights
+        for _ in range(5):
+            check_against_brute_force(index, list(scheduler.flights.values()), rng)